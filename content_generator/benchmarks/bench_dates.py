@@ -0,0 +1,73 @@
+"""Скорость разбора дат из json Gramps и их вывода строкой.
+
+Даты берутся такими, какими они бывают в базе деревни: события нескольких
+веков, часть без дня или месяца. Первый проход идет по пустым кешам, второй
+по заполненным, как на страницах, где одни и те же даты выводятся много раз.
+
+Запуск из каталога content_generator:
+
+    python benchmarks/bench_dates.py --dates 200000
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from loguru import logger
+from src.app import entities
+from src.app.entities import Date
+
+
+def _raw_dates(count: int, seed: int = 0) -> list[dict]:
+    rnd = random.Random(seed)
+    raw_dates = []
+    for _ in range(count):
+        year = rnd.randint(1750, 2020)
+        month = rnd.choice([0, *range(1, 13)])
+        day = rnd.randint(0, 28) if month else 0
+        raw_dates.append(
+            {"dateval": [day, month, year, False], "quality": rnd.randint(0, 1)}
+        )
+    return raw_dates
+
+
+def _per_second(count: int, run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dates", type=int, default=200_000)
+    args = parser.parse_args()
+
+    logger.remove()
+    raw_dates = _raw_dates(args.dates)
+    for caches in ("cold", "warm"):
+        if caches == "cold":
+            entities._PARSED_DATES.clear()  # noqa: SLF001
+            entities._format_date.cache_clear()  # noqa: SLF001
+        parsed: list[Date] = []
+        parse = _per_second(
+            len(raw_dates),
+            lambda parsed=parsed: parsed.extend(
+                map(Date.from_gramps_json_date, raw_dates)
+            ),
+        )
+        format_ = _per_second(
+            len(parsed), lambda parsed=parsed: [str(day) for day in parsed]
+        )
+        print(  # noqa: T201
+            f"{caches}: parse {parse / 1000:.0f}k/s, format {format_ / 1000:.0f}k/s"
+        )
+    print(f"distinct dates: {len(entities._PARSED_DATES)}")  # noqa: T201, SLF001
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Сквозной бенчмарк генератора на синтетической базе Gramps.
+
+Замеряет чтение базы, большое дерево, малые деревья, статьи и галерею и
+сравнивает их с базовыми замерами из benchmarks/baselines.json для того же
+числа персон. Замер дольше базового больше чем на --tolerance считается
+регрессией, и скрипт завершается с кодом 1. Базовые замеры зависят от
+машины, после ее смены их нужно записать заново флагом --update-baseline.
+
+Запуск из каталога content_generator:
+
+    python benchmarks/bench_pipeline.py --persons 1000
+    python benchmarks/bench_pipeline.py --persons 200000 --stages load tree
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import contextlib
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks.synthetic_gramps_db import write_synthetic_gramps_db
+from loguru import logger
+from src.app.entities import GrampsTree
+from src.app.kinship import village_founder
+from src.infra.tree_loader import SQliteGrampsTreeLoader
+from src.presenters.biographer import Biographer
+from src.presenters.gallery import Gallery
+from src.presenters.small_tree_render import SmallTreeRender, WithoutRelationsError
+from src.presenters.tree_render import TreeRender
+
+BASELINES_PATH = Path(__file__).resolve().with_name("baselines.json")
+
+
+def compare_with_baseline(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    """Этапы, которые стали медленнее базовых замеров больше чем на tolerance.
+
+    >>> compare_with_baseline(
+    ...     {"load": 1.3, "tree": 2.0, "gallery": 0.5},
+    ...     {"load": 1.0, "tree": 2.1},
+    ...     tolerance=0.2,
+    ... )
+    ['load']
+    """
+    return [
+        name
+        for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + tolerance)
+    ]
+
+
+def _bench_load(database_dir: Path, _work_dir: Path) -> Callable[[], object]:
+    return lambda: SQliteGrampsTreeLoader().load(database_dir)
+
+
+def _bench_tree(gramps_tree: GrampsTree, work_dir: Path) -> Callable[[], object]:
+    return lambda: TreeRender(gramps_tree, work_dir / "content/images/tree.svg")
+
+
+def _bench_small_trees(gramps_tree: GrampsTree, work_dir: Path) -> Callable[[], object]:
+    render = SmallTreeRender()
+
+    def run():
+        for person_id in gramps_tree.persons:
+            try:
+                render.create_svg(
+                    person_id, gramps_tree, work_dir / f"small_trees/{person_id}.svg"
+                )
+            except WithoutRelationsError:
+                continue
+
+    return run
+
+
+def _bench_biographer(gramps_tree: GrampsTree, _work_dir: Path) -> Callable[[], object]:
+    founder = village_founder(gramps_tree)
+    return lambda: Biographer(
+        gramps_tree,
+        "content",
+        founder_id=founder.gramps_id if founder is not None else None,
+    )
+
+
+def _bench_gallery(gramps_tree: GrampsTree, _work_dir: Path) -> Callable[[], object]:
+    sources = {media_id: media.path for media_id, media in gramps_tree.media.items()}
+
+    def run():
+        # Gallery заменяет пути медиа копиями, следующий повтор копирует снова.
+        for media_id, source in sources.items():
+            gramps_tree.media[media_id].path = source
+        Gallery(gramps_tree).generate_gallery()
+
+    return run
+
+
+_BENCHES = {
+    "load": _bench_load,
+    "tree": _bench_tree,
+    "small_trees": _bench_small_trees,
+    "biographer": _bench_biographer,
+    "gallery": _bench_gallery,
+}
+
+
+def _measure(run: Callable[[], object], repeat: int) -> float:
+    """Лучшее время из repeat запусков: оно меньше всего зависит от шума."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(
+    persons: int, stages: list[str], repeat: int, work_dir: Path
+) -> dict[str, float]:
+    database_dir = work_dir / "grampsdb"
+    write_synthetic_gramps_db(database_dir, persons)
+    gramps_tree = SQliteGrampsTreeLoader().load(database_dir)
+    results = {}
+    # Стадии пишут контент по относительным путям.
+    with contextlib.chdir(work_dir):
+        for name in stages:
+            subject = database_dir if name == "load" else gramps_tree
+            results[name] = _measure(_BENCHES[name](subject, work_dir), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, default=1000)
+    parser.add_argument("--stages", nargs="+", choices=_BENCHES, default=list(_BENCHES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmarks(args.persons, args.stages, args.repeat, Path(tmp))
+
+    baselines = (
+        json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    )
+    baseline = baselines.get(str(args.persons), {})
+    for name, seconds in results.items():
+        if name in baseline:
+            ratio = seconds / baseline[name]
+            print(  # noqa: T201
+                f"{name:>12}: {seconds:8.3f} s, baseline {baseline[name]:8.3f} s "
+                f"({ratio:.2f}x)"
+            )
+        else:
+            print(f"{name:>12}: {seconds:8.3f} s, no baseline")  # noqa: T201
+
+    if args.update_baseline:
+        baselines[str(args.persons)] = {
+            **baseline,
+            **{name: round(seconds, 3) for name, seconds in results.items()},
+        }
+        BASELINES_PATH.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + "\n"
+        )
+        return
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
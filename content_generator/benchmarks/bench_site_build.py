@@ -0,0 +1,100 @@
+"""Сравнение полной сборки сайта со статьями о персонах.
+
+Статьи строятся из файлов, из кеша дерева и из кеша дерева с параллельной
+записью страниц.
+
+Запуск из каталога content_generator:
+
+    python benchmarks/bench_site_build.py --persons 2000 --workers 4
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_tree import build_synthetic_tree
+from loguru import logger
+from pelican import Pelican
+from pelican.settings import read_settings
+from src.app.kinship import village_founder
+from src.infra.tree_cache import save_gramps_tree
+from src.presenters.biographer import Biographer
+
+_REPO_DIR = Path(__file__).resolve().parents[2]
+
+
+def _build_site(work_dir: Path, plugins: list[str], workers: int = 0) -> None:
+    settings = read_settings(
+        str(_REPO_DIR / "pelicanconf.py"),
+        override={
+            "PATH": str(work_dir / "content"),
+            "OUTPUT_PATH": str(work_dir / "output"),
+            "THEME": str(_REPO_DIR / "theme"),
+            "PLUGIN_PATHS": [str(_REPO_DIR / "plugins")],
+            "PLUGINS": plugins,
+            "GRAMPS_TREE_CACHE": str(work_dir / ".cache/gramps_tree.pickle"),
+            "SITEURL": "",
+            "PARALLEL_PERSON_PAGES": workers,
+        },
+    )
+    Pelican(settings).run()
+
+
+def _bench_markdown_files(gramps_tree, work_dir: Path, _workers: int) -> float:
+    start = time.perf_counter()
+    founder = village_founder(gramps_tree)
+    Biographer(gramps_tree, "content", founder_id=founder.gramps_id)
+    _build_site(work_dir, ["pelican_embed_svg"])
+    return time.perf_counter() - start
+
+
+def _bench_tree_cache(gramps_tree, work_dir: Path, _workers: int) -> float:
+    start = time.perf_counter()
+    save_gramps_tree(gramps_tree, work_dir / ".cache/gramps_tree.pickle")
+    _build_site(work_dir, ["pelican_embed_svg", "gramps_persons"])
+    return time.perf_counter() - start
+
+
+def _bench_parallel(gramps_tree, work_dir: Path, workers: int) -> float:
+    start = time.perf_counter()
+    save_gramps_tree(gramps_tree, work_dir / ".cache/gramps_tree.pickle")
+    _build_site(
+        work_dir, ["pelican_embed_svg", "gramps_persons", "parallel_persons"], workers
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    logger.remove()
+    gramps_tree = build_synthetic_tree(args.persons)
+    # Сигналы Pelican глобальны, поэтому сборки идут в порядке подключения
+    # плагинов: обработчики следующей сборки не должны попасть в предыдущую,
+    # а parallel_persons отключает обработчик pelican_embed_svg.
+    benches = [
+        ("markdown files", _bench_markdown_files),
+        ("tree cache plugin", _bench_tree_cache),
+        (f"tree cache plugin, {args.workers} processes", _bench_parallel),
+    ]
+    for name, bench in benches:
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp)
+            (work_dir / "content").mkdir()
+            os.chdir(work_dir)
+            elapsed = bench(gramps_tree, work_dir, args.workers)
+            pages = len(list((work_dir / "output").glob("I*.html")))
+        print(f"{name}: {elapsed:.2f} s, {pages} person pages")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Сравнение скорости отрисовки малых деревьев разными svg бэкендами.
+
+Запуск из каталога content_generator:
+
+    python benchmarks/bench_small_tree_render.py --persons 2000
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_tree import build_synthetic_tree
+from loguru import logger
+from src.presenters.small_tree_render import (
+    SmallTreeRender,
+    SvgBackend,
+    WithoutRelationsError,
+)
+
+
+def _bench_backend(backend: SvgBackend, gramps_tree, output_dir: Path) -> float:
+    render = SmallTreeRender(backend=backend)
+    rendered = 0
+    start = time.perf_counter()
+    for person_id in gramps_tree.persons:
+        try:
+            render.create_svg(
+                base_person_id=person_id,
+                gramps_tree=gramps_tree,
+                output_path=output_dir / f"{person_id}.svg",
+            )
+        except WithoutRelationsError:
+            continue
+        rendered += 1
+    return (time.perf_counter() - start) / rendered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--persons", type=int, default=2000)
+    args = parser.parse_args()
+
+    logger.remove()
+    gramps_tree = build_synthetic_tree(args.persons)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in SvgBackend:
+            per_tree = _bench_backend(backend, gramps_tree, Path(tmp_dir))
+            print(f"{backend.value:>10}: {per_tree * 1000:.3f} ms/tree")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""Синтетическая база Gramps в формате sqlite с json_data.
+
+Генеалогия берется из build_synthetic_tree, к ней добавляются смерти,
+переписи, заметки и фотографии, в том числе групповые. Схема повторяет те
+столбцы Gramps, которые читает SQliteGrampsTreeLoader, и индексы Gramps по
+gramps_id и reference, без которых чтение большой базы было бы нереально
+медленным.
+
+Запуск из каталога content_generator:
+
+    python benchmarks/synthetic_gramps_db.py /tmp/grampsdb --persons 10000
+"""
+
+import sys
+
+sys.path.append(".")
+
+import argparse
+import io
+import json
+import random
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.synthetic_tree import build_synthetic_tree
+from PIL import Image
+from src.app.entities import EventType, Family, GrampsTree, Person
+
+_SCHEMA = """
+CREATE TABLE person (handle VARCHAR(50) PRIMARY KEY NOT NULL, given_name TEXT,
+    surname TEXT, gender INTEGER, order_by TEXT, gramps_id TEXT, json_data TEXT,
+    change INTEGER, private INTEGER);
+CREATE TABLE family (handle VARCHAR(50) PRIMARY KEY NOT NULL, gramps_id TEXT,
+    father_handle VARCHAR(50), mother_handle VARCHAR(50), json_data TEXT,
+    change INTEGER, private INTEGER);
+CREATE TABLE event (handle VARCHAR(50) PRIMARY KEY NOT NULL, gramps_id TEXT,
+    description TEXT, json_data TEXT, change INTEGER, private INTEGER);
+CREATE TABLE note (handle VARCHAR(50) PRIMARY KEY NOT NULL, gramps_id TEXT,
+    json_data TEXT, change INTEGER, private INTEGER);
+CREATE TABLE media (handle VARCHAR(50) PRIMARY KEY NOT NULL, gramps_id TEXT,
+    path TEXT, mime TEXT, desc TEXT, checksum TEXT, json_data TEXT,
+    change INTEGER, private INTEGER);
+CREATE TABLE reference (obj_handle VARCHAR(50), obj_class TEXT,
+    ref_handle VARCHAR(50), ref_class TEXT);
+CREATE INDEX person_gramps_id ON person(gramps_id);
+CREATE INDEX family_gramps_id ON family(gramps_id);
+CREATE INDEX event_gramps_id ON event(gramps_id);
+CREATE INDEX note_gramps_id ON note(gramps_id);
+CREATE INDEX media_gramps_id ON media(gramps_id);
+CREATE INDEX reference_obj_handle ON reference(obj_handle);
+CREATE INDEX reference_ref_handle ON reference(ref_handle);
+"""
+
+_NOTES = [
+    "Участник Первой мировой войны.",
+    "Упоминается в ревизской сказке как переселенец из соседней деревни.",
+    "Был старостой деревни, держал мельницу на речке.",
+    "Со слов внуков, хорошо пел и играл на гармони.",
+]
+_CENSUS_YEARS = [1795, 1811, 1816, 1834, 1850, 1858, 1897, 1926]
+# Доли умерших до 2000 года с известной датой смерти и записей в переписях.
+_DEATH_RECORDED_SHARE = 0.8
+_CENSUS_RECORDED_SHARE = 0.5
+# Доля семейных фотографий, из которых в Gramps вырезан портрет отца.
+_PORTRAIT_SHARE = 0.3
+_IMAGE_SIZE = (800, 600)
+
+
+class _Rows:
+    """Строки таблиц базы, которые накапливаются перед записью."""
+
+    def __init__(self, rnd: random.Random):
+        self.rnd = rnd
+        self.tables: dict[str, list[tuple]] = {
+            "person": [],
+            "family": [],
+            "event": [],
+            "note": [],
+            "media": [],
+            "reference": [],
+        }
+        self.__counters: dict[str, int] = {}
+        self.__change = 1_600_000_000
+
+    def handle(self) -> str:
+        return f"{self.rnd.getrandbits(96):024x}"
+
+    def gramps_id(self, prefix: str) -> str:
+        number = self.__counters.get(prefix, 0)
+        self.__counters[prefix] = number + 1
+        return f"{prefix}{number:05d}"
+
+    def change(self) -> int:
+        self.__change += self.rnd.randint(1, 600)
+        return self.__change
+
+    def reference(self, obj: str, obj_class: str, ref: str, ref_class: str):
+        self.tables["reference"].append((obj, obj_class, ref, ref_class))
+
+
+def write_synthetic_gramps_db(
+    path: Path,
+    persons_count: int,
+    seed: int = 0,
+    *,
+    notes_share: float = 0.3,
+    photo_share: float = 0.05,
+) -> GrampsTree:
+    """Пишет path/sqlite.db и path/media; возвращает дерево-источник.
+
+    Дерево-источник не совпадает с прочитанным загрузчиком: в базе у части
+    персон есть даты смерти, заметки и фотографии.
+    """
+    gramps_tree = build_synthetic_tree(persons_count, seed)
+    rows = _Rows(random.Random(seed))
+    person_handles = {person_id: rows.handle() for person_id in gramps_tree.persons}
+    for person in gramps_tree.persons.values():
+        _add_person(rows, person, person_handles[person.gramps_id], notes_share)
+    for family in gramps_tree.families.values():
+        _add_family(rows, family, person_handles)
+    media_dir = path / "media"
+    media_dir.mkdir(parents=True, exist_ok=True)
+    _add_photos(rows, gramps_tree, person_handles, media_dir, photo_share)
+
+    database = path / "sqlite.db"
+    database.unlink(missing_ok=True)
+    conn = sqlite3.connect(database)
+    try:
+        conn.executescript(_SCHEMA)
+        for table, table_rows in rows.tables.items():
+            if table_rows:
+                placeholders = ", ".join("?" * len(table_rows[0]))
+                conn.executemany(
+                    f"INSERT INTO {table} VALUES ({placeholders})",  # noqa: S608
+                    table_rows,
+                )
+        conn.commit()
+    finally:
+        conn.close()
+    return gramps_tree
+
+
+def _add_person(rows: _Rows, person: Person, handle: str, notes_share: float):
+    given_name, surname = person.full_name.split()
+    event_handles = [
+        _add_event(
+            rows,
+            EventType.BIRTH,
+            person.birth_day.date,
+            "",
+            quality=person.birth_day.quality.value,
+        )
+    ]
+    died = person.birth_day.date + timedelta(days=365 * rows.rnd.randint(1, 95))
+    if died < date(2000, 1, 1) and rows.rnd.random() < _DEATH_RECORDED_SHARE:
+        event_handles.append(_add_event(rows, EventType.DEATH, died, "", quality=0))
+    event_handles.extend(
+        _add_event(
+            rows, EventType.CENSUS, date(year, 1, 1), f"Ревизия {year} года", quality=0
+        )
+        for year in _CENSUS_YEARS
+        if person.birth_day.date.year < year < died.year
+        and rows.rnd.random() < _CENSUS_RECORDED_SHARE
+    )
+    note_handles = []
+    if rows.rnd.random() < notes_share:
+        note_handles.append(_add_note(rows, rows.rnd.choice(_NOTES)))
+
+    change = rows.change()
+    json_data = {
+        "_class": "Person",
+        "handle": handle,
+        "change": change,
+        "private": False,
+        "gramps_id": person.gramps_id,
+        "gender": person.gender.value,
+        "primary_name": {
+            "_class": "Name",
+            "first_name": given_name,
+            "surname_list": [{"_class": "Surname", "surname": surname}],
+        },
+        "event_ref_list": [
+            {"_class": "EventRef", "ref": event_handle, "role": {"value": 1}}
+            for event_handle in event_handles
+        ],
+        "note_list": note_handles,
+        "media_list": [],
+        "family_list": [],
+        "parent_family_list": [],
+    }
+    rows.tables["person"].append(
+        (
+            handle,
+            given_name,
+            surname,
+            person.gender.value,
+            f"{surname},{given_name}",
+            person.gramps_id,
+            json.dumps(json_data, ensure_ascii=False),
+            change,
+            0,
+        )
+    )
+    for event_handle in event_handles:
+        rows.reference(handle, "Person", event_handle, "Event")
+    for note_handle in note_handles:
+        rows.reference(handle, "Person", note_handle, "Note")
+
+
+def _add_event(
+    rows: _Rows, event_type: EventType, day: date, description: str, quality: int
+) -> str:
+    handle = rows.handle()
+    gramps_id = rows.gramps_id("E")
+    change = rows.change()
+    json_data = {
+        "_class": "Event",
+        "handle": handle,
+        "change": change,
+        "private": False,
+        "gramps_id": gramps_id,
+        "type": {"_class": "EventType", "value": event_type.value, "string": ""},
+        "date": {
+            "_class": "Date",
+            "calendar": 0,
+            "modifier": 0,
+            "quality": quality,
+            "dateval": [day.day, day.month, day.year, False],
+            "text": "",
+            "sortval": day.toordinal() + 1721425,
+            "newyear": 0,
+        },
+        "description": description,
+    }
+    rows.tables["event"].append(
+        (
+            handle,
+            gramps_id,
+            description,
+            json.dumps(json_data, ensure_ascii=False),
+            change,
+            0,
+        )
+    )
+    return handle
+
+
+def _add_note(rows: _Rows, text: str) -> str:
+    handle = rows.handle()
+    gramps_id = rows.gramps_id("N")
+    change = rows.change()
+    json_data = {
+        "_class": "Note",
+        "handle": handle,
+        "change": change,
+        "private": False,
+        "gramps_id": gramps_id,
+        "text": {"_class": "StyledText", "string": text, "tags": []},
+        "format": 0,
+        "type": {"_class": "NoteType", "value": 1, "string": ""},
+    }
+    rows.tables["note"].append(
+        (handle, gramps_id, json.dumps(json_data, ensure_ascii=False), change, 0)
+    )
+    return handle
+
+
+def _add_family(rows: _Rows, family: Family, person_handles: dict[str, str]):
+    handle = rows.handle()
+    change = rows.change()
+    father_handle = person_handles[family.father.gramps_id]
+    mother_handle = person_handles[family.mother.gramps_id]
+    child_handles = [
+        person_handles[child.gramps_id]
+        for child in sorted(family.children, key=lambda child: child.gramps_id)
+    ]
+    json_data = {
+        "_class": "Family",
+        "handle": handle,
+        "change": change,
+        "private": False,
+        "gramps_id": family.gramps_id,
+        "father_handle": father_handle,
+        "mother_handle": mother_handle,
+        "child_ref_list": [
+            {"_class": "ChildRef", "ref": child_handle}
+            for child_handle in child_handles
+        ],
+        "type": {"_class": "FamilyRelType", "value": 0, "string": ""},
+    }
+    rows.tables["family"].append(
+        (
+            handle,
+            family.gramps_id,
+            father_handle,
+            mother_handle,
+            json.dumps(json_data, ensure_ascii=False),
+            change,
+            0,
+        )
+    )
+    for member_handle in (father_handle, mother_handle, *child_handles):
+        rows.reference(handle, "Family", member_handle, "Person")
+    for parent_handle in (father_handle, mother_handle):
+        rows.reference(parent_handle, "Person", handle, "Family")
+    for child_handle in child_handles:
+        rows.reference(child_handle, "Person", handle, "Family")
+
+
+def _add_photos(
+    rows: _Rows,
+    gramps_tree: GrampsTree,
+    person_handles: dict[str, str],
+    media_dir: Path,
+    photo_share: float,
+):
+    """Семейные фотографии: одно медиа, на которое ссылаются все члены семьи.
+
+    У части фотографий есть второе медиа с тем же файлом - портрет отца,
+    как в реальной базе: Gallery группирует такие медиа по путям.
+    """
+    image = _image_bytes()
+    for family in gramps_tree.families.values():
+        if rows.rnd.random() >= photo_share:
+            continue
+        file_name = f"{family.gramps_id}.jpg"
+        (media_dir / file_name).write_bytes(image)
+        members = [family.father, family.mother, *family.children]
+        handle = _add_media(rows, file_name, f"Семья {family.father.full_name}")
+        for person in members:
+            rows.reference(person_handles[person.gramps_id], "Person", handle, "Media")
+        if rows.rnd.random() < _PORTRAIT_SHARE:
+            handle = _add_media(rows, file_name, family.father.full_name)
+            rows.reference(
+                person_handles[family.father.gramps_id], "Person", handle, "Media"
+            )
+
+
+def _add_media(rows: _Rows, file_name: str, description: str) -> str:
+    handle = rows.handle()
+    gramps_id = rows.gramps_id("O")
+    change = rows.change()
+    json_data = {
+        "_class": "Media",
+        "handle": handle,
+        "change": change,
+        "private": False,
+        "gramps_id": gramps_id,
+        "path": file_name,
+        "mime": "image/jpeg",
+        "desc": description,
+    }
+    rows.tables["media"].append(
+        (
+            handle,
+            gramps_id,
+            file_name,
+            "image/jpeg",
+            description,
+            "",
+            json.dumps(json_data, ensure_ascii=False),
+            change,
+            0,
+        )
+    )
+    return handle
+
+
+def _image_bytes() -> bytes:
+    image = Image.linear_gradient("L").resize(_IMAGE_SIZE).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--persons", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_gramps_db(args.path, args.persons, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import random
+from datetime import date, timedelta
+
+from src.app.entities import (
+    Date,
+    DateQuality,
+    Family,
+    Gender,
+    GrampsId,
+    GrampsTree,
+    Person,
+    Relation,
+    RelationType,
+)
+
+_MALE_NAMES = ["Иван", "Петр", "Василий", "Никифор", "Ефим", "Яндуш", "Мурзанай"]
+_FEMALE_NAMES = ["Анна", "Мария", "Евдокия", "Пелагея", "Татьяна", "Акулина"]
+_SURNAMES = ["Васильев", "Никифоров", "Иванов", "Яндушев", "Алмадаев", "Грозов"]
+
+
+def build_synthetic_tree(persons_count: int, seed: int = 0) -> GrampsTree:
+    """Строит в памяти дерево заданного размера, похожее на деревенское."""
+    rnd = random.Random(seed)
+    persons: dict[GrampsId, Person] = {}
+    families: dict[GrampsId, Family] = {}
+    relations: set[Relation] = set()
+
+    def new_person(gender: Gender, born: date, surname: str) -> Person:
+        _id = GrampsId(f"I{len(persons):05d}")
+        names = _MALE_NAMES if gender is Gender.MALE else _FEMALE_NAMES
+        suffix = "" if gender is Gender.MALE else "а"
+        person = Person(
+            _id=_id,
+            full_name=f"{rnd.choice(names)} {surname}{suffix}",
+            birth_day=Date(born, rnd.choice(list(DateQuality))),
+            death_day=None,
+            gender=gender,
+        )
+        persons[_id] = person
+        return person
+
+    fathers = [
+        new_person(Gender.MALE, date(1700, 1, 1), surname) for surname in _SURNAMES
+    ]
+    while len(persons) < persons_count and fathers:
+        father = fathers.pop(0)
+        surname = father.full_name.split()[-1]
+        mother = new_person(
+            Gender.FEMALE,
+            father.birth_day.date + timedelta(days=rnd.randint(0, 3000)),
+            rnd.choice(_SURNAMES),
+        )
+        family = Family(GrampsId(f"F{len(families):05d}"))
+        family.father = father
+        family.mother = mother
+        families[family.gramps_id] = family
+        relations.add(
+            Relation(
+                father.gramps_id,
+                RelationType.MARRIAGE,
+                mother.gramps_id,
+                family.gramps_id,
+            )
+        )
+        for child_number in range(rnd.randint(1, 6)):
+            gender = rnd.choice([Gender.MALE, Gender.FEMALE])
+            child = new_person(
+                gender,
+                mother.birth_day.date + timedelta(days=365 * (20 + 2 * child_number)),
+                surname,
+            )
+            family.add_child(child)
+            relations.add(
+                Relation(
+                    child.gramps_id,
+                    RelationType.BIRTH_FROM,
+                    father.gramps_id,
+                    family.gramps_id,
+                )
+            )
+            if gender is Gender.MALE:
+                fathers.append(child)
+
+    return GrampsTree(persons=persons, media={}, relations=relations, families=families)
@@ -0,0 +1,32 @@
+import argparse
+from pathlib import Path
+
+from src.infra.deploy import Deployer, DirectoryTarget, GitTarget, RsyncTarget
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Публикует только файлы сайта, изменившиеся с прошлой публикации"
+    )
+    parser.add_argument("output_dir", type=Path, help="каталог сайта, например docs")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--directory", type=Path, help="опубликовать в каталог")
+    target.add_argument("--git-dir", type=Path, help="опубликовать в ветку репозитория")
+    target.add_argument("--rsync", help="опубликовать через rsync в user@host:path")
+    parser.add_argument("--branch", default="gh-pages")
+    parser.add_argument("--message", default="Publish site")
+    parser.add_argument("--ssh-port", type=int, default=22)
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=Path(".cache/deploy_manifest.json"),
+        help="манифест последней публикации",
+    )
+    args = parser.parse_args()
+
+    if args.directory is not None:
+        deploy_target = DirectoryTarget(args.directory)
+    elif args.git_dir is not None:
+        deploy_target = GitTarget(args.git_dir, args.branch, args.message)
+    else:
+        deploy_target = RsyncTarget(args.rsync, args.ssh_port)
+    Deployer(args.output_dir, args.manifest).deploy(deploy_target)
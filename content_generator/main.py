@@ -1,23 +1,401 @@
+"""Генератор контента сайта из базы Gramps.
+
+Команда выбирает этапы генерации, модули этапов импортируются только при
+их запуске: генерация одной галереи не загружает drawsvg и рисование деревьев.
+
+    python content_generator/main.py all <каталог базы Gramps>
+    python content_generator/main.py gallery <каталог базы Gramps>
+"""
+
+import argparse
 import os
+from collections.abc import Callable
+from functools import partial
 from pathlib import Path
+from typing import NamedTuple
 
 from loguru import logger
+from src.app.entities import GrampsId, GrampsTree, build_today
+from src.infra.russian_locale import use_russian_month_names
+from src.infra.stage_scheduler import Stage, StageExecutor, StageScheduler
 from src.infra.tree_loader import SQliteGrampsTreeLoader
-from src.presenters.biographer import Biographer
-from src.presenters.gallery import Gallery
-from src.presenters.tree_render import TreeRender
 
-if __name__ == "__main__":
-    logger.info("Start")
-    gramps_tree = SQliteGrampsTreeLoader().load(
-        Path(
-            "/home/rakhmaevao/.var/app/org.gramps_project.Gramps/data/gramps/grampsdb/yanashbelyak"
+
+class _Context(NamedTuple):
+    gramps_tree: GrampsTree
+    content_dir: str
+    cache_dir: Path
+    args: argparse.Namespace
+
+
+def render_tree(gramps_tree: GrampsTree, path: Path, layout_cache_path: Path):
+    """Большое дерево: этап в отдельном процессе, поэтому ничего не возвращает."""
+    from src.presenters.tree_render import TreeRender
+
+    TreeRender(gramps_tree, path, layout_cache_path=layout_cache_path)
+
+
+def render_small_trees(gramps_tree: GrampsTree, content_dir: str):
+    from src.presenters.small_tree_render import (
+        SmallTreeRender,
+        SvgBackend,
+        WithoutRelationsError,
+    )
+
+    small_trees_dir = Path(content_dir) / "images/small_trees"
+    small_trees_dir.mkdir(parents=True, exist_ok=True)
+    render = SmallTreeRender(backend=SvgBackend.TEMPLATE)
+    for person_id in gramps_tree.persons:
+        try:
+            render.create_svg(
+                base_person_id=person_id,
+                gramps_tree=gramps_tree,
+                output_path=small_trees_dir / f"{person_id}.svg",
+            )
+        except WithoutRelationsError:
+            continue
+
+
+def write_persons(gramps_tree: GrampsTree, content_dir: str, args: argparse.Namespace):
+    from src.app.kinship import village_founder
+    from src.presenters.biographer import Biographer
+
+    founder = village_founder(gramps_tree)
+    Biographer(
+        gramps_tree,
+        content_dir,
+        founder_id=founder.gramps_id if founder is not None else None,
+        inline_small_trees=args.inline_small_trees,
+    )
+
+
+def generate_gallery(gramps_tree: GrampsTree):
+    from src.presenters.gallery import Gallery
+
+    Gallery(gramps_tree).generate_gallery()
+
+
+def copy_branch_media(gramps_tree: GrampsTree):
+    from src.presenters.gallery import Gallery
+
+    Gallery(gramps_tree).copy_media()
+
+
+def generate_timeline(gramps_tree: GrampsTree):
+    from src.presenters.timeline import Timeline
+
+    Timeline(gramps_tree).generate_timeline()
+
+
+def generate_search_index(gramps_tree: GrampsTree):
+    from src.presenters.search_index import SearchIndex
+
+    SearchIndex(gramps_tree).generate_index()
+
+
+def annotate_revisions(gramps_tree: GrampsTree, content_dir: str):
+    from src.presenters.revision_annotator import RevisionAnnotator
+
+    RevisionAnnotator(gramps_tree).annotate_pages(
+        Path(content_dir).parent / "revisions", Path(content_dir) / "revisions"
+    )
+
+
+def report_duplicates(gramps_tree: GrampsTree, reports_dir: Path):
+    from src.app.duplicates import DuplicateFinder
+    from src.presenters.duplicates_report import DuplicatesReport
+
+    DuplicatesReport(DuplicateFinder(gramps_tree).find()).save(reports_dir)
+
+
+def save_tree_cache(gramps_tree: GrampsTree, path: Path):
+    from src.infra.tree_cache import save_gramps_tree
+
+    save_gramps_tree(gramps_tree, path)
+
+
+def _tree_stage(context: _Context) -> Stage:
+    return Stage(
+        "tree",
+        partial(
+            render_tree,
+            context.gramps_tree,
+            Path(f"{context.content_dir}/images/tree.svg"),
+            context.cache_dir / "tree_layout.json",
+        ),
+        executor=StageExecutor.PROCESS,
+    )
+
+
+def _tree_cache_stage(context: _Context, after: tuple[str, ...] = ()) -> Stage:
+    return Stage(
+        "tree_cache",
+        partial(
+            save_tree_cache,
+            context.gramps_tree,
+            context.cache_dir / "gramps_tree.pickle",
+        ),
+        after=after,
+    )
+
+
+def _persons_stage(context: _Context, after: tuple[str, ...] = ()) -> Stage:
+    return Stage(
+        "persons",
+        partial(write_persons, context.gramps_tree, context.content_dir, context.args),
+        after=after,
+    )
+
+
+def _branch_stages(context: _Context) -> list[Stage]:
+    """Статьи ветки markdown файлами и копии ее изображений.
+
+    Большое дерево, галерея, хронология, поиск, ревизии, отчет о дублях и
+    кеш дерева описывают всю деревню, поэтому по ветке не пишутся.
+    """
+    return [
+        Stage("gallery", partial(copy_branch_media, context.gramps_tree)),
+        _persons_stage(context, after=("gallery",)),
+    ]
+
+
+def _all_stages(context: _Context) -> list[Stage]:
+    if context.args.root:
+        return _branch_stages(context)
+    gramps_tree, content_dir = context.gramps_tree, context.content_dir
+    stages = [
+        _tree_stage(context),
+        Stage("gallery", partial(generate_gallery, gramps_tree)),
+        Stage("timeline", partial(generate_timeline, gramps_tree)),
+        Stage("search", partial(generate_search_index, gramps_tree)),
+        Stage("revisions", partial(annotate_revisions, gramps_tree, content_dir)),
+        Stage(
+            "duplicates",
+            partial(
+                report_duplicates, gramps_tree, Path(content_dir).parent / "reports"
+            ),
+        ),
+    ]
+    # Gallery заменяет media.path путями к копиям в галерее: по ним статьи
+    # ссылаются на изображения, и их же плагин gramps_persons читает из кеша
+    # дерева. Поэтому статьи и кеш пишутся только после галереи.
+    if context.args.person_markdown:
+        stages.append(_persons_stage(context, after=("gallery",)))
+    else:
+        # Кеш пиклит дерево, пока другие этапы в потоках могут дополнять
+        # кешированные свойства сущностей, поэтому ждет их всех.
+        stages.append(
+            _tree_cache_stage(
+                context,
+                after=tuple(
+                    stage.name
+                    for stage in stages
+                    if stage.executor == StageExecutor.THREAD
+                ),
+            )
+        )
+    return stages
+
+
+# Команда -> (описание, этапы генерации).
+_COMMANDS: dict[str, tuple[str, Callable[[_Context], list[Stage]]]] = {
+    "load": (
+        "прочитать базу и сохранить кеш дерева для плагина gramps_persons",
+        lambda context: [_tree_cache_stage(context)],
+    ),
+    "tree": ("нарисовать большое дерево", lambda context: [_tree_stage(context)]),
+    "small-trees": (
+        "нарисовать малые деревья в content/images/small_trees",
+        lambda context: [
+            Stage(
+                "small_trees",
+                partial(render_small_trees, context.gramps_tree, context.content_dir),
+            )
+        ],
+    ),
+    "bios": (
+        "записать статьи о персонах в content/persons",
+        lambda context: [_persons_stage(context)],
+    ),
+    "gallery": (
+        "скопировать изображения в галерею",
+        lambda context: [
+            Stage("gallery", partial(generate_gallery, context.gramps_tree))
+        ],
+    ),
+    "all": ("сгенерировать весь контент", _all_stages),
+}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "database", type=Path, help="каталог базы Gramps с файлом sqlite.db"
+    )
+    common.add_argument(
+        "--sequential",
+        action="store_true",
+        help="выполнять этапы генерации по очереди в одном потоке",
+    )
+    common.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="выполнять этапы по очереди и писать в лог пиковую память и места "
+        "наибольших выделений для каждого этапа",
+    )
+    common.add_argument(
+        "--lazy-text",
+        action="store_true",
+        help="не держать в памяти тексты заметок и описания событий, а читать "
+        "их из базы при записи статей",
+    )
+    common.add_argument(
+        "--parallel-load",
+        action="store_true",
+        help="читать таблицы базы одновременно в нескольких потоках",
+    )
+    common.add_argument(
+        "--root",
+        action="append",
+        type=GrampsId,
+        help="генерировать только ветку вокруг этой персоны: ее предков, "
+        "потомков и их супругов; можно указать несколько раз",
+    )
+    common.add_argument(
+        "--depth",
+        type=int,
+        default=2,
+        help="сколько поколений предков и потомков брать в ветку (по умолчанию 2)",
+    )
+    small_trees = argparse.ArgumentParser(add_help=False)
+    small_trees.add_argument(
+        "--inline-small-trees",
+        action="store_true",
+        help="вставлять малые деревья в markdown статьи svg разметкой вместо "
+        "файлов content/images/small_trees",
+    )
+
+    parser = argparse.ArgumentParser(description="Генератор контента из базы Gramps")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (description, _) in _COMMANDS.items():
+        parents = [common, small_trees] if name in {"bios", "all"} else [common]
+        command = commands.add_parser(name, parents=parents, help=description)
+        if name == "all":
+            command.add_argument(
+                "--person-markdown",
+                action="store_true",
+                help="записать статьи о персонах в content/persons вместо кеша "
+                "дерева для плагина gramps_persons",
+            )
+            command.add_argument(
+                "--watch",
+                action="store_true",
+                help="после генерации следить за базой Gramps и обновлять только "
+                "затронутые изменениями страницы",
+            )
+    args = parser.parse_args(argv)
+    if args.root and getattr(args, "watch", False):
+        parser.error("--watch обновляет все дерево и не работает с --root")
+    if args.root and args.command in {"load", "tree", "gallery"}:
+        parser.error(
+            f"{args.command} пишет контент всей деревни и не работает с --root"
         )
+    if args.root and args.command == "all":
+        # Плагин gramps_persons строит статьи по кешу всей деревни, поэтому
+        # статьи ветки пишутся только markdown файлами.
+        args.person_markdown = True
+    return args
+
+
+def _watch(
+    context: _Context, loader: SQliteGrampsTreeLoader, watcher, snapshot, live_content
+):
+    from src.app.tree_changes import TreeChanges
+
+    args = context.args
+    logger.info(f"Watching {args.database}")
+    while True:
+        event = watcher.wait()
+        # Сборка при --watch идет сутками, а живость персон решается по
+        # сегодняшней дате на момент обновления.
+        build_today.cache_clear()
+        changes = TreeChanges()
+        if event.database:
+            new_snapshot = loader.snapshot(args.database)
+            changes = loader.reload(
+                args.database, context.gramps_tree, snapshot, new_snapshot
+            )
+            snapshot = new_snapshot
+        live_content.update(changes, event.media_files)
+        if not args.person_markdown:
+            save_tree_cache(
+                context.gramps_tree, context.cache_dir / "gramps_tree.pickle"
+            )
+
+
+def main(argv: list[str] | None = None):
+    args = _parse_args(argv)
+    watch = getattr(args, "watch", False)
+    use_russian_month_names()
+
+    logger.info(f"Start {args.command}")
+    loader = SQliteGrampsTreeLoader(
+        lazy_text=args.lazy_text, parallel=args.parallel_load
     )
+    if watch:
+        from src.infra.watcher import GrampsWatcher
+
+        # Состояние снимается до чтения дерева: правки, сделанные в Gramps во
+        # время генерации, будут перечитаны при первом же опросе.
+        watcher = GrampsWatcher(args.database)
+        snapshot = loader.snapshot(args.database)
+    memory_profiler = None
+    if args.profile_memory:
+        from src.infra.memory_profiler import MemoryProfiler
+
+        memory_profiler = MemoryProfiler(Path(__file__).parent)
+    if memory_profiler is None:
+        gramps_tree = loader.load(args.database)
+    else:
+        with memory_profiler.stage("load"):
+            gramps_tree = loader.load(args.database)
 
     logger.info("The database has been read")
+    if args.root:
+        from src.app.subset import branch_subset
+
+        gramps_tree = branch_subset(gramps_tree, args.root, args.depth)
+        logger.info(f"Branch of {len(gramps_tree.persons)} persons selected")
 
     content_dir = "content" if "content" in set(os.listdir()) else "../content"
-    TreeRender(gramps_tree, Path(f"{content_dir}/images/tree.svg"))
-    Gallery(gramps_tree).generate_gallery()
-    Biographer(gramps_tree, content_dir)
+    context = _Context(
+        gramps_tree, content_dir, Path(content_dir).parent / ".cache", args
+    )
+    if watch:
+        from src.presenters.live_content import LiveContent
+
+        # LiveContent запоминает исходные пути медиа до того, как их заменит
+        # галерея.
+        live_content = LiveContent(
+            gramps_tree,
+            content_dir,
+            inline_small_trees=args.inline_small_trees,
+            person_markdown=args.person_markdown,
+            layout_cache_path=context.cache_dir / "tree_layout.json",
+        )
+    stages = _COMMANDS[args.command][1](context)
+    # Одному этапу не с чем выполняться одновременно, а отдельный процесс
+    # стоил бы лишней копии дерева.
+    StageScheduler(stages).run(
+        sequential=args.sequential or len(stages) == 1,
+        memory_profiler=memory_profiler,
+    )
+    if memory_profiler is not None:
+        logger.info(f"Memory profile\n{memory_profiler.report()}")
+
+    if watch:
+        _watch(context, loader, watcher, snapshot, live_content)
+
+
+if __name__ == "__main__":
+    main()
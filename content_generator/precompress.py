@@ -0,0 +1,22 @@
+import argparse
+from pathlib import Path
+
+from src.infra.precompress import Precompressor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Записывает .gz и .br копии текстовых файлов собранного сайта"
+    )
+    parser.add_argument("output_dir", type=Path, help="каталог сайта, например docs")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(".cache/precompressed"),
+        help="кеш сжатых файлов по хешу содержимого",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="число процессов, 0 - по числу ядер"
+    )
+    args = parser.parse_args()
+
+    Precompressor(args.output_dir, args.cache_dir, args.workers).run()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import NamedTuple
+
+from src.app.entities import DateQuality, GrampsId, GrampsTree, Person
+from src.app.lifespan_index import BIRTHDAY_ERROR_DAYS, DAY_IN_YEAR
+from src.app.names import name_tokens, phonetic_key
+
+# Погрешность даты рождения, указанной как точная: переписи часто
+# расходятся на год.
+_EXACT_BIRTHDAY_ERROR_DAYS = DAY_IN_YEAR
+# Сколько следующих по дате рождения персон блока сравнивается с каждой.
+_WINDOW = 10
+
+
+def surname_key(full_name: str) -> str:
+    """Фонетический ключ фамилии, одинаковый для разных написаний и родов.
+
+    Фамилией считается последнее слово имени, а если слово одно - оно само.
+
+    >>> surname_key("Иван Яндушев") == surname_key("Анна Яндушева")
+    True
+    >>> surname_key("Петр Навальный") == surname_key("Мария Навальная")
+    True
+    >>> surname_key("Ефим Алмадаев"), surname_key("Ефим Алмодаев")
+    ('almdv', 'almdv')
+    """
+    tokens = name_tokens(full_name)
+    return phonetic_key(tokens[-1]) if tokens else ""
+
+
+class DuplicateCandidate(NamedTuple):
+    first: Person
+    second: Person
+    name_similarity: float
+    date_similarity: float
+
+    @property
+    def score(self) -> float:
+        return (self.name_similarity + self.date_similarity) / 2
+
+
+class _Entry(NamedTuple):
+    gramps_id: GrampsId
+    start: int
+    end: int
+    person: Person
+    name: str
+    families: frozenset[GrampsId]
+
+
+class DuplicateFinder:
+    """Поиск персон, которые, вероятно, внесены в дерево дважды.
+
+    Сравнивать все пары персон слишком долго, поэтому персоны разбиваются на
+    блоки по фонетическому ключу фамилии, полу и десятилетию рождения.
+    Сравниваются только персоны из одного блока и соседних десятилетий, у
+    которых пересекаются интервалы возможной даты рождения, причем каждая
+    только с _WINDOW ближайшими по дате (sorted neighbourhood), чтобы большие
+    блоки однофамильцев не давали квадратичного числа сравнений. Персоны из
+    одной семьи дубликатами не считаются.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree, min_name_similarity: float = 0.85):
+        self.__gramps_tree = gramps_tree
+        self.__min_name_similarity = min_name_similarity
+        self.__families_by_person: dict[GrampsId, set[GrampsId]] = defaultdict(set)
+        for family in gramps_tree.families.values():
+            for person in (family.father, family.mother, *family.children):
+                if person is not None:
+                    self.__families_by_person[person.gramps_id].add(family.gramps_id)
+
+    def find(self) -> list[DuplicateCandidate]:
+        """Кандидаты в дубликаты по убыванию оценки."""
+        blocks: dict[tuple, dict[int, list[_Entry]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        for person in self.__gramps_tree.persons.values():
+            tokens = name_tokens(person.full_name)
+            key = (surname_key(person.full_name), person.gender)
+            blocks[key][person.birth_day.date.year // 10].append(
+                self.__entry(person, tokens)
+            )
+
+        candidates = []
+        for decades in blocks.values():
+            for decade, entries in decades.items():
+                candidates.extend(
+                    self.__compare_block(entries, decades.get(decade + 1, []))
+                )
+        return sorted(
+            candidates,
+            key=lambda c: (-c.score, c.first.gramps_id, c.second.gramps_id),
+        )
+
+    def __entry(self, person: Person, tokens: list[str]) -> _Entry:
+        birth = person.birth_day.date.toordinal()
+        error = (
+            BIRTHDAY_ERROR_DAYS
+            if person.birth_day.quality is DateQuality.ESTIMATED
+            else _EXACT_BIRTHDAY_ERROR_DAYS
+        )
+        return _Entry(
+            person.gramps_id,
+            birth - error,
+            birth + error,
+            person,
+            " ".join(sorted(tokens)),
+            frozenset(self.__families_by_person[person.gramps_id]),
+        )
+
+    def __compare_block(
+        self, entries: list[_Entry], next_decade: list[_Entry]
+    ) -> list[DuplicateCandidate]:
+        """Сравнивает персоны десятилетия между собой и со следующим."""
+        merged = sorted(
+            [(entry, True) for entry in entries]
+            + [(entry, False) for entry in next_decade],
+            key=lambda item: item[0].start,
+        )
+        candidates = []
+        for i, (first, first_is_own) in enumerate(merged):
+            for second, second_is_own in merged[i + 1 : i + 1 + _WINDOW]:
+                if second.start > first.end:
+                    break
+                if not first_is_own and not second_is_own:
+                    continue
+                if first.families & second.families:
+                    continue
+                candidate = self.__compare(first, second)
+                if candidate is not None:
+                    candidates.append(candidate)
+        return candidates
+
+    def __compare(self, first: _Entry, second: _Entry) -> DuplicateCandidate | None:
+        name_similarity = _name_similarity(first.name, second.name)
+        if name_similarity < self.__min_name_similarity:
+            return None
+
+        overlap = min(first.end, second.end) - max(first.start, second.start)
+        shortest = min(first.end - first.start, second.end - second.start)
+        if first.gramps_id > second.gramps_id:
+            first, second = second, first
+        return DuplicateCandidate(
+            first.person, second.person, name_similarity, overlap / shortest
+        )
+
+
+@lru_cache(maxsize=65536)
+def _name_similarity(first: str, second: str) -> float:
+    """Похожесть имен; одинаковые пары имен встречаются в блоке многократно."""
+    return SequenceMatcher(None, first, second).ratio()
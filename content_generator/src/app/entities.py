@@ -4,28 +4,43 @@ import datetime
 import random
 from datetime import date, timedelta
 from enum import Enum
-from functools import cached_property
+from functools import cache, cached_property
 from operator import attrgetter
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from src.app.family_graph import FamilyGraph
+    from src.app.interfaces.text_source import ITextSource
+    from src.app.lifespan_index import LifespanIndex
+    from src.app.relation_store import RelationStore
+
 
 class GrampsTree:
     def __init__(
         self,
         persons: dict[GrampsId, Person],
         media: dict[GrampsId, Media],
-        relations: set[Relation],
+        relations: Iterable[Relation],
         families: dict[GrampsId, Family],
     ):
+        from src.app.relation_store import RelationStore
+
         self.__persons = persons
         self.__media = media
-        self.__relations = relations
+        self.__relations = (
+            relations
+            if isinstance(relations, RelationStore)
+            else RelationStore(relations)
+        )
         self.__families = families
 
     @property
-    def relations(self):
+    def relations(self) -> RelationStore:
         return self.__relations
 
     @property
@@ -40,6 +55,31 @@ class GrampsTree:
     def media(self) -> dict[GrampsId, Media]:
         return self.__media
 
+    @cached_property
+    def lifespans(self) -> LifespanIndex:
+        from src.app.lifespan_index import LifespanIndex
+
+        return LifespanIndex(self.__persons.values())
+
+    @cached_property
+    def graph(self) -> FamilyGraph:
+        from src.app.family_graph import FamilyGraph
+
+        return FamilyGraph(self)
+
+    def invalidate_indexes(self):
+        """Сбрасывает индексы, построенные по персонам, после их изменения."""
+        self.__dict__.pop("lifespans", None)
+        self.__dict__.pop("graph", None)
+
+    def alive_at(self, day: date, *, with_estimated: bool = False) -> list[Person]:
+        return self.lifespans.alive_at(day, with_estimated=with_estimated)
+
+    def alive_between(
+        self, start: date, end: date, *, with_estimated: bool = False
+    ) -> list[Person]:
+        return self.lifespans.alive_between(start, end, with_estimated=with_estimated)
+
 
 class DateQuality(Enum):
     EXACTLY = 0
@@ -53,28 +93,69 @@ class DateQuality(Enum):
         return "???"
 
 
+@cache
+def build_today() -> date:
+    """Сегодняшняя дата, одна на всю сборку.
+
+    По ней решается, жива ли персона, на всех страницах одинаково, даже если
+    сборка идет через полночь. Режим --watch сбрасывает ее перед каждым
+    обновлением через build_today.cache_clear().
+    """
+    return datetime.datetime.now(tz=datetime.UTC).date()
+
+
+@cache
+def _format_date(day: date, quality: DateQuality) -> str:
+    # strftime с русской локалью заметно дороже поиска в кеше, а различных
+    # дат в дереве на порядки меньше, чем их выводов на страницах.
+    return f"{quality}{day.strftime('%d %B %Y')}"
+
+
+# (день, месяц, год, качество) из базы Gramps -> общий для всех событий Date.
+_PARSED_DATES: dict[tuple[int, int, int, int], Date] = {}
+
+
 class Date:
+    """Дата события с качеством.
+
+    Даты из базы интернируются: одинаковые dateval и quality дают один и тот
+    же объект, поэтому Date неизменяем. Строка даты форматируется один раз
+    на пару (дата, качество); локаль для месяцев выбирается до генерации.
+    """
+
+    __slots__ = ("__date", "__quality")
+
     def __init__(self, date: date, quality: DateQuality):
         self.__date = date
         self.__quality = quality
 
     @staticmethod
     def from_gramps_json_date(raw_date: dict) -> Date:
-        logger.debug(f"Parsing date: {raw_date}")
-        year = raw_date["dateval"][2]
-        month = raw_date["dateval"][1]
-        day = raw_date["dateval"][0]
-        if day == 0:
-            day = 1
-        if month == 0:
-            month = 1
+        """Date из json даты Gramps.
+
+        >>> raw_date = {"dateval": [0, 3, 1901, False], "quality": 1}
+        >>> parsed = Date.from_gramps_json_date(raw_date)
+        >>> parsed.date, str(parsed).startswith("≈ 01 ")
+        (datetime.date(1901, 3, 1), True)
+        >>> parsed is Date.from_gramps_json_date(dict(raw_date))
+        True
+        """
+        day, month, year = raw_date["dateval"][:3]
+        key = (day, month, year, raw_date["quality"])
+        parsed = _PARSED_DATES.get(key)
+        if parsed is not None:
+            return parsed
+        logger.debug("Parsing date: {}", raw_date)
         try:
-            return Date(
-                date(year, month, day), quality=DateQuality(raw_date["quality"])
+            parsed = Date(
+                date(year, month or 1, day or 1),
+                quality=DateQuality(raw_date["quality"]),
             )
         except ValueError as message:
             logger.error(f"{message} for raw_date {raw_date}")
             raise ValueError(message) from message
+        _PARSED_DATES[key] = parsed
+        return parsed
 
     @property
     def date(self) -> date:
@@ -84,12 +165,8 @@ class Date:
     def quality(self) -> DateQuality:
         return self.__quality
 
-    @quality.setter
-    def quality(self, quality: DateQuality):
-        self.__quality = quality
-
     def __str__(self) -> str:
-        return f"{self.quality}{self.date.strftime('%d %B %Y')}"
+        return _format_date(self.__date, self.__quality)
 
 
 class GrampsId(str):
@@ -97,7 +174,18 @@ class GrampsId(str):
 
 
 class Event:
-    def __init__(self, gramps_id: GrampsId, date: Date, description: str):
+    """Событие персоны.
+
+    Вместо описания можно передать ITextSource: тогда описание не хранится
+    в дереве и запрашивается у него при каждом обращении.
+    """
+
+    def __init__(
+        self,
+        gramps_id: GrampsId,
+        date: Date,
+        description: str | ITextSource,
+    ):
         self.__description = description
         self.__date = date
         self.__id = GrampsId(gramps_id)
@@ -108,7 +196,9 @@ class Event:
 
     @property
     def description(self) -> str:
-        return self.__description
+        if isinstance(self.__description, str):
+            return self.__description
+        return self.__description.event_description(self.__id)
 
     @property
     def date(self) -> Date:
@@ -116,7 +206,9 @@ class Event:
 
 
 class Note:
-    def __init__(self, gramps_id: GrampsId, content: str):
+    """Заметка персоны; вместо текста, как и у Event, может быть ITextSource."""
+
+    def __init__(self, gramps_id: GrampsId, content: str | ITextSource):
         self.__id = gramps_id
         self.__content = content
 
@@ -126,7 +218,9 @@ class Note:
 
     @property
     def content(self) -> str:
-        return self.__content
+        if isinstance(self.__content, str):
+            return self.__content
+        return self.__content.note_text(self.__id)
 
 
 class Gender(Enum):
@@ -217,7 +311,7 @@ class Person:
         return self.__events
 
     def __str__(self):
-        if self.death_day.date > datetime.datetime.now(tz=datetime.UTC).date():
+        if self.death_day.date > build_today():
             right_year = "н. в."
         else:
             right_year = self.death_day.date.year
@@ -306,12 +400,22 @@ class RelationType(Enum):
     SIMPLE = 3
 
 
+def _as_gramps_id(value: str) -> GrampsId:
+    """GrampsId без новой копии строки, если value уже GrampsId.
+
+    >>> gramps_id = GrampsId("I1")
+    >>> _as_gramps_id(gramps_id) is gramps_id
+    True
+    """
+    return value if isinstance(value, GrampsId) else GrampsId(value)
+
+
 class Relation:
     def __init__(self, first_person_id, type_of_relation, other_person_id, family_id):
-        self.first_person_id = GrampsId(first_person_id)
+        self.first_person_id = _as_gramps_id(first_person_id)
         self.type_of_relation = type_of_relation
-        self.other_person_id = GrampsId(other_person_id)
-        self.family_id = GrampsId(family_id)
+        self.other_person_id = _as_gramps_id(other_person_id)
+        self.family_id = _as_gramps_id(family_id)
 
     def __eq__(self, other):
         if (
@@ -324,7 +428,14 @@ class Relation:
         return False
 
     def __hash__(self):
-        return hash(self.family_id)
+        return hash(
+            (
+                self.first_person_id,
+                self.type_of_relation,
+                self.other_person_id,
+                self.family_id,
+            )
+        )
 
 
 class EventType(Enum):
@@ -377,11 +488,20 @@ class EventType(Enum):
     STILLBIRTH = 45
 
 
+class Thumbnail(NamedTuple):
+    """Уменьшенная копия изображения медиа в галерее."""
+
+    path: Path
+    width: int
+    height: int
+
+
 class Media:
     def __init__(self, path: Path, description: str):
         self.__persons: list[Person] = []
         self.__description = description
         self.__path = path
+        self.__thumbnails: list[Thumbnail] = []
 
     @property
     def path(self) -> Path:
@@ -391,6 +511,15 @@ class Media:
     def path(self, value: Path):
         self.__path = value
 
+    @property
+    def thumbnails(self) -> list[Thumbnail]:
+        """Копии в галерее по возрастанию ширины; пусто до Gallery."""
+        return self.__thumbnails
+
+    @thumbnails.setter
+    def thumbnails(self, value: list[Thumbnail]):
+        self.__thumbnails = value
+
     @property
     def description(self):
         return self.__description
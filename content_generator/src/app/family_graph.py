@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+from src.app.entities import GrampsId, RelationType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from src.app.entities import Family, GrampsTree, Person
+
+# Номер отсутствующего родителя семьи.
+NO_PERSON = -1
+
+
+class _Adjacency:
+    """Списки соседей вершин 0..size-1 в компактной форме (CSR).
+
+    Соседи вершины i лежат в targets[offsets[i]:offsets[i + 1]] в том
+    порядке, в котором пары передавались в конструктор.
+
+    >>> adjacency = _Adjacency(3, [(2, 0), (0, 1), (2, 1)])
+    >>> list(adjacency[2]), list(adjacency[1])
+    ([0, 1], [])
+    """
+
+    def __init__(self, size: int, pairs: Iterable[tuple[int, int]]):
+        pairs = list(pairs)
+        self.__offsets = array("l", [0] * (size + 1))
+        for source, _ in pairs:
+            self.__offsets[source + 1] += 1
+        for i in range(size):
+            self.__offsets[i + 1] += self.__offsets[i]
+        self.__targets = array("l", [0] * len(pairs))
+        filled = array("l", self.__offsets[:-1])
+        for source, target in pairs:
+            self.__targets[filled[source]] = target
+            filled[source] += 1
+
+    def __getitem__(self, vertex: int) -> array:
+        return self.__targets[self.__offsets[vertex] : self.__offsets[vertex + 1]]
+
+
+class FamilyGraph:
+    """Персоны и семьи дерева под плотными целыми номерами.
+
+    Номера идут в порядке словарей GrampsTree.persons и GrampsTree.families,
+    связи хранятся массивами array. Обходы графа работают с номерами и
+    переводят их в персоны и GrampsId только для результата.
+
+    Связи родитель-ребенок и супругов взяты из Relation: по ним TreeRender
+    ищет детей и партнеров. Состав семей взят из Family.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__persons: list[Person] = list(gramps_tree.persons.values())
+        self.__families: list[Family] = list(gramps_tree.families.values())
+        self.__person_index = {
+            gramps_id: i for i, gramps_id in enumerate(gramps_tree.persons)
+        }
+        self.__family_index = {
+            gramps_id: i for i, gramps_id in enumerate(gramps_tree.families)
+        }
+
+        self.__fathers = array("l", [NO_PERSON] * len(self.__families))
+        self.__mothers = array("l", [NO_PERSON] * len(self.__families))
+        as_parent, as_child, children = [], [], []
+        for family_i, family in enumerate(self.__families):
+            if family.father is not None:
+                self.__fathers[family_i] = self.index(family.father.gramps_id)
+            if family.mother is not None:
+                self.__mothers[family_i] = self.index(family.mother.gramps_id)
+            as_parent.extend(
+                (self.index(parent.gramps_id), family_i) for parent in family.parents
+            )
+            for child in family.children:
+                child_i = self.index(child.gramps_id)
+                as_child.append((child_i, family_i))
+                children.append((family_i, child_i))
+        self.__families_as_parent = _Adjacency(len(self.__persons), as_parent)
+        self.__families_as_child = _Adjacency(len(self.__persons), as_child)
+        self.__children = _Adjacency(len(self.__families), children)
+
+        partners, born = [], []
+        for relation in gramps_tree.relations:
+            first = self.__person_index.get(relation.first_person_id)
+            other = self.__person_index.get(relation.other_person_id)
+            if first is None or other is None:
+                continue
+            if relation.type_of_relation is RelationType.MARRIAGE:
+                partners.extend(((first, other), (other, first)))
+            elif relation.type_of_relation is RelationType.BIRTH_FROM:
+                born.append((other, first))
+        self.__partners = _Adjacency(len(self.__persons), partners)
+        self.__born_children = _Adjacency(len(self.__persons), born)
+
+    def index(self, gramps_id: GrampsId) -> int:
+        return self.__person_index[gramps_id]
+
+    def family_index(self, gramps_id: GrampsId) -> int:
+        return self.__family_index[gramps_id]
+
+    def person(self, person: int) -> Person:
+        return self.__persons[person]
+
+    def family(self, family: int) -> Family:
+        return self.__families[family]
+
+    def father(self, family: int) -> int:
+        return self.__fathers[family]
+
+    def mother(self, family: int) -> int:
+        return self.__mothers[family]
+
+    def children(self, family: int) -> array:
+        return self.__children[family]
+
+    def families_as_parent(self, person: int) -> array:
+        """Семьи, где персона - родитель, в порядке GrampsTree.families."""
+        return self.__families_as_parent[person]
+
+    def families_as_child(self, person: int) -> array:
+        """Семьи, где персона - ребенок, в порядке GrampsTree.families."""
+        return self.__families_as_child[person]
+
+    def partners(self, person: int) -> array:
+        """Супруги по связям MARRIAGE; супруг нескольких семей повторяется."""
+        return self.__partners[person]
+
+    def born_children(self, person: int) -> array:
+        """Дети, чья связь BIRTH_FROM указывает на персону."""
+        return self.__born_children[person]
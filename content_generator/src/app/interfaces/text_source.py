@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+
+class ITextSource(ABC):
+    """Откуда Note и Event берут тексты, которые не хранятся в дереве."""
+
+    @abstractmethod
+    def note_text(self, note_id: str) -> str:
+        pass
+
+    @abstractmethod
+    def event_description(self, event_id: str) -> str:
+        pass
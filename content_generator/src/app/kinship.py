@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from enum import Enum
+from operator import attrgetter
+from typing import TYPE_CHECKING, NamedTuple
+
+from src.app.entities import Gender, GrampsId
+from src.app.family_graph import NO_PERSON
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from src.app.entities import GrampsTree, Person
+
+
+class KinshipStep(Enum):
+    PARENT = 0
+    CHILD = 1
+    SPOUSE = 2
+
+
+class Kinship(NamedTuple):
+    """Кратчайший путь родства от одной персоны к другой.
+
+    label описывает вторую персону относительно первой: «жена брата».
+    """
+
+    persons: list[GrampsId]
+    steps: list[KinshipStep]
+    label: str
+
+
+# (поколений вверх, поколений вниз) -> (мужской род, женский род)
+_BLOOD_TERMS = {
+    (1, 0): (("отец", "отца"), ("мать", "матери")),
+    (0, 1): (("сын", "сына"), ("дочь", "дочери")),
+    (1, 1): (("брат", "брата"), ("сестра", "сестры")),
+    (2, 1): (("дядя", "дяди"), ("тётя", "тёти")),
+    (1, 2): (("племянник", "племянника"), ("племянница", "племянницы")),
+    (2, 2): (
+        ("двоюродный брат", "двоюродного брата"),
+        ("двоюродная сестра", "двоюродной сестры"),
+    ),
+    (3, 1): (
+        ("двоюродный дед", "двоюродного деда"),
+        ("двоюродная бабушка", "двоюродной бабушки"),
+    ),
+    (1, 3): (
+        ("внучатый племянник", "внучатого племянника"),
+        ("внучатая племянница", "внучатой племянницы"),
+    ),
+    (3, 2): (
+        ("двоюродный дядя", "двоюродного дяди"),
+        ("двоюродная тётя", "двоюродной тёти"),
+    ),
+    (2, 3): (
+        ("двоюродный племянник", "двоюродного племянника"),
+        ("двоюродная племянница", "двоюродной племянницы"),
+    ),
+    (3, 3): (
+        ("троюродный брат", "троюродного брата"),
+        ("троюродная сестра", "троюродной сестры"),
+    ),
+}
+_SPOUSE_TERMS = (("муж", "мужа"), ("жена", "жены"))
+_IN_LAW_TERMS = {
+    "отец жены": "тесть",
+    "мать жены": "тёща",
+    "отец мужа": "свёкор",
+    "мать мужа": "свекровь",
+    "брат жены": "шурин",
+    "сестра жены": "свояченица",
+    "брат мужа": "деверь",
+    "сестра мужа": "золовка",
+    "муж дочери": "зять",
+    "муж сестры": "зять",
+    "жена сына": "невестка",
+    "жена брата": "невестка",
+    "муж матери": "отчим",
+    "жена отца": "мачеха",
+    "сын мужа": "пасынок",
+    "сын жены": "пасынок",
+    "дочь мужа": "падчерица",
+    "дочь жены": "падчерица",
+}
+
+
+# (предок, женщина) -> прямой родственник через два поколения и его падеж.
+_LINEAL_TERMS = {
+    (True, False): ("дед", "деда"),
+    (True, True): ("бабушка", "бабушки"),
+    (False, False): ("внук", "внука"),
+    (False, True): ("внучка", "внучки"),
+}
+_DISTANT_TERMS = (
+    ("дальний родственник", "дальнего родственника"),
+    ("дальняя родственница", "дальней родственницы"),
+)
+
+
+def _blood_term(up: int, down: int, gender: Gender) -> tuple[str, str]:
+    """Название родственника и его родительный падеж.
+
+    >>> _blood_term(4, 0, Gender.FEMALE)
+    ('прапрабабушка', 'прапрабабушки')
+    >>> _blood_term(2, 2, Gender.MALE)
+    ('двоюродный брат', 'двоюродного брата')
+    """
+    female = gender is Gender.FEMALE
+    if down == 0 and up >= 2:  # noqa: PLR2004
+        return _lineal_term(up, ancestor=True, female=female)
+    if up == 0 and down >= 2:  # noqa: PLR2004
+        return _lineal_term(down, ancestor=False, female=female)
+    return _BLOOD_TERMS.get((up, down), _DISTANT_TERMS)[female]
+
+
+def _lineal_term(generations: int, *, ancestor: bool, female: bool) -> tuple[str, str]:
+    """Предок или потомок через generations поколений: прадед, правнучка."""
+    prefix = "пра" * (generations - 2)
+    term, genitive = _LINEAL_TERMS[ancestor, female]
+    return f"{prefix}{term}", f"{prefix}{genitive}"
+
+
+def village_founder(gramps_tree: GrampsTree) -> Person | None:
+    """Основатель деревни - самый старший мужчина дерева."""
+    return min(
+        (person for person in gramps_tree.persons.values() if person.is_male()),
+        key=attrgetter("birth_day.date"),
+        default=None,
+    )
+
+
+class KinshipCalculator:
+    """Поиск родства между персонами двунаправленным обходом в ширину.
+
+    Связи родитель-ребенок и супругов берутся из семей графа
+    GrampsTree.graph: соседи персоны - родители семей, где она ребенок,
+    а также дети и второй родитель семей, где она родитель. Семьи и дети
+    перебираются в порядке дерева, поэтому из равных по длине путей всегда
+    находится один и тот же.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__graph = gramps_tree.graph
+
+    def __neighbours(self, vertex: int) -> Iterator[tuple[int, int]]:
+        """Соседи персоны и шаг к каждому из них."""
+        graph = self.__graph
+        for family in graph.families_as_child(vertex):
+            for parent in (graph.father(family), graph.mother(family)):
+                if parent != NO_PERSON:
+                    yield parent, KinshipStep.PARENT.value
+        for family in graph.families_as_parent(vertex):
+            for child in graph.children(family):
+                yield child, KinshipStep.CHILD.value
+            father, mother = graph.father(family), graph.mother(family)
+            if NO_PERSON not in (father, mother):
+                spouse = mother if vertex == father else father
+                yield spouse, KinshipStep.SPOUSE.value
+
+    def kinship(self, from_id: GrampsId, to_id: GrampsId) -> Kinship | None:
+        """Кратчайшее родство или None, если персоны не связаны."""
+        source, target = self.__graph.index(from_id), self.__graph.index(to_id)
+        if source == target:
+            return Kinship([from_id], [], "это один и тот же человек")
+
+        # Для каждой посещенной вершины - предыдущая вершина и шаг к ней.
+        forward: dict[int, tuple[int, int]] = {source: (-1, -1)}
+        backward: dict[int, tuple[int, int]] = {target: (-1, -1)}
+        forward_frontier, backward_frontier = [source], [target]
+        forward_depth = {source: 0}
+        backward_depth = {target: 0}
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, met = self.__expand(
+                    forward_frontier, forward, forward_depth, backward
+                )
+            else:
+                backward_frontier, met = self.__expand(
+                    backward_frontier, backward, backward_depth, forward
+                )
+            if met:
+                middle = min(met, key=lambda v: forward_depth[v] + backward_depth[v])
+                return self.__build(self.__join(forward, backward, middle))
+        return None
+
+    def relations_to(self, root_id: GrampsId) -> dict[GrampsId, Kinship]:
+        """Родство всех связанных с root_id персон, одним обходом в ширину."""
+        root = self.__graph.index(root_id)
+        visited: dict[int, tuple[int, int]] = {root: (-1, -1)}
+        frontier = [root]
+        while frontier:
+            next_frontier = []
+            for vertex in frontier:
+                for neighbour, step in self.__neighbours(vertex):
+                    if neighbour not in visited:
+                        visited[neighbour] = (vertex, step)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        relations = {}
+        for person in visited:
+            if person == root:
+                continue
+            path = []
+            vertex = person
+            while vertex != -1:
+                previous, step = visited[vertex]
+                path.append((vertex, step))
+                vertex = previous
+            path.reverse()
+            relations[self.__graph.person(path[-1][0]).gramps_id] = self.__build(path)
+        return relations
+
+    def __expand(
+        self,
+        frontier: list[int],
+        visited: dict[int, tuple[int, int]],
+        depth: dict[int, int],
+        other_visited: dict[int, tuple[int, int]],
+    ) -> tuple[list[int], list[int]]:
+        next_frontier, met = [], []
+        for vertex in frontier:
+            for neighbour, step in self.__neighbours(vertex):
+                if neighbour in visited:
+                    continue
+                visited[neighbour] = (vertex, step)
+                depth[neighbour] = depth[vertex] + 1
+                next_frontier.append(neighbour)
+                if neighbour in other_visited:
+                    met.append(neighbour)
+        return next_frontier, met
+
+    @staticmethod
+    def __join(
+        forward: dict[int, tuple[int, int]],
+        backward: dict[int, tuple[int, int]],
+        middle: int,
+    ) -> list[tuple[int, int]]:
+        """Склеивает путь: (вершина, шаг, которым в нее пришли)."""
+        path = []
+        vertex = middle
+        while vertex != -1:
+            previous, step = forward[vertex]
+            path.append((vertex, step))
+            vertex = previous
+        path.reverse()
+
+        vertex = middle
+        while True:
+            previous, step = backward[vertex]
+            if previous == -1:
+                break
+            # Обратная сторона хранит шаг от previous к vertex, а нужен обратный.
+            path.append((previous, _REVERSED_STEPS[step]))
+            vertex = previous
+        return path
+
+    def __build(self, path: list[tuple[int, int]]) -> Kinship:
+        steps = [KinshipStep(step) for _, step in path[1:]]
+        persons = [self.__graph.person(vertex).gramps_id for vertex, _ in path]
+        return Kinship(persons, steps, self.__label(path))
+
+    def __label(self, path: list[tuple[int, int]]) -> str:
+        terms: list[tuple[str, str]] = []
+        up = down = 0
+        for i, (vertex, step) in enumerate(path[1:], start=1):
+            gender = self.__graph.person(vertex).gender
+            if step == KinshipStep.PARENT.value:
+                up += 1
+            elif step == KinshipStep.CHILD.value:
+                down += 1
+            if step == KinshipStep.SPOUSE.value:
+                terms.append(_SPOUSE_TERMS[gender is Gender.FEMALE])
+                continue
+            next_step = path[i + 1][1] if i + 1 < len(path) else None
+            if next_step != step and not (
+                step == KinshipStep.PARENT.value
+                and next_step == KinshipStep.CHILD.value
+            ):
+                terms.append(_blood_term(up, down, gender))
+                up = down = 0
+
+        label = " ".join(
+            [terms[-1][0]] + [genitive for _, genitive in reversed(terms[:-1])]
+        )
+        return _IN_LAW_TERMS.get(label, label)
+
+
+_REVERSED_STEPS = {
+    KinshipStep.PARENT.value: KinshipStep.CHILD.value,
+    KinshipStep.CHILD.value: KinshipStep.PARENT.value,
+    KinshipStep.SPOUSE.value: KinshipStep.SPOUSE.value,
+}
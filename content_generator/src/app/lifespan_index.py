@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from itertools import takewhile
+from operator import itemgetter
+from typing import TYPE_CHECKING, NamedTuple
+
+from src.app.entities import DateQuality, Person
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import date
+
+DAY_IN_YEAR = 365
+BIRTHDAY_ERROR_DAYS = 5 * DAY_IN_YEAR
+DEATHDAY_ERROR_DAYS = 10 * DAY_IN_YEAR
+
+
+class _Interval(NamedTuple):
+    start: int
+    end: int
+    person: Person
+
+
+class _IntervalNode:
+    """Узел центрированного интервального дерева.
+
+    Хранит интервалы, содержащие center, упорядоченные по началу и по концу.
+    """
+
+    def __init__(self, intervals: list[_Interval]):
+        endpoints = sorted(p for i in intervals for p in (i.start, i.end))
+        self.center = endpoints[len(endpoints) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval.end < self.center:
+                left.append(interval)
+            elif interval.start > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=itemgetter(0))
+        self.by_end = sorted(here, key=itemgetter(1), reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def starting_until(self, end: int) -> list[Person]:
+        """Персоны интервалов узла, начавшихся не позже end."""
+        return [
+            interval.person
+            for interval in takewhile(lambda i: i.start <= end, self.by_start)
+        ]
+
+    def ending_from(self, start: int) -> list[Person]:
+        """Персоны интервалов узла, закончившихся не раньше start."""
+        return [
+            interval.person
+            for interval in takewhile(lambda i: i.end >= start, self.by_end)
+        ]
+
+
+class _IntervalTree:
+    def __init__(self, intervals: list[_Interval]):
+        self.__root = _IntervalNode(intervals) if intervals else None
+
+    def overlapping(self, start: int, end: int) -> list[Person]:
+        """Все интервалы, пересекающиеся с [start, end], за O(log n + k)."""
+        found = []
+        stack = [self.__root] if self.__root is not None else []
+        while stack:
+            node = stack.pop()
+            if end < node.center:
+                found.extend(node.starting_until(end))
+                children = (node.left,)
+            elif start > node.center:
+                found.extend(node.ending_from(start))
+                children = (node.right,)
+            else:
+                found.extend(interval.person for interval in node.by_start)
+                children = (node.left, node.right)
+            stack.extend(child for child in children if child is not None)
+        return found
+
+
+class LifespanIndex:
+    """Индекс периодов жизни персон для запросов «кто жил в это время».
+
+    Ведется два интервальных дерева. В первом жизнь персоны - это отрезок
+    между указанными датами рождения и смерти. Во втором неточные
+    (DateQuality.ESTIMATED) даты расширены на погрешность: рождение раньше на
+    BIRTHDAY_ERROR_DAYS, смерть позже на DEATHDAY_ERROR_DAYS. Так же неточность
+    показывается градиентом на большом дереве.
+    """
+
+    def __init__(self, persons: Iterable[Person]):
+        nominal, widened = [], []
+        for person in persons:
+            birth = person.birth_day.date.toordinal()
+            death = person.death_day.date.toordinal()
+            nominal.append(_Interval(birth, death, person))
+            if person.birth_day.quality is DateQuality.ESTIMATED:
+                birth -= BIRTHDAY_ERROR_DAYS
+            if person.death_day.quality is DateQuality.ESTIMATED:
+                death += DEATHDAY_ERROR_DAYS
+            widened.append(_Interval(birth, death, person))
+        self.__nominal = _IntervalTree(nominal)
+        self.__widened = _IntervalTree(widened)
+
+    def alive_at(self, day: date, *, with_estimated: bool = False) -> list[Person]:
+        return self.alive_between(day, day, with_estimated=with_estimated)
+
+    def alive_between(
+        self, start: date, end: date, *, with_estimated: bool = False
+    ) -> list[Person]:
+        """Персоны, жившие хотя бы день из [start, end], по дате рождения.
+
+        with_estimated добавляет тех, кто мог жить в это время с учетом
+        погрешности неточных дат.
+        """
+        tree = self.__widened if with_estimated else self.__nominal
+        return sorted(
+            tree.overlapping(start.toordinal(), end.toordinal()),
+            key=lambda person: (person.birth_day.date, person.gramps_id),
+        )
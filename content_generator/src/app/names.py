@@ -0,0 +1,96 @@
+import re
+from functools import lru_cache
+
+_TRANSLITERATION = str.maketrans(
+    {
+        "а": "a",
+        "б": "b",
+        "в": "v",
+        "г": "g",
+        "д": "d",
+        "е": "e",
+        "ё": "e",
+        "ж": "zh",
+        "з": "z",
+        "и": "i",
+        "й": "i",
+        "к": "k",
+        "л": "l",
+        "м": "m",
+        "н": "n",
+        "о": "o",
+        "п": "p",
+        "р": "r",
+        "с": "s",
+        "т": "t",
+        "у": "u",
+        "ф": "f",
+        "х": "kh",
+        "ц": "ts",
+        "ч": "ch",
+        "ш": "sh",
+        "щ": "sch",
+        "ъ": "",
+        "ы": "y",
+        "ь": "",
+        "э": "e",
+        "ю": "yu",
+        "я": "ya",
+        # Марийские буквы.
+        "ӓ": "a",
+        "ӧ": "o",
+        "ӱ": "u",
+        "ӹ": "y",
+        "ҥ": "ng",
+    }
+)
+_NOT_LATIN = re.compile("[^a-z]+")
+# Окончания, отличающие мужскую и женскую форму фамилии, от длинных к коротким.
+_GENDER_ENDINGS = ("skaya", "skii", "aya", "yi", "ii", "oi", "a")
+_PHONETIC = (("kh", "h"), ("zh", "j"), ("sch", "sh"), ("ts", "s"), ("f", "v"))
+_VOWELS = re.compile("[aeiouy]")
+_REPEATS = re.compile(r"(.)\1+")
+MAX_NGRAM = 12
+
+
+def name_tokens(name: str) -> list[str]:
+    """Слова имени латиницей в нижнем регистре.
+
+    Кириллица транслитерируется, поэтому «Навальный» и «navalnyi» дают
+    одно и то же слово.
+
+    >>> name_tokens("Алексей Навальный")
+    ['aleksei', 'navalnyi']
+    >>> name_tokens("  Пётр-Ӱдыр NAVALNYI")
+    ['petr', 'udyr', 'navalnyi']
+    """
+    latin = name.lower().translate(_TRANSLITERATION)
+    return [token for token in _NOT_LATIN.split(latin) if token]
+
+
+def edge_ngrams(token: str, min_length: int = 2) -> list[str]:
+    """Префиксы слова, по которым его можно найти при наборе.
+
+    >>> edge_ngrams("petr")
+    ['pe', 'pet', 'petr']
+    """
+    return [token[:i] for i in range(min_length, min(len(token), MAX_NGRAM) + 1)]
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(token: str) -> str:
+    """Ключ слова из name_tokens, одинаковый для разных написаний и родов.
+
+    >>> phonetic_key("yandushev") == phonetic_key("yandusheva")
+    True
+    >>> phonetic_key("ashtubai"), phonetic_key("eshtubai")
+    ('ashtb', 'eshtb')
+    """
+    for ending in _GENDER_ENDINGS:
+        if token.endswith(ending) and len(token) > len(ending) + 2:
+            token = token[: -len(ending)]
+            break
+    for spelling, sound in _PHONETIC:
+        token = token.replace(spelling, sound)
+    token = token[0] + _VOWELS.sub("", token[1:])
+    return _REPEATS.sub(r"\1", token)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import TYPE_CHECKING
+
+from src.app.entities import GrampsId, Relation, RelationType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_TYPES = {type_of_relation.value: type_of_relation for type_of_relation in RelationType}
+
+
+class RelationStore:
+    """Связи дерева столбцами вместо множества объектов Relation.
+
+    Персоны и семьи хранятся номерами в общей таблице строк, а связь - это
+    строка четырех параллельных массивов: первая персона, тип, вторая
+    персона и семья. Строки отсортированы по персонам без дублей, и для
+    каждой персоны в компактном индексе (CSR) лежат номера ее строк, по
+    ним of_person отвечает без перебора всех связей.
+
+    add только дописывает строку, а сортировка откладывается до первого
+    чтения. Дерево читают из нескольких потоков, поэтому сортировка идет под
+    блокировкой. Дописывать связи одновременно с чтением нельзя.
+    Интерфейс совместим с прежним set[Relation]: add, update, clear, in,
+    len и обход, который создает Relation на лету.
+
+    >>> store = RelationStore([Relation("I1", RelationType.MARRIAGE, "I2", "F1")])
+    >>> store.add(Relation("I3", RelationType.BIRTH_FROM, "I1", "F1"))
+    >>> store.add(Relation("I1", RelationType.MARRIAGE, "I2", "F1"))
+    >>> len(store)
+    2
+    >>> [r.first_person_id for r in store.of_person("I1", RelationType.BIRTH_FROM)]
+    ['I3']
+    >>> import pickle
+    >>> len(pickle.loads(pickle.dumps(store)).of_person("I1"))
+    2
+    """
+
+    def __init__(self, relations: Iterable[Relation] = ()):
+        self.__lock = threading.Lock()
+        self.clear()
+        self.update(relations)
+
+    def add(self, relation: Relation):
+        self.__first.append(self.__code(relation.first_person_id))
+        self.__types.append(relation.type_of_relation.value)
+        self.__other.append(self.__code(relation.other_person_id))
+        self.__families.append(self.__code(relation.family_id))
+        self.__sorted = False
+
+    def update(self, relations: Iterable[Relation]):
+        for relation in relations:
+            self.add(relation)
+        self.__sort()
+
+    def clear(self):
+        self.__ids: list[GrampsId] = []
+        self.__codes: dict[str, int] = {}
+        self.__first = array("l")
+        self.__types = array("b")
+        self.__other = array("l")
+        self.__families = array("l")
+        # Строки персоны i: rows[offsets[i]:offsets[i + 1]].
+        self.__offsets = array("l", [0])
+        self.__rows = array("l")
+        self.__sorted = True
+
+    def of_person(
+        self, gramps_id: str, type_of_relation: RelationType | None = None
+    ) -> list[Relation]:
+        """Связи, в которых персона первая или вторая."""
+        self.__sort()
+        code = self.__codes.get(gramps_id)
+        if code is None:
+            return []
+        return [
+            self.__relation(row)
+            for row in self.__rows[self.__offsets[code] : self.__offsets[code + 1]]
+            if type_of_relation is None or self.__types[row] == type_of_relation.value
+        ]
+
+    def __contains__(self, relation: object) -> bool:
+        if not isinstance(relation, Relation):
+            return False
+        return relation in self.of_person(
+            relation.first_person_id, relation.type_of_relation
+        )
+
+    def __iter__(self) -> Iterator[Relation]:
+        self.__sort()
+        return (self.__relation(row) for row in range(len(self.__types)))
+
+    def __len__(self) -> int:
+        self.__sort()
+        return len(self.__types)
+
+    def __getstate__(self) -> dict:
+        self.__sort()
+        state = self.__dict__.copy()
+        del state["_RelationStore__lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def __code(self, gramps_id: str) -> int:
+        code = self.__codes.get(gramps_id)
+        if code is None:
+            code = len(self.__ids)
+            self.__codes[gramps_id] = code
+            self.__ids.append(
+                gramps_id if isinstance(gramps_id, GrampsId) else GrampsId(gramps_id)
+            )
+        return code
+
+    def __sort(self):
+        if self.__sorted:
+            return
+        with self.__lock:
+            if not self.__sorted:
+                self.__sort_rows()
+
+    def __sort_rows(self):
+        rows = sorted(
+            set(
+                zip(
+                    self.__first,
+                    self.__types,
+                    self.__other,
+                    self.__families,
+                    strict=True,
+                )
+            )
+        )
+        self.__first = array("l", (row[0] for row in rows))
+        self.__types = array("b", (row[1] for row in rows))
+        self.__other = array("l", (row[2] for row in rows))
+        self.__families = array("l", (row[3] for row in rows))
+
+        pairs = [(row[0], number) for number, row in enumerate(rows)]
+        pairs.extend(
+            (row[2], number) for number, row in enumerate(rows) if row[2] != row[0]
+        )
+        pairs.sort()
+        offsets = array("l", [0] * (len(self.__ids) + 1))
+        for person, _ in pairs:
+            offsets[person + 1] += 1
+        for code in range(len(self.__ids)):
+            offsets[code + 1] += offsets[code]
+        self.__offsets = offsets
+        self.__rows = array("l", (number for _, number in pairs))
+        self.__sorted = True
+
+    def __relation(self, row: int) -> Relation:
+        return Relation(
+            self.__ids[self.__first[row]],
+            _TYPES[self.__types[row]],
+            self.__ids[self.__other[row]],
+            self.__ids[self.__families[row]],
+        )
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import TYPE_CHECKING, NamedTuple
+
+from src.app.names import name_tokens, phonetic_key
+
+if TYPE_CHECKING:
+    from src.app.entities import GrampsTree, Person
+
+# Годы ревизий по их номеру.
+REVISION_YEARS = {
+    0: 1719,
+    1: 1722,
+    2: 1745,
+    3: 1762,
+    4: 1782,
+    5: 1795,
+    6: 1811,
+    7: 1816,
+    8: 1834,
+    9: 1850,
+    10: 1858,
+}
+# Возраст в ревизиях записан словами, часто с архаичной орфографией.
+_AGE_WORDS = {
+    "году": 1,
+    "один": 1,
+    "двух": 2,
+    "два": 2,
+    "трех": 3,
+    "три": 3,
+    "четырех": 4,
+    "пяти": 5,
+    "пять": 5,
+    "шти": 6,
+    "шести": 6,
+    "семи": 7,
+    "осми": 8,
+    "осмии": 8,
+    "осьми": 8,
+    "девяти": 9,
+    "десяти": 10,
+    "десети": 10,
+    "одиннатцети": 11,
+    "двенатцети": 12,
+    "тринатцети": 13,
+    "четырнатцети": 14,
+    "пятнатцети": 15,
+    "шеснатцети": 16,
+    "семнатцети": 17,
+    "осмнатцети": 18,
+    "осьмнатцети": 18,
+    "девятнатцети": 19,
+    "дватцети": 20,
+    "тритцети": 30,
+    "сорока": 40,
+    "пятидесят": 50,
+    "пятидесяти": 50,
+    "петидесят": 50,
+    "штидесят": 60,
+    "шестидесят": 60,
+    "семидесят": 70,
+    "семдесят": 70,
+    "осмидесят": 80,
+    "девяноста": 90,
+    "девяносто": 90,
+}
+_MAX_NAME_WORDS = 2
+_WORD = re.compile("[А-Яа-яЁё]+")
+# Возраст в ревизиях округлен, а даты рождения в дереве часто оценочные.
+_AGE_TOLERANCE_YEARS = 5
+
+
+class RevisionEntry(NamedTuple):
+    """Упоминание человека в ревизии: имя, его место в тексте и возраст."""
+
+    name: str
+    start: int
+    end: int
+    age: int
+
+
+def parse_revision_item(text: str) -> list[RevisionEntry]:
+    """Находит в строке ревизии имена, за которыми следует возраст.
+
+    >>> [(e.name, e.age) for e in parse_revision_item(
+    ...     "Янберда Ахпердин осмидесят, у него дети Меренчам сорока, "
+    ...     "Савин дватцети,у Савина сын Савгелда году;"
+    ... )]
+    [('Янберда Ахпердин', 80), ('Меренчам', 40), ('Савин', 20), ('Савгелда', 1)]
+    >>> [(e.name, e.age) for e in parse_revision_item(
+    ...     "Во дворе староста Мурзанай Яндереков штидесят трех лет"
+    ... )]
+    [('Мурзанай Яндереков', 63)]
+    >>> parse_revision_item("от пяти до десяти-один,")
+    []
+    """
+    words = list(_WORD.finditer(text))
+    entries = []
+    i = 0
+    while i < len(words):
+        if words[i].group().lower() not in _AGE_WORDS:
+            i += 1
+            continue
+        age_start = i
+        age = 0
+        while i < len(words) and words[i].group().lower() in _AGE_WORDS:
+            age += _AGE_WORDS[words[i].group().lower()]
+            i += 1
+
+        name_words = []
+        j = age_start - 1
+        while j >= 0 and len(name_words) < _MAX_NAME_WORDS:
+            word = words[j]
+            following = words[j + 1].start()
+            if not word.group()[0].isupper() or text[word.end() : following].strip():
+                break
+            name_words.insert(0, word)
+            j -= 1
+        if name_words:
+            start, end = name_words[0].start(), name_words[-1].end()
+            entries.append(RevisionEntry(text[start:end], start, end, age))
+    return entries
+
+
+class RevisionMatcher:
+    """Сопоставление упоминаний в ревизиях с персонами дерева.
+
+    Персоны проиндексированы по фонетическому ключу имени, внутри ключа
+    отсортированы по году рождения, поэтому кандидаты находятся бинарным
+    поиском по году рождения, вычисленному из возраста на момент ревизии.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__index: dict[str, list[tuple[int, str, Person]]] = defaultdict(list)
+        for person in gramps_tree.persons.values():
+            tokens = name_tokens(person.full_name)
+            if tokens:
+                self.__index[phonetic_key(tokens[0])].append(
+                    (person.birth_day.date.year, person.gramps_id, person)
+                )
+        for persons in self.__index.values():
+            persons.sort(key=lambda item: (item[0], item[1]))
+        self.__years = {
+            key: [year for year, _, _ in persons]
+            for key, persons in self.__index.items()
+        }
+
+    def match(self, entry: RevisionEntry, revision_year: int) -> Person | None:
+        """Единственная подходящая персона или None.
+
+        Персона подходит, если совпадает имя, фамилия (если она указана в
+        ревизии) и год рождения с точностью до _AGE_TOLERANCE_YEARS.
+        """
+        tokens = name_tokens(entry.name)
+        if not tokens:
+            return None
+        key = phonetic_key(tokens[0])
+        birth_year = revision_year - entry.age
+        years = self.__years.get(key, [])
+        candidates = self.__index.get(key, [])[
+            bisect_left(years, birth_year - _AGE_TOLERANCE_YEARS) : bisect_right(
+                years, birth_year + _AGE_TOLERANCE_YEARS
+            )
+        ]
+        if len(tokens) > 1:
+            surname = phonetic_key(tokens[-1])
+            candidates = [
+                item
+                for item in candidates
+                if phonetic_key(name_tokens(item[2].full_name)[-1]) == surname
+            ]
+        if len(candidates) != 1:
+            return None
+        return candidates[0][2]
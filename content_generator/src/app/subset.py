@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+from src.app.entities import Family, GrampsId, GrampsTree
+from src.app.relation_store import RelationStore
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+
+class UnknownRootError(Exception):
+    def __init__(self, root_id: str) -> None:
+        super().__init__(f"Person {root_id} not found in the tree")
+
+
+def branch_subset(
+    gramps_tree: GrampsTree, root_ids: Iterable[GrampsId], depth: int
+) -> GrampsTree:
+    """Ветка вокруг корневых персон отдельным небольшим деревом.
+
+    В ветку входят корни, их предки и потомки не дальше depth поколений и
+    супруги всех вошедших персон. Семьи ветки - копии семей дерева, в
+    которых остались только вошедшие персоны. Персоны и медиа общие с
+    исходным деревом, поэтому Gallery, запущенная на ветке, меняет пути
+    медиа и в нем.
+    """
+    root_ids = list(root_ids)
+    for root_id in root_ids:
+        if root_id not in gramps_tree.persons:
+            raise UnknownRootError(root_id)
+
+    as_child, as_parent = _families_by_person(gramps_tree)
+    selected = set(root_ids)
+    for relatives in (
+        lambda person_id: _members(as_child[person_id], "parents"),
+        lambda person_id: _members(as_parent[person_id], "children"),
+    ):
+        selected |= _walk(root_ids, relatives, depth)
+    for person_id in list(selected):
+        selected |= _members(as_parent[person_id], "parents")
+
+    families = {
+        family_id: _branch_family(family, selected)
+        for family_id, family in gramps_tree.families.items()
+        if any(parent.gramps_id in selected for parent in family.parents)
+    }
+    return GrampsTree(
+        persons={
+            person_id: person
+            for person_id, person in gramps_tree.persons.items()
+            if person_id in selected
+        },
+        media={
+            media_id: media
+            for media_id, media in gramps_tree.media.items()
+            if any(person.gramps_id in selected for person in media.persons)
+        },
+        relations=RelationStore(
+            relation
+            for relation in gramps_tree.relations
+            if relation.family_id in families
+            and relation.first_person_id in selected
+            and relation.other_person_id in selected
+        ),
+        families=families,
+    )
+
+
+def _families_by_person(
+    gramps_tree: GrampsTree,
+) -> tuple[dict[GrampsId, list[Family]], dict[GrampsId, list[Family]]]:
+    """Семьи, в которых персона ребенок, и семьи, в которых она родитель."""
+    as_child: dict[GrampsId, list[Family]] = defaultdict(list)
+    as_parent: dict[GrampsId, list[Family]] = defaultdict(list)
+    for family in gramps_tree.families.values():
+        for child in family.children:
+            as_child[child.gramps_id].append(family)
+        for parent in family.parents:
+            as_parent[parent.gramps_id].append(family)
+    return as_child, as_parent
+
+
+def _branch_family(family: Family, selected: set[GrampsId]) -> Family:
+    """Копия семьи только с вошедшими в ветку детьми."""
+    branch_family = Family(family.gramps_id)
+    branch_family.father = family.father
+    branch_family.mother = family.mother
+    for child in family.children:
+        if child.gramps_id in selected:
+            branch_family.add_child(child)
+    return branch_family
+
+
+def _members(families: list[Family], role: str) -> set[GrampsId]:
+    return {person.gramps_id for family in families for person in getattr(family, role)}
+
+
+def _walk(
+    root_ids: list[GrampsId],
+    relatives: Callable[[GrampsId], set[GrampsId]],
+    depth: int,
+) -> set[GrampsId]:
+    """Персоны не дальше depth шагов relatives от корней."""
+    visited = set(root_ids)
+    frontier = visited
+    for _ in range(depth):
+        frontier = {
+            relative for person_id in frontier for relative in relatives(person_id)
+        } - visited
+        visited |= frontier
+    return visited
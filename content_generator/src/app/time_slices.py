@@ -0,0 +1,21 @@
+from datetime import date
+from typing import NamedTuple
+
+
+class TimeSlice(NamedTuple):
+    """Отмеченное на шкале большого дерева событие."""
+
+    label: str
+    date: date
+    date_view: bool
+    title: str
+
+
+TIME_SLICES = [
+    TimeSlice("", date(1700, 1, 1), date_view=True, title="1700 год"),
+    TimeSlice("", date(1800, 1, 1), date_view=True, title="1800 год"),
+    TimeSlice("", date(1900, 1, 1), date_view=True, title="1900 год"),
+    TimeSlice("ВОВ", date(1941, 6, 22), date_view=False, title="Начало ВОВ"),
+    TimeSlice("", date(1945, 5, 9), date_view=False, title="Победа в ВОВ"),
+    TimeSlice("", date(2000, 1, 1), date_view=True, title="2000 год"),
+]
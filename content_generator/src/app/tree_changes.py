@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from src.app.entities import GrampsId
+
+
+class TreeChanges(NamedTuple):
+    """Что изменилось в дереве после перечитывания измененных строк базы.
+
+    persons и media - добавленные и перечитанные объекты, families - менялась
+    ли таблица семей.
+    """
+
+    persons: frozenset[GrampsId] = frozenset()
+    removed_persons: frozenset[GrampsId] = frozenset()
+    media: frozenset[GrampsId] = frozenset()
+    removed_media: frozenset[GrampsId] = frozenset()
+    families: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        """Ничего не изменилось.
+
+        >>> TreeChanges().is_empty
+        True
+        >>> TreeChanges(families=True).is_empty
+        False
+        """
+        return not any(self)
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+_EMPTY_BLOB = "0" * 40
+
+
+def build_manifest(output_dir: Path) -> dict[str, str]:
+    """sha256 каждого файла сайта по пути относительно output_dir."""
+    return {
+        path.relative_to(output_dir).as_posix(): hashlib.sha256(
+            path.read_bytes()
+        ).hexdigest()
+        for path in sorted(output_dir.rglob("*"))
+        if path.is_file()
+    }
+
+
+class ManifestDiff(NamedTuple):
+    added: list[str]
+    changed: list[str]
+    removed: list[str]
+
+    @classmethod
+    def between(cls, old: dict[str, str], new: dict[str, str]) -> "ManifestDiff":
+        """Разница между манифестами прошлой и текущей публикации.
+
+        >>> ManifestDiff.between({"a": "1", "b": "2"}, {"b": "3", "c": "4"})
+        ManifestDiff(added=['c'], changed=['b'], removed=['a'])
+        """
+        return cls(
+            added=sorted(new.keys() - old.keys()),
+            changed=sorted(
+                path for path in new.keys() & old.keys() if new[path] != old[path]
+            ),
+            removed=sorted(old.keys() - new.keys()),
+        )
+
+    @property
+    def uploaded(self) -> list[str]:
+        return self.added + self.changed
+
+    def __str__(self):
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed"
+        )
+
+
+class DirectoryTarget:
+    """Публикация в каталог, например смонтированный каталог сервера."""
+
+    def __init__(self, path: Path):
+        self.__path = path
+
+    def __str__(self):
+        return f"directory {self.__path.resolve()}"
+
+    def revision(self) -> str | None:
+        return None
+
+    def upload(self, output_dir: Path, diff: ManifestDiff | None):
+        if diff is None:
+            new = {
+                path.relative_to(output_dir).as_posix()
+                for path in output_dir.rglob("*")
+                if path.is_file()
+            }
+            old = (
+                {
+                    path.relative_to(self.__path).as_posix()
+                    for path in self.__path.rglob("*")
+                    if path.is_file()
+                }
+                if self.__path.exists()
+                else set()
+            )
+            diff = ManifestDiff(sorted(new), [], sorted(old - new))
+        for relative in diff.uploaded:
+            target = self.__path / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(output_dir / relative, target)
+        for relative in diff.removed:
+            target = self.__path / relative
+            target.unlink(missing_ok=True)
+            for parent in target.parents:
+                if parent == self.__path or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+
+
+class GitTarget:
+    """Публикация в ветку git репозитория, как ghp-import, но по разнице.
+
+    Дерево коммита собирается во временном индексе из дерева предыдущего
+    коммита ветки: в базу объектов записываются только добавленные и
+    измененные файлы. Рабочий каталог не нужен, поэтому подходит и bare
+    репозиторий. Отправка ветки на GitHub остается за git push.
+    """
+
+    def __init__(self, git_dir: Path, branch: str, message: str = "Publish site"):
+        self.__git_dir = git_dir
+        self.__branch = branch
+        self.__message = message
+
+    def __str__(self):
+        return f"git {self.__git_dir.resolve()} {self.__branch}"
+
+    def revision(self) -> str | None:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", f"refs/heads/{self.__branch}"],  # noqa: S603, S607
+            env=self.__env(),
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        return result.stdout.strip() or None
+
+    def upload(self, output_dir: Path, diff: ManifestDiff | None):
+        parent = self.revision()
+        with tempfile.TemporaryDirectory() as tmp:
+            env = self.__env(GIT_INDEX_FILE=str(Path(tmp) / "index"))
+            if diff is None or parent is None:
+                self.__git(env, "read-tree", "--empty")
+                diff = ManifestDiff(
+                    sorted(
+                        path.relative_to(output_dir).as_posix()
+                        for path in output_dir.rglob("*")
+                        if path.is_file()
+                    ),
+                    [],
+                    [],
+                )
+            else:
+                self.__git(env, "read-tree", parent)
+
+            uploaded = diff.uploaded
+            blobs = self.__git(
+                env,
+                "hash-object",
+                "-w",
+                "--stdin-paths",
+                stdin="".join(f"{output_dir / path}\n" for path in uploaded),
+            ).split()
+            index_info = [
+                f"100644 {blob}\t{path}\n"
+                for path, blob in zip(uploaded, blobs, strict=True)
+            ]
+            index_info += [f"0 {_EMPTY_BLOB}\t{path}\n" for path in diff.removed]
+            self.__git(env, "update-index", "--index-info", stdin="".join(index_info))
+            tree = self.__git(env, "write-tree").strip()
+
+            commit_args = ["commit-tree", tree, "-m", self.__message]
+            if parent is not None:
+                commit_args += ["-p", parent]
+            commit = self.__git(env, *commit_args).strip()
+            self.__git(
+                env,
+                "update-ref",
+                f"refs/heads/{self.__branch}",
+                commit,
+                *([parent] if parent is not None else []),
+            )
+        logger.info(f"{self.__branch} updated to {commit}")
+
+    def __env(self, **extra: str) -> dict[str, str]:
+        return {**os.environ, "GIT_DIR": str(self.__git_dir), **extra}
+
+    @staticmethod
+    def __git(env: dict[str, str], *args: str, stdin: str | None = None) -> str:
+        return subprocess.run(
+            ["git", *args],  # noqa: S603, S607
+            env=env,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+
+class RsyncTarget:
+    """Публикация на сервер через rsync только измененных файлов.
+
+    Список файлов передается rsync через --files-from, удаленные файлы
+    удаляются на сервере благодаря --delete-missing-args. Без манифеста
+    выполняется полная синхронизация с проверкой контрольных сумм.
+    """
+
+    def __init__(self, destination: str, ssh_port: int = 22):
+        self.__destination = destination
+        self.__ssh_port = ssh_port
+
+    def __str__(self):
+        return f"rsync {self.__destination}"
+
+    def revision(self) -> str | None:
+        return None
+
+    def upload(self, output_dir: Path, diff: ManifestDiff | None):
+        command = [
+            "rsync",
+            "-pthvz",
+            "-e",
+            f"ssh -p {self.__ssh_port}",
+        ]
+        if diff is None:
+            command += ["--delete", "--exclude", ".DS_Store", "-r", "-c"]
+            stdin = None
+        else:
+            command += ["--from0", "--files-from=-", "--delete-missing-args"]
+            stdin = "".join(f"{path}\0" for path in diff.uploaded + diff.removed)
+        command += [f"{output_dir}/", self.__destination]
+        subprocess.run(command, input=stdin, text=True, check=True)  # noqa: S603
+
+
+class Deployer:
+    """Публикация собранного сайта только с измененными файлами.
+
+    Манифест с sha256 файлов последней публикации хранится локально, поэтому
+    разница вычисляется без обращения к месту публикации. Если манифеста
+    нет, он записан для другого места или ветка git изменилась в обход
+    Deployer, публикуется весь сайт.
+    """
+
+    def __init__(self, output_dir: Path, manifest_path: Path):
+        self.__output_dir = output_dir
+        self.__manifest_path = manifest_path
+
+    def deploy(self, target: DirectoryTarget | GitTarget | RsyncTarget) -> ManifestDiff:
+        manifest = build_manifest(self.__output_dir)
+        previous = self.__load_manifest(target)
+        if previous is None:
+            logger.info(f"No manifest for {target}, uploading the whole site")
+            diff = ManifestDiff(sorted(manifest), [], [])
+            target.upload(self.__output_dir, None)
+        else:
+            diff = ManifestDiff.between(previous, manifest)
+            logger.info(f"Deploying to {target}: {diff}")
+            if any(diff):
+                target.upload(self.__output_dir, diff)
+
+        self.__manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__manifest_path.open("w") as file:
+            json.dump(
+                {
+                    "target": str(target),
+                    "revision": target.revision(),
+                    "files": manifest,
+                },
+                file,
+                indent=0,
+            )
+        return diff
+
+    def __load_manifest(self, target) -> dict[str, str] | None:
+        if not self.__manifest_path.exists():
+            return None
+        with self.__manifest_path.open() as file:
+            saved = json.load(file)
+        if saved["target"] != str(target) or saved["revision"] != target.revision():
+            return None
+        return saved["files"]
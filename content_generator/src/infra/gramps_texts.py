@@ -0,0 +1,74 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.app.interfaces.text_source import ITextSource
+
+# Таблица -> путь к тексту в json_data ее строк.
+_TEXT_PATHS = {"note": "$.text.string", "event": "$.description"}
+
+
+class GrampsTexts(ITextSource):
+    """Тексты заметок и описания событий, читаемые из базы по требованию.
+
+    При обращении к тексту читается он и batch_size - 1 следующих за ним
+    строк таблицы. Biographer обходит персон в порядке базы, а Gramps
+    пишет события и заметки персоны рядом, поэтому одного запроса хватает
+    на несколько персон. В памяти держится только последняя пачка, а сами
+    Note и Event хранят лишь ссылку на общий GrampsTexts.
+
+    Объект пиклится вместе с деревом без соединения с базой, поэтому
+    плагин gramps_persons читает тексты из той же базы.
+    """
+
+    def __init__(self, database_path: Path, batch_size: int = 256):
+        self.__database_path = database_path.resolve()
+        self.__batch_size = batch_size
+        self.__init_connection()
+
+    def note_text(self, note_id: str) -> str:
+        return self.__read("note", note_id)
+
+    def event_description(self, event_id: str) -> str:
+        return self.__read("event", event_id)
+
+    def __read(self, table: str, gramps_id: str) -> str:
+        batch = self.__batch
+        if (table, gramps_id) not in batch:
+            batch = self.__fetch(table, gramps_id)
+            self.__batch = batch
+        return batch[table, gramps_id]
+
+    def __fetch(self, table: str, gramps_id: str) -> dict[tuple[str, str], str]:
+        with self.__lock:
+            if self.__connection is None:
+                self.__connection = sqlite3.connect(
+                    self.__database_path / "sqlite.db", check_same_thread=False
+                )
+            rows = self.__connection.execute(
+                f"SELECT gramps_id, json_extract(json_data, '{_TEXT_PATHS[table]}') "  # noqa: S608
+                f"FROM {table} WHERE rowid >= "
+                f"(SELECT rowid FROM {table} WHERE gramps_id = ?) "
+                "ORDER BY rowid LIMIT ?",
+                (gramps_id, self.__batch_size),
+            ).fetchall()
+        batch = {(table, row_id): text or "" for row_id, text in rows}
+        # Строка могла пропасть из базы после чтения дерева.
+        batch.setdefault((table, gramps_id), "")
+        return batch
+
+    def __init_connection(self):
+        self.__connection: sqlite3.Connection | None = None
+        self.__lock = threading.Lock()
+        self.__batch: dict[tuple[str, str], str] = {}
+
+    def __getstate__(self) -> dict:
+        return {
+            "database_path": self.__database_path,
+            "batch_size": self.__batch_size,
+        }
+
+    def __setstate__(self, state: dict):
+        self.__database_path = state["database_path"]
+        self.__batch_size = state["batch_size"]
+        self.__init_connection()
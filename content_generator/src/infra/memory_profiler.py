@@ -0,0 +1,188 @@
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+_STATUS_PATH = Path("/proc/self/status")
+_CLEAR_REFS_PATH = Path("/proc/self/clear_refs")
+# Запись "5" в clear_refs сбрасывает VmHWM - пиковый RSS процесса.
+_RESET_PEAK_RSS = "5"
+# Новый снимок делается, только если память выросла на эту долю с прошлого.
+_PEAK_GROWTH = 1.1
+_MIB = 1024 * 1024
+
+
+def _mib(size: int) -> str:
+    """Размер в мебибайтах.
+
+    >>> _mib(3 * 1024 * 1024)
+    '3.0 MiB'
+    >>> _mib(-512 * 1024)
+    '-0.5 MiB'
+    """
+    return f"{size / _MIB:.1f} MiB"
+
+
+class AllocationSite(NamedTuple):
+    # Строка кода генератора, из которой пришло выделение.
+    location: str
+    # Файл библиотеки, в котором выделена большая часть этой памяти.
+    origin: str | None
+    size: int
+
+    def __str__(self):
+        via = f" via {self.origin}" if self.origin else ""
+        return f"{_mib(self.size):>10} {self.location}{via}"
+
+
+class StageMemory(NamedTuple):
+    name: str
+    # Память Python, оставшаяся занятой после этапа.
+    retained: int
+    # Наибольшая память Python во время этапа сверх памяти до него.
+    traced_peak: int
+    # Пиковый RSS процесса во время этапа, None если его не измерить.
+    rss_peak: int | None
+    # Места, выделившие больше всего памяти к моменту пика.
+    top_sites: list[AllocationSite]
+
+    def __str__(self):
+        rss = _mib(self.rss_peak) if self.rss_peak is not None else "unknown"
+        lines = [
+            f"{self.name}: peak RSS {rss}, Python peak +{_mib(self.traced_peak)}, "
+            f"retained {_mib(self.retained)}"
+        ]
+        lines.extend(f"  {site}" for site in self.top_sites)
+        return "\n".join(lines)
+
+
+class MemoryProfiler:
+    """Память по этапам генерации: tracemalloc и пиковый RSS.
+
+    В начале этапа делается снимок tracemalloc. Во время этапа фоновый поток
+    следит за объемом памяти и делает снимок на каждом новом пике, потому
+    что временные объекты вроде копий дерева к концу этапа уже освобождены.
+    Разница снимков пика и начала группируется по первой строке кода
+    генератора в стеке выделения: deepcopy в TreeRender попадет в
+    tree_render.py, а не в copy.py.
+
+    Пиковый RSS на Linux сбрасывается перед каждым этапом, на других
+    системах это пик процесса с начала работы. tracemalloc замедляет
+    генерацию в несколько раз и сам занимает память.
+    """
+
+    def __init__(
+        self,
+        project_dir: Path,
+        *,
+        top: int = 10,
+        frames: int = 30,
+        interval: float = 0.2,
+    ):
+        self.__project_dir = str(project_dir.resolve())
+        self.__top = top
+        self.__interval = interval
+        self.__stages: list[StageMemory] = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @property
+    def stages(self) -> list[StageMemory]:
+        return self.__stages
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = tracemalloc.take_snapshot()
+        start_size = tracemalloc.get_traced_memory()[0]
+        can_reset_rss = self.__reset_peak_rss()
+        peak = [start_size, start]
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self.__sample_peaks, args=(peak, stop), daemon=True
+        )
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            end_size = tracemalloc.get_traced_memory()[0]
+            if end_size > peak[0]:
+                peak = [end_size, tracemalloc.take_snapshot()]
+            memory = StageMemory(
+                name=name,
+                retained=end_size - start_size,
+                traced_peak=peak[0] - start_size,
+                rss_peak=self.__peak_rss(reset=can_reset_rss),
+                top_sites=self.__top_sites(peak[1], start),
+            )
+            self.__stages.append(memory)
+            logger.info(f"Memory of stage {memory}")
+
+    def report(self) -> str:
+        return "\n".join(str(stage) for stage in self.__stages)
+
+    def __sample_peaks(self, peak: list, stop: threading.Event):
+        while not stop.wait(self.__interval):
+            size = tracemalloc.get_traced_memory()[0]
+            if size > peak[0] * _PEAK_GROWTH:
+                peak[:] = [size, tracemalloc.take_snapshot()]
+
+    def __top_sites(
+        self, snapshot: tracemalloc.Snapshot, start: tracemalloc.Snapshot
+    ) -> list[AllocationSite]:
+        sizes: dict[str, int] = defaultdict(int)
+        origins: dict[str, dict[str | None, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        for diff in snapshot.compare_to(start, "traceback"):
+            if diff.size_diff <= 0:
+                continue
+            location, origin = self.__site(diff.traceback)
+            sizes[location] += diff.size_diff
+            origins[location][origin] += diff.size_diff
+        top = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+        return [
+            AllocationSite(
+                location, max(origins[location], key=origins[location].get), size
+            )
+            for location, size in top[: self.__top]
+        ]
+
+    def __site(self, traceback: tracemalloc.Traceback) -> tuple[str, str | None]:
+        """Строка генератора и файл библиотеки, где выделена память."""
+        # Кадры traceback идут от самого внешнего к месту выделения.
+        origin = Path(traceback[-1].filename).name
+        for depth, frame in enumerate(reversed(traceback)):
+            if (
+                frame.filename.startswith(self.__project_dir)
+                and "site-packages" not in frame.filename
+            ):
+                location = f"{Path(frame.filename).name}:{frame.lineno}"
+                return location, origin if depth else None
+        return f"{origin}:{traceback[-1].lineno}", None
+
+    @staticmethod
+    def __reset_peak_rss() -> bool:
+        try:
+            _CLEAR_REFS_PATH.write_text(_RESET_PEAK_RSS)
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def __peak_rss(*, reset: bool) -> int | None:
+        if reset:
+            for line in _STATUS_PATH.read_text().splitlines():
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss на macOS в байтах, на Linux в килобайтах.
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import multiprocessing
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+import brotli
+from loguru import logger
+
+# Текстовые форматы, которые хорошо сжимаются. Картинки уже сжаты.
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".html", ".htm", ".css", ".js", ".json", ".svg", ".xml", ".txt"}
+)
+_CHUNK_SIZE = 16
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0, чтобы одинаковое содержимое давало одинаковый архив.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _codecs() -> dict[str, Callable[[bytes], bytes]]:
+    return {".gz": _gzip, ".br": brotli.compress}
+
+
+class _FileResult(NamedTuple):
+    size: int
+    compressed: dict[str, int]
+    reused: bool
+
+
+class PrecompressReport(NamedTuple):
+    files: int
+    compressed: int
+    reused: int
+    original_bytes: int
+    saved_bytes: dict[str, int]
+
+    def __str__(self):
+        lines = [
+            f"{self.files} files: {self.compressed} compressed, "
+            f"{self.reused} taken from cache"
+        ]
+        for suffix, saved in self.saved_bytes.items():
+            percent = 100 * saved / self.original_bytes if self.original_bytes else 0
+            lines.append(
+                f"{suffix}: {saved} of {self.original_bytes} bytes saved "
+                f"({percent:.1f}%)"
+            )
+        return "\n".join(lines)
+
+
+class Precompressor:
+    """Сжатые копии .gz и .br рядом с текстовыми файлами собранного сайта.
+
+    Сервер может отдавать их вместо сжатия на каждый запрос. publishconf.py
+    очищает каталог сайта перед сборкой, поэтому сжатые файлы хранятся в
+    кеше по sha256 исходного содержимого: неизмененные файлы не сжимаются
+    повторно, а копируются из кеша. Записи кеша, не понадобившиеся в
+    текущей сборке, удаляются.
+    """
+
+    def __init__(self, output_dir: Path, cache_dir: Path, workers: int = 0):
+        self.__output_dir = output_dir
+        self.__cache_dir = cache_dir
+        self.__workers = workers or os.cpu_count() or 1
+
+    def run(self) -> PrecompressReport:
+        self.__cache_dir.mkdir(parents=True, exist_ok=True)
+        self.__remove_orphans()
+        sources = sorted(
+            path
+            for path in self.__output_dir.rglob("*")
+            if path.suffix in COMPRESSIBLE_SUFFIXES and path.is_file()
+        )
+        tasks = [(path, self.__cache_dir) for path in sources]
+        if self.__workers > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(self.__workers) as pool:
+                results = list(
+                    pool.imap_unordered(_precompress_file, tasks, _CHUNK_SIZE)
+                )
+        else:
+            results = [_precompress_file(task) for task in tasks]
+
+        used = {name for result in results for name in result[1]}
+        for cached in self.__cache_dir.iterdir():
+            if cached.name not in used:
+                cached.unlink()
+
+        report = self.__report([result for result, _ in results])
+        logger.info(f"Precompressed {self.__output_dir}\n{report}")
+        return report
+
+    def __remove_orphans(self):
+        """Удаляет сжатые копии файлов, которых больше нет в сайте."""
+        for suffix in _codecs():
+            for path in self.__output_dir.rglob(f"*{suffix}"):
+                source = path.with_suffix("")
+                if source.suffix in COMPRESSIBLE_SUFFIXES and not source.exists():
+                    path.unlink()
+
+    @staticmethod
+    def __report(results: list[_FileResult]) -> PrecompressReport:
+        original_bytes = sum(result.size for result in results)
+        saved_bytes = {}
+        for suffix in _codecs():
+            saved_bytes[suffix] = sum(
+                result.size - result.compressed[suffix]
+                for result in results
+                if suffix in result.compressed
+            )
+        reused = sum(result.reused for result in results)
+        return PrecompressReport(
+            files=len(results),
+            compressed=len(results) - reused,
+            reused=reused,
+            original_bytes=original_bytes,
+            saved_bytes=saved_bytes,
+        )
+
+
+def _precompress_file(task: tuple[Path, Path]) -> tuple[_FileResult, list[str]]:
+    """Сжимает один файл; возвращает результат и имена записей кеша."""
+    path, cache_dir = task
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    compressed = {}
+    cache_names = []
+    reused = True
+    for suffix, compress in _codecs().items():
+        cached = cache_dir / f"{digest}{suffix}"
+        cache_names.append(cached.name)
+        if not cached.exists():
+            reused = False
+            temporary = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+            temporary.write_bytes(compress(data))
+            temporary.replace(cached)
+        size = cached.stat().st_size
+        sibling = path.with_name(path.name + suffix)
+        # Сжатая копия, которая не меньше исходника, серверу не нужна.
+        if size < len(data):
+            shutil.copyfile(cached, sibling)
+            compressed[suffix] = size
+        elif sibling.exists():
+            sibling.unlink()
+    return _FileResult(len(data), compressed, reused), cache_names
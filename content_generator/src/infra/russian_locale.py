@@ -0,0 +1,15 @@
+import locale
+
+from loguru import logger
+
+
+def use_russian_month_names():
+    """Русские названия месяцев в strftime, если в системе есть локаль ru_RU.
+
+    Вызывается командами, которые пишут даты в контент, а не при импорте
+    модулей: иначе импорт падал там, где локали нет.
+    """
+    try:
+        locale.setlocale(locale.LC_TIME, "ru_RU.UTF-8")
+    except locale.Error:
+        logger.warning("ru_RU.UTF-8 locale is unavailable, dates are not localized")
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import pickle
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from enum import Enum
+from typing import TYPE_CHECKING, NamedTuple
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from src.infra.memory_profiler import MemoryProfiler
+
+
+class StageGraphError(Exception):
+    def __init__(self, stage: str, problem: str) -> None:
+        super().__init__(f"Stage {stage} {problem}")
+
+
+class StageExecutor(Enum):
+    # Этапы, которые пишут много файлов или ждут PIL, в потоках основного процесса.
+    THREAD = "thread"
+    # Этапы, которые долго считают на Python, в отдельных процессах.
+    PROCESS = "process"
+
+
+class Stage(NamedTuple):
+    """Этап генерации контента.
+
+    Этап запускается после всех этапов after. Этап PROCESS получает копию
+    дерева, поэтому его изменения дерева не видны остальным этапам: такие
+    этапы должны только писать файлы, а run и его аргументы - пиклиться.
+    Копия снимается при запуске этапа, и этапы, идущие в это время в
+    потоках, не должны менять объекты, которые он получает.
+    """
+
+    name: str
+    run: Callable[[], object]
+    after: tuple[str, ...] = ()
+    executor: StageExecutor = StageExecutor.THREAD
+
+
+class StageTiming(NamedTuple):
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class ScheduleReport(NamedTuple):
+    """Время этапов и критический путь - самая долгая цепочка зависимостей.
+
+    Быстрее критического пути генерация не станет при любом числе ядер.
+
+    >>> report = ScheduleReport(
+    ...     wall_time=3.5,
+    ...     timings={
+    ...         "gallery": StageTiming(0.0, 1.0),
+    ...         "tree": StageTiming(0.0, 3.0),
+    ...         "biographer": StageTiming(1.0, 3.5),
+    ...     },
+    ...     critical_path=["gallery", "biographer"],
+    ... )
+    >>> report.critical_time
+    3.5
+    >>> print(report)
+    3 stages in 3.50 s, critical path 3.50 s: gallery -> biographer
+      biographer  2.50 s
+      tree        3.00 s
+      gallery     1.00 s
+    """
+
+    wall_time: float
+    timings: dict[str, StageTiming]
+    critical_path: list[str]
+
+    @property
+    def critical_time(self) -> float:
+        return sum(self.timings[name].duration for name in self.critical_path)
+
+    def __str__(self):
+        width = max(len(name) for name in self.timings)
+        lines = [
+            f"{len(self.timings)} stages in {self.wall_time:.2f} s, "
+            f"critical path {self.critical_time:.2f} s: "
+            + " -> ".join(self.critical_path)
+        ]
+        for name, timing in sorted(
+            self.timings.items(), key=lambda item: item[1].end, reverse=True
+        ):
+            lines.append(f"  {name:<{width}} {timing.duration:5.2f} s")
+        return "\n".join(lines)
+
+
+class StageScheduler:
+    """Запускает независимые этапы одновременно, соблюдая зависимости.
+
+    Каждому этапу достается свой поток или процесс: этапов немного, и
+    очередь в пуле только удлинила бы критический путь.
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.__stages = {}
+        for stage in stages:
+            if stage.name in self.__stages:
+                raise StageGraphError(stage.name, "is declared twice")
+            self.__stages[stage.name] = stage
+        for stage in self.__stages.values():
+            unknown = set(stage.after) - self.__stages.keys()
+            if unknown:
+                raise StageGraphError(stage.name, f"depends on unknown {unknown}")
+        self.__order = self.__topological_order()
+
+    def run(
+        self,
+        *,
+        sequential: bool = False,
+        memory_profiler: MemoryProfiler | None = None,
+    ) -> ScheduleReport:
+        """Выполняет этапы; sequential - по одному в основном потоке.
+
+        С memory_profiler этапы тоже идут по одному в основном процессе,
+        иначе память этапов не разделить.
+        """
+        start = time.perf_counter()
+        timings = (
+            self.__run_sequentially(memory_profiler)
+            if sequential or memory_profiler is not None
+            else self.__run_concurrently()
+        )
+        report = ScheduleReport(
+            wall_time=time.perf_counter() - start,
+            timings={name: timings[name] for name in self.__order},
+            critical_path=self.__critical_path(timings),
+        )
+        logger.info(f"Stages finished\n{report}")
+        return report
+
+    def __run_sequentially(
+        self, memory_profiler: MemoryProfiler | None
+    ) -> dict[str, StageTiming]:
+        timings = {}
+        for name in self.__order:
+            stage_start = time.perf_counter()
+            if memory_profiler is None:
+                self.__stages[name].run()
+            else:
+                with memory_profiler.stage(name):
+                    self.__stages[name].run()
+            timings[name] = StageTiming(stage_start, time.perf_counter())
+        return timings
+
+    def __run_concurrently(self) -> dict[str, StageTiming]:
+        counts = {
+            executor: sum(s.executor == executor for s in self.__stages.values())
+            for executor in StageExecutor
+        }
+        timings: dict[str, StageTiming] = {}
+        started: dict[Future, tuple[str, float]] = {}
+        with (
+            ThreadPoolExecutor(max(counts[StageExecutor.THREAD], 1)) as threads,
+            ProcessPoolExecutor(max(counts[StageExecutor.PROCESS], 1)) as processes,
+        ):
+            waiting = list(self.__order)
+            while waiting or started:
+                # Процессы запускаются форком при первой отправке в пул, поэтому
+                # этапы PROCESS отправляются раньше, чем появятся потоки.
+                ready = sorted(
+                    (n for n in waiting if self.__is_ready(n, timings)),
+                    key=lambda n: self.__stages[n].executor != StageExecutor.PROCESS,
+                )
+                for name in ready:
+                    waiting.remove(name)
+                    stage = self.__stages[name]
+                    logger.info(f"Stage {name} started in {stage.executor.value}")
+                    if stage.executor == StageExecutor.PROCESS:
+                        # Пул пиклит задачи в своем потоке, а дерево в это
+                        # время могут дополнять этапы в потоках.
+                        payload = pickle.dumps(stage.run, pickle.HIGHEST_PROTOCOL)
+                        future = processes.submit(_run_pickled, payload)
+                    else:
+                        future = threads.submit(stage.run)
+                    started[future] = (name, time.perf_counter())
+                done, _ = wait(started, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, stage_start = started.pop(future)
+                    future.result()
+                    timings[name] = StageTiming(stage_start, time.perf_counter())
+        return timings
+
+    def __is_ready(self, name: str, finished: dict[str, StageTiming]) -> bool:
+        return all(dependency in finished for dependency in self.__stages[name].after)
+
+    def __topological_order(self) -> list[str]:
+        order: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str):
+            if name in order:
+                return
+            if name in visiting:
+                raise StageGraphError(name, "depends on itself")
+            visiting.add(name)
+            for dependency in self.__stages[name].after:
+                visit(dependency)
+            visiting.remove(name)
+            order.append(name)
+
+        for name in self.__stages:
+            visit(name)
+        return order
+
+    def __critical_path(self, timings: dict[str, StageTiming]) -> list[str]:
+        longest: dict[str, tuple[float, list[str]]] = {}
+        for name in self.__order:
+            before = max(
+                (longest[dependency] for dependency in self.__stages[name].after),
+                key=lambda item: item[0],
+                default=(0.0, []),
+            )
+            longest[name] = (
+                before[0] + timings[name].duration,
+                [*before[1], name],
+            )
+        return max(longest.values(), key=lambda item: item[0])[1]
+
+
+def _run_pickled(payload: bytes):
+    return pickle.loads(payload)()  # noqa: S301
@@ -0,0 +1,28 @@
+import pickle
+from pathlib import Path
+
+from loguru import logger
+from src.app.entities import GrampsTree
+
+# Меняется при изменении сущностей, чтобы не читать несовместимый кеш.
+_CACHE_VERSION = 4
+
+
+def save_gramps_tree(gramps_tree: GrampsTree, path: Path):
+    """Сохраняет прочитанное дерево для плагина Pelican."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as file:
+        pickle.dump((_CACHE_VERSION, gramps_tree), file, pickle.HIGHEST_PROTOCOL)
+    logger.info(f"Gramps tree cached to {path}")
+
+
+def load_gramps_tree(path: Path) -> GrampsTree | None:
+    """Дерево из кеша или None, если кеша нет или он от другой версии."""
+    if not path.exists():
+        return None
+    with path.open("rb") as file:
+        version, gramps_tree = pickle.load(file)  # noqa: S301
+    if version != _CACHE_VERSION:
+        logger.warning(f"Gramps tree cache {path} is outdated")
+        return None
+    return gramps_tree
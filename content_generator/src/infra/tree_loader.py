@@ -4,9 +4,10 @@ from src.app.interfaces.tee_loader import ITreeLoader
 from src.app.entities import GrampsTree
 
 import json
-import locale
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from loguru import logger
 
@@ -23,26 +24,79 @@ from src.app.entities import (
     Relation,
     RelationType,
 )
+from src.app.tree_changes import TreeChanges
+from src.infra.gramps_texts import GrampsTexts
 
-locale.setlocale(locale.LC_TIME, "ru_RU.UTF-8")
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Таблицы, изменения в которых отслеживаются по столбцу change.
+_WATCHED_TABLES = ("person", "family", "event", "note", "media")
+
+# handle строки -> (gramps_id, change) для каждой отслеживаемой таблицы.
+TableSnapshot = dict[str, dict[str, tuple[GrampsId, int]]]
+
+
+def _ids_filter(column: str, ids: set[str] | None) -> tuple[str, tuple]:
+    """Условие на вхождение column в ids; ids передаются одним json параметром.
+
+    >>> _ids_filter("person.gramps_id", {"I2", "I1"})
+    (' AND person.gramps_id IN (SELECT value FROM json_each(?))', ('["I1", "I2"]',))
+    >>> _ids_filter("person.gramps_id", None)
+    ('', ())
+    """
+    if ids is None:
+        return "", ()
+    return (
+        f" AND {column} IN (SELECT value FROM json_each(?))",  # noqa: S608
+        (json.dumps(sorted(ids)),),
+    )
 
 
 class SQliteGrampsTreeLoader(ITreeLoader):
+    def __init__(self, *, lazy_text: bool = False, parallel: bool = False):
+        """lazy_text - не держать в дереве тексты заметок и описания событий.
+
+        Они читаются из базы при обращении через GrampsTexts, и память
+        дерева зависит только от числа персон и связей, а не от объема
+        архивных текстов.
+
+        parallel - читать персоны, события, заметки и медиа одновременно в
+        потоках, каждую таблицу через свое соединение только для чтения, и
+        связывать их после. sqlite3 отпускает GIL на время запроса, поэтому
+        на нескольких ядрах чтение таблиц идет параллельно с разбором json.
+        Процессы не используются: сущности пришлось бы пиклить обратно, а
+        интернированные даты разошлись бы по процессам.
+        """
+        self.__lazy_text = lazy_text
+        self.__parallel = parallel
+
     def load(self, gramps_tree_path: Path) -> GrampsTree:
         self.__gramps_tree_path = gramps_tree_path
         logger.info(f"gramps_tree_path: {self.__gramps_tree_path}")
         conn = sqlite3.connect(self.__gramps_tree_path / Path("sqlite.db"))
         self.__cur = conn.cursor()
+        self.__texts = GrampsTexts(gramps_tree_path) if self.__lazy_text else None
 
-        self.__persons = self.__get_persons()  # type: dict[GrampsId, Person]
-        self.__events = self.__get_events()  # type: dict[GrampsId, Event]
-        self.__notes = self.__get_notes()  # type: dict[GrampsId, Note]
-        self.__media = self.__get_media()  # type: dict[GrampsId, Media]
+        # Таблицы не зависят друг от друга до связывания ниже.
+        readers = (
+            self.__get_persons,
+            self.__get_events,
+            self.__get_notes,
+            self.__get_media,
+        )
+        if self.__parallel:
+            with ThreadPoolExecutor(max_workers=len(readers)) as pool:
+                tables = list(pool.map(self.__read_table, readers))
+        else:
+            tables = [read(self.__cur) for read in readers]
+        self.__persons, self.__events, self.__notes, self.__media = tables
         self.__add_notes_to_person()
         self.__add_event_for_person()
         self.__map_media_to_person()
 
         relations, families = self.__get_relationship()
+        conn.close()
         return GrampsTree(
             persons=self.__persons,
             media=self.__media,
@@ -50,12 +104,170 @@ class SQliteGrampsTreeLoader(ITreeLoader):
             families=families,
         )
 
-    def __get_persons(self) -> dict[GrampsId, Person]:
+    def __read_table(self, read: Callable[[sqlite3.Cursor], dict]) -> dict:
+        """Вызывает read с отдельным соединением к базе.
+
+        Курсоры sqlite3 нельзя делить между потоками.
+        """
+        conn = sqlite3.connect(
+            f"{(self.__gramps_tree_path / 'sqlite.db').resolve().as_uri()}?mode=ro",
+            uri=True,
+        )
+        try:
+            return read(conn.cursor())
+        finally:
+            conn.close()
+
+    @staticmethod
+    def snapshot(gramps_tree_path: Path) -> TableSnapshot:
+        """Столбец change всех строк отслеживаемых таблиц.
+
+        Gramps обновляет change при каждом изменении объекта, поэтому по
+        разнице снимков видно, какие строки нужно перечитать.
+        """
+        conn = sqlite3.connect(gramps_tree_path / Path("sqlite.db"))
+        try:
+            return {
+                table: {
+                    handle: (GrampsId(gramps_id), change)
+                    for handle, gramps_id, change in conn.execute(
+                        f"SELECT handle, gramps_id, change FROM {table}"  # noqa: S608
+                    )
+                }
+                for table in _WATCHED_TABLES
+            }
+        finally:
+            conn.close()
+
+    def reload(
+        self,
+        gramps_tree_path: Path,
+        gramps_tree: GrampsTree,
+        old: TableSnapshot,
+        new: TableSnapshot,
+    ) -> TreeChanges:
+        """Перечитывает в gramps_tree только строки, изменившиеся между снимками.
+
+        Персона перечитывается целиком, если изменилась она сама или ее
+        события, заметки, медиа. Медиа пересоздаются вместе со всеми своими
+        персонами, чтобы в них не остались старые объекты. Семьи и связи
+        собираются заново одним запросом по уже обновленным персонам.
+        """
+        changed = {
+            table: {
+                handle
+                for handle, row in new[table].items()
+                if old[table].get(handle) != row
+            }
+            for table in _WATCHED_TABLES
+        }
+        removed = {
+            table: {
+                gramps_id
+                for handle, (gramps_id, _) in old[table].items()
+                if handle not in new[table] or new[table][handle][0] != gramps_id
+            }
+            for table in _WATCHED_TABLES
+        }
+        if not any(changed.values()) and not any(removed.values()):
+            return TreeChanges()
+
+        self.__gramps_tree_path = gramps_tree_path
+        conn = sqlite3.connect(self.__gramps_tree_path / Path("sqlite.db"))
+        self.__cur = conn.cursor()
+        # Новые тексты, чтобы не читать измененные заметки из старой пачки.
+        self.__texts = GrampsTexts(gramps_tree_path) if self.__lazy_text else None
+
+        person_ids = {new["person"][handle][0] for handle in changed["person"]}
+        person_ids |= self.__persons_referencing(
+            changed["event"] | changed["note"] | changed["media"]
+        )
+        media_ids = {new["media"][handle][0] for handle in changed["media"]}
+        while True:
+            media_ids |= self.__media_of_persons(person_ids)
+            with_same_media = self.__persons_of_media(media_ids)
+            if with_same_media <= person_ids:
+                break
+            person_ids |= with_same_media
+
+        self.__persons = gramps_tree.persons
+        self.__media = gramps_tree.media
+        for gramps_id in removed["person"]:
+            self.__persons.pop(gramps_id, None)
+        for gramps_id in removed["media"]:
+            self.__media.pop(gramps_id, None)
+        self.__persons.update(self.__get_persons(self.__cur, person_ids))
+        self.__events = self.__get_events(self.__cur, person_ids)
+        self.__notes = self.__get_notes(self.__cur, person_ids)
+        reloaded_media = self.__get_media(self.__cur, media_ids)
+        self.__media.update(reloaded_media)
+        self.__add_notes_to_person(person_ids)
+        self.__add_event_for_person(person_ids)
+        self.__map_media_to_person(set(reloaded_media))
+
+        relations, families = self.__get_relationship()
+        gramps_tree.relations.clear()
+        gramps_tree.relations.update(relations)
+        gramps_tree.families.clear()
+        gramps_tree.families.update(families)
+        gramps_tree.invalidate_indexes()
+        conn.close()
+
+        return TreeChanges(
+            persons=frozenset(person_ids),
+            removed_persons=frozenset(removed["person"] - person_ids),
+            media=frozenset(reloaded_media),
+            removed_media=frozenset(removed["media"] - set(reloaded_media)),
+            families=bool(changed["family"] or removed["family"]),
+        )
+
+    def __persons_referencing(self, handles: set[str]) -> set[GrampsId]:
+        if not handles:
+            return set()
+        condition, params = _ids_filter("reference.ref_handle", handles)
+        self.__cur.execute(
+            "SELECT person.gramps_id FROM reference "  # noqa: S608
+            "JOIN person ON person.handle = reference.obj_handle "
+            f"WHERE 1{condition}",
+            params,
+        )
+        return {GrampsId(person_id) for (person_id,) in self.__cur.fetchall()}
+
+    def __media_of_persons(self, person_ids: set[GrampsId]) -> set[GrampsId]:
+        condition, params = _ids_filter("person.gramps_id", person_ids)
+        self.__cur.execute(
+            "SELECT media.gramps_id FROM reference "  # noqa: S608
+            "JOIN person ON person.handle = reference.obj_handle "
+            "JOIN media ON media.handle = reference.ref_handle "
+            f'WHERE reference.ref_class = "Media"{condition}',
+            params,
+        )
+        return {GrampsId(media_id) for (media_id,) in self.__cur.fetchall()}
+
+    def __persons_of_media(self, media_ids: set[GrampsId]) -> set[GrampsId]:
+        condition, params = _ids_filter("media.gramps_id", media_ids)
+        self.__cur.execute(
+            "SELECT person.gramps_id FROM reference "  # noqa: S608
+            "JOIN person ON person.handle = reference.obj_handle "
+            "JOIN media ON media.handle = reference.ref_handle "
+            f'WHERE reference.ref_class = "Media"{condition}',
+            params,
+        )
+        return {GrampsId(person_id) for (person_id,) in self.__cur.fetchall()}
+
+    def __get_persons(
+        self, cur: sqlite3.Cursor, person_ids: set[GrampsId] | None = None
+    ) -> dict[GrampsId, Person]:
         persons = {}
-        self.__cur.execute("SELECT gramps_id, given_name, surname, gender FROM person")
-        persons_raw = self.__cur.fetchall()
+        condition, params = _ids_filter("gramps_id", person_ids)
+        cur.execute(
+            "SELECT gramps_id, given_name, surname, gender FROM person "  # noqa: S608
+            f"WHERE 1{condition}",
+            params,
+        )
+        persons_raw = cur.fetchall()
         for _id, given_name, surname, gender in persons_raw:
-            birth_day, death_day = self.__parse_lifetime(_id)
+            birth_day, death_day = self.__parse_lifetime(cur, _id)
             person = Person(
                 _id=_id,
                 full_name=f"{given_name} {surname}",
@@ -66,15 +278,18 @@ class SQliteGrampsTreeLoader(ITreeLoader):
             persons[_id] = person
         return persons
 
-    def __parse_lifetime(self, _id: GrampsId) -> tuple[Date, Date | None]:
-        self.__cur.execute(
+    @staticmethod
+    def __parse_lifetime(
+        cur: sqlite3.Cursor, _id: GrampsId
+    ) -> tuple[Date, Date | None]:
+        cur.execute(
             f"SELECT event.json_data "  # noqa: S608
             f"FROM person "
             f"JOIN reference ON reference.obj_handle  = person.handle "
             f"JOIN event ON event.handle = reference.ref_handle "
             f'WHERE person.gramps_id = "{_id}"',
         )
-        events = self.__cur.fetchall()
+        events = cur.fetchall()
         birth_day, death_day = None, None
         for (raw_event,) in events:
             event = json.loads(raw_event)
@@ -91,10 +306,24 @@ class SQliteGrampsTreeLoader(ITreeLoader):
 
         return birth_day, death_day
 
-    def __get_notes(self) -> dict[GrampsId, Note]:
+    def __get_notes(
+        self, cur: sqlite3.Cursor, person_ids: set[GrampsId] | None = None
+    ) -> dict[GrampsId, Note]:
         notes = {}
-        self.__cur.execute("SELECT note.gramps_id, note.json_data FROM note")
-        notes_raw = self.__cur.fetchall()
+        condition, params = self.__referenced_by_persons("note", person_ids)
+        if self.__texts is not None:
+            cur.execute(
+                "SELECT note.gramps_id FROM note" + condition,  # noqa: S608
+                params,
+            )
+            for (_id,) in cur.fetchall():
+                notes[_id] = Note(gramps_id=GrampsId(_id), content=self.__texts)
+            return notes
+        cur.execute(
+            "SELECT note.gramps_id, note.json_data FROM note" + condition,  # noqa: S608
+            params,
+        )
+        notes_raw = cur.fetchall()
         for _id, raw_data in notes_raw:
             dict_data = json.loads(raw_data)
             note = Note(
@@ -104,16 +333,33 @@ class SQliteGrampsTreeLoader(ITreeLoader):
             notes[_id] = note
         return notes
 
-    def __get_events(self) -> dict[GrampsId, Event]:
+    def __get_events(
+        self, cur: sqlite3.Cursor, person_ids: set[GrampsId] | None = None
+    ) -> dict[GrampsId, Event]:
         events = {}
-        self.__cur.execute("SELECT event.gramps_id, event.json_data FROM event")
-        event_raw = self.__cur.fetchall()
+        condition, params = self.__referenced_by_persons("event", person_ids)
+        # Без описаний база отдает из json_data событий только даты.
+        data = (
+            "json_object('gramps_id', event.gramps_id, "
+            "'date', json_extract(event.json_data, '$.date'))"
+            if self.__texts is not None
+            else "event.json_data"
+        )
+        cur.execute(
+            f"SELECT event.gramps_id, {data} FROM event" + condition,  # noqa: S608
+            params,
+        )
+        event_raw = cur.fetchall()
         for _id, raw_data in event_raw:
             dict_data = json.loads(raw_data)
             try:
                 event = Event(
                     date=Date.from_gramps_json_date(dict_data["date"]),
-                    description=dict_data["description"],
+                    description=(
+                        self.__texts
+                        if self.__texts is not None
+                        else dict_data["description"]
+                    ),
                     gramps_id=dict_data["gramps_id"],
                 )
             except ValueError as error:
@@ -123,22 +369,41 @@ class SQliteGrampsTreeLoader(ITreeLoader):
             events[GrampsId(_id)] = event
         return events
 
-    def __add_notes_to_person(self) -> None:
+    @staticmethod
+    def __referenced_by_persons(
+        table: str, person_ids: set[GrampsId] | None
+    ) -> tuple[str, tuple]:
+        """Условие на строки table, на которые ссылаются персоны person_ids."""
+        if person_ids is None:
+            return "", ()
+        condition, params = _ids_filter("person.gramps_id", person_ids)
+        return (
+            f" WHERE {table}.handle IN (SELECT reference.ref_handle FROM reference "  # noqa: S608
+            "JOIN person ON person.handle = reference.obj_handle "
+            f"WHERE 1{condition})",
+            params,
+        )
+
+    def __add_notes_to_person(self, person_ids: set[GrampsId] | None = None) -> None:
+        condition, params = _ids_filter("person.gramps_id", person_ids)
         self.__cur.execute(
-            "SELECT person.gramps_id AS person_id, note.gramps_id AS note_id "
+            "SELECT person.gramps_id AS person_id, note.gramps_id AS note_id "  # noqa: S608
             "FROM reference JOIN person ON person.handle = reference.obj_handle "
             "JOIN note ON note.handle = reference.ref_handle "
-            'WHERE reference.ref_class = "Note"; ',
+            f'WHERE reference.ref_class = "Note"{condition}; ',
+            params,
         )
         for person_id, note_id in self.__cur.fetchall():
             self.__persons[person_id].add_note(self.__notes[note_id])
 
-    def __add_event_for_person(self) -> None:
+    def __add_event_for_person(self, person_ids: set[GrampsId] | None = None) -> None:
+        condition, params = _ids_filter("person.gramps_id", person_ids)
         self.__cur.execute(
-            "SELECT person.gramps_id AS person_id, event.gramps_id AS event_id "
+            "SELECT person.gramps_id AS person_id, event.gramps_id AS event_id "  # noqa: S608
             "FROM reference JOIN person ON person.handle = reference.obj_handle "
             "JOIN event ON event.handle = reference.ref_handle "
-            'WHERE reference.ref_class = "Event"; ',
+            f'WHERE reference.ref_class = "Event"{condition}; ',
+            params,
         )
         for person_id, event_id in self.__cur.fetchall():
             self.__persons[person_id].add_event(self.__events[event_id])
@@ -171,10 +436,15 @@ class SQliteGrampsTreeLoader(ITreeLoader):
         relations = set()
         families = {}
         relation_raw = self.__cur.fetchall()
-        for _family_id, father_id, mother_id, person_id in relation_raw:
-            family_id = GrampsId(_family_id)
-            if family_id not in families:
-                families[family_id] = Family(family_id)
+        for _family_id, *person_ids in relation_raw:
+            if _family_id not in families:
+                families[_family_id] = Family(GrampsId(_family_id))
+            # Связи ссылаются на те же строки GrampsId, что семьи и персоны.
+            family_id = families[_family_id].gramps_id
+            father_id, mother_id, person_id = (
+                self.__persons[_id].gramps_id if _id is not None else None
+                for _id in person_ids
+            )
             if (person_id == father_id and mother_id is not None) or (
                 person_id == mother_id and father_id is not None
             ):
@@ -209,12 +479,17 @@ class SQliteGrampsTreeLoader(ITreeLoader):
 
         return relations, families
 
-    def __get_media(self) -> dict[GrampsId, Media]:
+    def __get_media(
+        self, cur: sqlite3.Cursor, media_ids: set[GrampsId] | None = None
+    ) -> dict[GrampsId, Media]:
         media = {}
-        self.__cur.execute(
-            "SELECT media.gramps_id, media.mime, media.path, media.desc FROM media"
+        condition, params = _ids_filter("media.gramps_id", media_ids)
+        cur.execute(
+            "SELECT media.gramps_id, media.mime, media.path, media.desc FROM media "  # noqa: S608
+            f"WHERE 1{condition}",
+            params,
         )
-        raw = self.__cur.fetchall()
+        raw = cur.fetchall()
         for gramps_id, mime, media_path, description in raw:
             if mime not in ("image/jpeg", "image/png"):
                 continue
@@ -225,12 +500,14 @@ class SQliteGrampsTreeLoader(ITreeLoader):
             media[gramps_id] = media_obj
         return media
 
-    def __map_media_to_person(self):
+    def __map_media_to_person(self, media_ids: set[GrampsId] | None = None):
+        condition, params = _ids_filter("media.gramps_id", media_ids)
         self.__cur.execute(
-            "SELECT person.gramps_id AS person_id, media.gramps_id AS media_id "
+            "SELECT person.gramps_id AS person_id, media.gramps_id AS media_id "  # noqa: S608
             "FROM reference JOIN person ON person.handle = reference.obj_handle "
             "JOIN media ON media.handle = reference.ref_handle "
-            'WHERE reference.ref_class = "Media"; ',
+            f'WHERE reference.ref_class = "Media"{condition}; ',
+            params,
         )
         for person_id, media_id in self.__cur.fetchall():
             media = self.__media[media_id]
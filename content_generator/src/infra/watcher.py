@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+
+# Gramps пишет в sqlite с журналом, изменения могут быть только в -wal файле.
+_DATABASE_FILES = ("sqlite.db", "sqlite.db-wal")
+
+_FileState = dict[Path, tuple[int, int]]
+
+
+class WatchEvent(NamedTuple):
+    database: bool
+    media_files: frozenset[Path]
+
+
+class GrampsWatcher:
+    """Опрос базы Gramps и каталога медиа.
+
+    Файлы опрашиваются раз в interval секунд по времени изменения и
+    размеру. Gramps при сохранении пишет в базу несколько раз подряд, поэтому
+    изменение возвращается, только когда файлы не менялись debounce секунд.
+    """
+
+    def __init__(
+        self, gramps_tree_path: Path, interval: float = 1.0, debounce: float = 2.0
+    ):
+        self.__gramps_tree_path = gramps_tree_path
+        self.__interval = interval
+        self.__debounce = debounce
+        self.__database = self.__database_state()
+        self.__media = self.__media_state()
+
+    def wait(self) -> WatchEvent:
+        """Блокируется до следующего изменения, после которого наступило затишье."""
+        seen = (self.__database, self.__media)
+        last_change = None
+        while True:
+            time.sleep(self.__interval)
+            state = (self.__database_state(), self.__media_state())
+            if state != seen:
+                seen = state
+                last_change = time.monotonic()
+                continue
+            if last_change is None or time.monotonic() - last_change < self.__debounce:
+                continue
+            database, media = state
+            event = WatchEvent(
+                database=database != self.__database,
+                media_files=frozenset(
+                    path
+                    for path in media.keys() | self.__media.keys()
+                    if media.get(path) != self.__media.get(path)
+                ),
+            )
+            self.__database, self.__media = database, media
+            if event.database or event.media_files:
+                logger.info(f"Gramps tree changed: {event}")
+                return event
+            last_change = None
+
+    def __database_state(self) -> _FileState:
+        return self.__state(self.__gramps_tree_path / name for name in _DATABASE_FILES)
+
+    def __media_state(self) -> _FileState:
+        return self.__state((self.__gramps_tree_path / "media").rglob("*"))
+
+    @staticmethod
+    def __state(paths) -> _FileState:
+        state = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
@@ -1,9 +1,11 @@
-import datetime
+from collections.abc import Iterable
 from pathlib import Path
 
 from ..app.entities import Person
-from src.app.entities import GrampsTree
-from .small_tree_render import SmallTreeRender, WithoutRelationsError
+from src.app.entities import GrampsId, GrampsTree, build_today
+from src.app.kinship import Kinship, KinshipCalculator
+from .small_tree_render import SmallTreeRender, SvgBackend, WithoutRelationsError
+from .image_markup import image_markup
 
 
 class Article:
@@ -33,6 +35,10 @@ class Article:
             f"{self.__main_content}"
         )
 
+    @property
+    def slug(self) -> str:
+        return self.__slug
+
     def export_to_file(self, parent_path: Path):
         with (parent_path / f"{self.__slug}.md").open("w") as file:
             file.write(str(self))
@@ -46,20 +52,62 @@ class Article:
 
 
 class Biographer:
-    def __init__(self, gramps_tree: GrampsTree, content_dir: str):
+    """Статьи о персонах.
+
+    При export_markdown=False статьи не записываются в content/persons, а
+    только доступны через articles (их забирает плагин gramps_persons).
+
+    При inline_small_trees=True малое дерево вставляется в статью готовой
+    svg разметкой, а файл content/images/small_trees/ID.svg не создается:
+    pelican_embed_svg не придется читать его и встраивать в страницу.
+
+    person_ids ограничивает статьи этими персонами: так режим наблюдения
+    обновляет только затронутые изменением страницы.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        gramps_tree: GrampsTree,
+        content_dir: str,
+        founder_id: GrampsId | None = None,
+        *,
+        export_markdown: bool = True,
+        inline_small_trees: bool = False,
+        person_ids: Iterable[GrampsId] | None = None,
+    ):
         self.__gramps_tree = gramps_tree
+        self.__content_dir = content_dir
+        self.__inline_small_trees = inline_small_trees
+        self.__founder_id = founder_id
+        self.__founder_relations: dict[GrampsId, Kinship] = (
+            KinshipCalculator(gramps_tree).relations_to(founder_id)
+            if founder_id is not None
+            else {}
+        )
 
-        persons_dir = Path(f"{content_dir}/persons")
-        persons_dir.mkdir(parents=True, exist_ok=True)
+        persons = (
+            self.__gramps_tree.persons.values()
+            if person_ids is None
+            else [self.__gramps_tree.persons[person_id] for person_id in person_ids]
+        )
+        self.__articles = [
+            self.__crate_article_from_person(person) for person in persons
+        ]
+        if export_markdown:
+            persons_dir = Path(f"{content_dir}/persons")
+            persons_dir.mkdir(parents=True, exist_ok=True)
+            for article in self.__articles:
+                article.export_to_file(persons_dir)
 
-        for person in self.__gramps_tree.persons.values():
-            article = self.__crate_article_from_person(person)
-            article.export_to_file(persons_dir)
+    @property
+    def articles(self) -> list[Article]:
+        return self.__articles
 
     def __crate_article_from_person(self, person: Person):
         main_content = f"Дата рождения: {person.birth_day}\n\n"
-        if person.death_day.date < datetime.datetime.now(tz=datetime.UTC).date():
+        if person.death_day.date < build_today():
             main_content += f"Дата смерти: {person.death_day}\n\n"
+        main_content += self.__add_founder_relation(person)
         main_content += self.__add_small_tree(person)
         main_content += self.__prepare_events(person)
         if person.notes:
@@ -69,8 +117,7 @@ class Biographer:
         if person.media:
             main_content += "## Галерея\n\n"
             for media in person.media:
-                link = "{static}/images/gallery/" + media.path.name
-                main_content += f"![{media.description}]({link})\n\n"
+                main_content += f"{image_markup(media)}\n\n"
 
         return Article(
             title=person.full_name,
@@ -81,6 +128,16 @@ class Biographer:
             main_content=main_content,
         )
 
+    def __add_founder_relation(self, person: Person) -> str:
+        kinship = self.__founder_relations.get(person.gramps_id)
+        if kinship is None:
+            return ""
+        founder = self.__gramps_tree.persons[self.__founder_id]
+        return (
+            f"Родство с основателем деревни "
+            f"[{founder}]({{filename}}{self.__founder_id}.md): {kinship.label}\n\n"
+        )
+
     def __prepare_events(self, person) -> str:
         content = ""
         if person.events:
@@ -94,13 +151,19 @@ class Biographer:
         return ""
 
     def __add_small_tree(self, person: Person):
-        small_tree_render = SmallTreeRender()
+        small_tree_render = SmallTreeRender(backend=SvgBackend.TEMPLATE)
         try:
+            if self.__inline_small_trees:
+                svg = small_tree_render.render_inline(
+                    person.gramps_id, self.__gramps_tree
+                )
+                # Одна строка, чтобы markdown оставил html блок без изменений.
+                return f'<div class="small-tree">{svg}</div>\n\n'
             small_tree_render.create_svg(
                 base_person_id=person.gramps_id,
                 gramps_tree=self.__gramps_tree,
                 output_path=Path(
-                    "content/images/small_trees/" + person.gramps_id + ".svg"
+                    f"{self.__content_dir}/images/small_trees/{person.gramps_id}.svg"
                 ),
             )
         except WithoutRelationsError:
@@ -0,0 +1,61 @@
+import csv
+from pathlib import Path
+
+from loguru import logger
+from src.app.duplicates import DuplicateCandidate
+
+
+class DuplicatesReport:
+    """Отчет о кандидатах в дубликаты для ручной проверки в Gramps."""
+
+    def __init__(self, candidates: list[DuplicateCandidate]):
+        self.__candidates = candidates
+
+    def save(self, reports_dir: Path):
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        self.__save_csv(reports_dir / "duplicates.csv")
+        self.__save_markdown(reports_dir / "duplicates.md")
+        logger.info(
+            f"{len(self.__candidates)} duplicate candidates saved to {reports_dir}"
+        )
+
+    def __save_csv(self, path: Path):
+        with path.open("w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                [
+                    "score",
+                    "name_similarity",
+                    "date_similarity",
+                    "first_id",
+                    "first",
+                    "second_id",
+                    "second",
+                ]
+            )
+            for candidate in self.__candidates:
+                writer.writerow(
+                    [
+                        f"{candidate.score:.3f}",
+                        f"{candidate.name_similarity:.3f}",
+                        f"{candidate.date_similarity:.3f}",
+                        candidate.first.gramps_id,
+                        str(candidate.first),
+                        candidate.second.gramps_id,
+                        str(candidate.second),
+                    ]
+                )
+
+    def __save_markdown(self, path: Path):
+        lines = [
+            "# Возможные дубликаты\n",
+            "| Оценка | Имена | Даты | Первая персона | Вторая персона |",
+            "|---|---|---|---|---|",
+        ]
+        lines.extend(
+            f"| {c.score:.2f} | {c.name_similarity:.2f} | {c.date_similarity:.2f} "
+            f"| {c.first.gramps_id} {c.first} | {c.second.gramps_id} {c.second} |"
+            for c in self.__candidates
+        )
+        with path.open("w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
@@ -1,10 +1,10 @@
 import shutil
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 
-from PIL import Image
-
-from ..app.entities import GrampsId, Media
-from src.app.entities import GrampsTree
+from src.app.entities import GrampsId, GrampsTree, Media, Person
+from src.presenters.image_markup import image_markup
+from src.presenters.thumbnails import write_thumbnails
 
 
 class Gallery:
@@ -17,39 +17,76 @@ class Gallery:
 
     def generate_gallery(self):
         self.__clear_gallery()
+        self.__copy_media_to_gallery(self.__gramps_tree.media.values())
+        media_by_paths = self.__regroup_media_by_paths(self.__gramps_tree.media)
+        for media, persons in media_by_paths.values():
+            self.__content.add_image(media, persons)
+        self.__content.save()
+
+    def update_gallery(self, sources: Mapping[GrampsId, Path]):
+        """Копирует в галерею только медиа sources из их исходных файлов.
+
+        Остальные медиа уже скопированы generate_gallery. Файлы медиа,
+        которых больше нет в дереве, удаляются, страница пишется заново.
+        """
+        self._IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+        for media_id, source in sources.items():
+            self.__gramps_tree.media[media_id].path = source
+        self.__copy_media_to_gallery(
+            self.__gramps_tree.media[media_id] for media_id in sources
+        )
         media_by_paths = self.__regroup_media_by_paths(self.__gramps_tree.media)
-        for media in media_by_paths.values():
-            self.__copy_media_to_gallery(media)
-            self.__content.add_image(media)
+        names = {
+            thumbnail.path.name
+            for media, _ in media_by_paths.values()
+            for thumbnail in media.thumbnails
+        }
+        for path in self._IMAGES_DIR.iterdir():
+            if path.name not in names:
+                path.unlink()
+        for media, persons in media_by_paths.values():
+            self.__content.add_image(media, persons)
         self.__content.save()
 
+    def copy_media(self):
+        """Копирует в галерею медиа дерева, не трогая остальные файлы.
+
+        Страница галереи не пишется: так ветка дерева получает изображения
+        для своих статей и не затирает галерею всей деревни.
+        """
+        self._IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+        self.__copy_media_to_gallery(self.__gramps_tree.media.values())
+
     def __clear_gallery(self):
         shutil.rmtree(self._IMAGES_DIR, ignore_errors=True)
-        self._IMAGES_DIR.mkdir()
+        self._IMAGES_DIR.mkdir(parents=True)
 
-    def __copy_media_to_gallery(self, media: Media):
-        new_path = Path(shutil.copy(media.path, self._IMAGES_DIR)).absolute()
-        self.__scale_image(new_path)
-        media.path = new_path
+    def __copy_media_to_gallery(self, media: Iterable[Media]):
+        """Пишет копии изображений в галерею, каждый файл один раз.
 
-    @staticmethod
-    def __scale_image(
-        input_image_path,
-        max_width=400,
-    ):
-        image = Image.open(input_image_path)
-        w, h = image.size
-        image.thumbnail((max_width, h))
-        image.save(input_image_path)
+        media.path заменяется самой большой копией в формате исходника, по
+        ней изображение открывается целиком.
+        """
+        thumbnails_by_source = {}
+        for m in media:
+            if m.path not in thumbnails_by_source:
+                thumbnails_by_source[m.path] = write_thumbnails(
+                    m.path, self._IMAGES_DIR.absolute()
+                )
+            m.thumbnails = thumbnails_by_source[m.path]
+            m.path = m.thumbnails[-1].path
 
     @staticmethod
-    def __regroup_media_by_paths(media: dict[GrampsId, Media]):
-        result: dict[Path, Media] = {}
+    def __regroup_media_by_paths(
+        media: dict[GrampsId, Media],
+    ) -> dict[Path, tuple[Media, list[Person]]]:
+        """Одно изображение может быть несколькими медиа с разными людьми."""
+        result: dict[Path, tuple[Media, list[Person]]] = {}
         for m in media.values():
             if m.path not in result:
-                result[m.path] = m
+                result[m.path] = (m, list(m.persons))
             else:
-                [result[m.path].mark_person(p) for p in m.persons]
+                result[m.path][1].extend(m.persons)
         return result
 
 
@@ -58,12 +95,11 @@ class _GalleryPage:
         self.__content = "Title: Галерея\nCategory: Галерея\nDate: 2021-01-29 13:12\n"
         self.__path = path
 
-    def add_image(self, media: Media):
-        link = "{static}/images/gallery/" + media.path.name
-        self.__content += f"![{media.description}]({link})\n\n"
-        if media.persons:
+    def add_image(self, media: Media, persons: list[Person]):
+        self.__content += f"{image_markup(media)}\n\n"
+        if persons:
             self.__content += "Люди на изображении: "
-            for p in media.persons:
+            for p in persons:
                 self.__content += (
                     "["
                     + p.full_name
@@ -0,0 +1,64 @@
+"""Разметка изображений галереи на страницах сайта.
+
+Модуль не импортирует PIL: его используют статьи, а копии изображений
+пишет Gallery через thumbnails.
+"""
+
+import html
+
+from src.app.entities import Media, Thumbnail
+
+# Ширина изображения на странице.
+_DISPLAY_WIDTH = 400
+_GALLERY_LINK = "{static}/images/gallery/"
+
+
+def image_markup(media: Media) -> str:
+    """Изображение медиа для markdown страницы.
+
+    Браузер выбирает из srcset копию под ширину и плотность экрана, webp -
+    если поддерживает его. width и height резервируют место под изображение
+    до загрузки. Изображение ссылается на самую большую копию. Медиа без
+    копий, например в статьях без галереи, выводятся markdown ссылкой на
+    media.path.
+
+    >>> from pathlib import Path
+    >>> media = Media(Path("800.jpg"), 'Дом "Ивановых"')
+    >>> image_markup(media)
+    '![Дом "Ивановых"]({static}/images/gallery/800.jpg)'
+    >>> media.thumbnails = [
+    ...     Thumbnail(Path(f"{w}.{ext}"), w, w // 2)
+    ...     for w in (400, 800)
+    ...     for ext in ("webp", "jpg")
+    ... ]
+    >>> _srcset(media.thumbnails[::2])
+    '{static}/images/gallery/400.webp 400w, {static}/images/gallery/800.webp 800w'
+    >>> markup = image_markup(media)
+    >>> markup.startswith('<a href="{static}/images/gallery/800.jpg"><picture>')
+    True
+    >>> 'src="{static}/images/gallery/400.jpg"' in markup
+    True
+    >>> 'width="400" height="200" alt="Дом &quot;Ивановых&quot;"' in markup
+    True
+    """
+    if not media.thumbnails:
+        return f"![{media.description}]({_GALLERY_LINK}{media.path.name})"
+    webp = [t for t in media.thumbnails if t.path.suffix == ".webp"]
+    original = [t for t in media.thumbnails if t.path.suffix != ".webp"]
+    shown = next((t for t in original if t.width >= _DISPLAY_WIDTH), original[-1])
+    sizes = f"(max-width: {shown.width}px) 100vw, {shown.width}px"
+    alt = html.escape(media.description or "")
+    return (
+        f'<a href="{_GALLERY_LINK}{original[-1].path.name}"><picture>'
+        f'<source type="image/webp" srcset="{_srcset(webp)}" sizes="{sizes}">'
+        f'<img src="{_GALLERY_LINK}{shown.path.name}" srcset="{_srcset(original)}" '
+        f'sizes="{sizes}" width="{shown.width}" height="{shown.height}" '
+        f'alt="{alt}" loading="lazy"></picture></a>'
+    )
+
+
+def _srcset(thumbnails: list[Thumbnail]) -> str:
+    return ", ".join(
+        f"{_GALLERY_LINK}{thumbnail.path.name} {thumbnail.width}w"
+        for thumbnail in thumbnails
+    )
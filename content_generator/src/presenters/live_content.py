@@ -0,0 +1,150 @@
+from collections import defaultdict
+from pathlib import Path
+
+from loguru import logger
+from src.app.entities import GrampsId, GrampsTree
+from src.app.kinship import KinshipCalculator, village_founder
+from src.app.tree_changes import TreeChanges
+from src.presenters.biographer import Biographer
+from src.presenters.gallery import Gallery
+from src.presenters.search_index import SearchIndex
+from src.presenters.timeline import Timeline
+from src.presenters.tree_render import TreeRender
+
+
+class LiveContent:
+    """Обновление контента по изменениям дерева, которое держится в памяти.
+
+    Статья персоны пишется заново, если изменилась она сама, кто-то с ее
+    малого дерева (родители, супруги, дети) или ее родство с основателем
+    деревни. При person_markdown статьи пишутся markdown файлами в
+    content/persons, иначе их строит плагин gramps_persons по кешу дерева,
+    который main обновляет после каждого update: markdown файлы плагин
+    пропускает, и после остановки наблюдения они бы устарели. В галерею
+    копируются только перечитанные медиа и медиа с измененным файлом.
+    Большое дерево, хронология и поиск пересобираются целиком, если
+    изменились персоны или семьи.
+
+    Создается до Gallery.generate_gallery, пока пути медиа указывают на
+    исходные файлы Gramps.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        gramps_tree: GrampsTree,
+        content_dir: str,
+        *,
+        inline_small_trees: bool = False,
+        person_markdown: bool = False,
+        layout_cache_path: Path | None = None,
+    ):
+        self.__gramps_tree = gramps_tree
+        self.__content_dir = Path(content_dir)
+        self.__inline_small_trees = inline_small_trees
+        self.__person_markdown = person_markdown
+        self.__layout_cache_path = layout_cache_path
+        self.__relatives = self.__small_tree_relatives()
+        self.__kinship = self.__kinship_labels()
+        self.__media_sources = {
+            media_id: media.path for media_id, media in gramps_tree.media.items()
+        }
+
+    def media_of_files(self, paths: frozenset[Path]) -> set[GrampsId]:
+        """Медиа, исходные файлы которых изменились."""
+        resolved = {path.resolve() for path in paths}
+        return {
+            media_id
+            for media_id, source in self.__media_sources.items()
+            if source.resolve() in resolved
+        }
+
+    def update(self, changes: TreeChanges, media_files: frozenset[Path]):
+        for media_id in changes.media:
+            self.__media_sources[media_id] = self.__gramps_tree.media[media_id].path
+        for media_id in changes.removed_media:
+            self.__media_sources.pop(media_id, None)
+        changed_media = set(changes.media) | self.media_of_files(media_files)
+
+        persons_changed = bool(
+            changes.persons or changes.removed_persons or changes.families
+        )
+        if persons_changed:
+            self.__update_person_pages(changes)
+            TreeRender(
+                self.__gramps_tree,
+                self.__content_dir / "images/tree.svg",
+                layout_cache_path=self.__layout_cache_path,
+            )
+            Timeline(self.__gramps_tree).generate_timeline()
+            SearchIndex(self.__gramps_tree).generate_index()
+        if changed_media or changes.removed_media:
+            Gallery(self.__gramps_tree).update_gallery(
+                {
+                    media_id: self.__media_sources[media_id]
+                    for media_id in changed_media
+                    if media_id in self.__gramps_tree.media
+                }
+            )
+            logger.info(f"Gallery updated: {len(changed_media)} media copied")
+
+    def __update_person_pages(self, changes: TreeChanges):
+        relatives = self.__small_tree_relatives()
+        kinship = self.__kinship_labels()
+        pages = set(changes.persons)
+        for person_id in changes.persons | changes.removed_persons:
+            pages |= self.__relatives.get(person_id, set())
+            pages |= relatives.get(person_id, set())
+        for person_id in relatives.keys() | self.__relatives.keys():
+            if relatives.get(person_id) != self.__relatives.get(person_id):
+                pages.add(person_id)
+        for person_id in kinship.keys() | self.__kinship.keys():
+            if kinship.get(person_id) != self.__kinship.get(person_id):
+                pages.add(person_id)
+        founder = village_founder(self.__gramps_tree)
+        if founder is not None and founder.gramps_id in changes.persons:
+            # Имя основателя есть на странице каждого его родственника.
+            pages |= kinship.keys()
+        self.__relatives, self.__kinship = relatives, kinship
+
+        persons_dir = self.__content_dir / "persons"
+        small_trees_dir = self.__content_dir / "images/small_trees"
+        for person_id in changes.removed_persons:
+            (persons_dir / f"{person_id}.md").unlink(missing_ok=True)
+            (small_trees_dir / f"{person_id}.svg").unlink(missing_ok=True)
+
+        pages &= self.__gramps_tree.persons.keys()
+        # Без markdown статей Biographer только перерисовывает малые деревья.
+        Biographer(
+            self.__gramps_tree,
+            str(self.__content_dir),
+            founder_id=founder.gramps_id if founder is not None else None,
+            export_markdown=self.__person_markdown,
+            inline_small_trees=self.__inline_small_trees,
+            person_ids=sorted(pages),
+        )
+        logger.info(
+            f"{len(pages)} person pages updated, "
+            f"{len(changes.removed_persons)} removed"
+        )
+
+    def __small_tree_relatives(self) -> dict[GrampsId, set[GrampsId]]:
+        """Персоны, которые видны на малом дереве каждой персоны."""
+        relatives: dict[GrampsId, set[GrampsId]] = defaultdict(set)
+        for family in self.__gramps_tree.families.values():
+            parents = {person.gramps_id for person in family.parents}
+            children = {person.gramps_id for person in family.children}
+            for parent_id in parents:
+                relatives[parent_id] |= parents - {parent_id}
+                relatives[parent_id] |= children
+            for child_id in children:
+                relatives[child_id] |= parents
+        return dict(relatives)
+
+    def __kinship_labels(self) -> dict[GrampsId, str]:
+        founder = village_founder(self.__gramps_tree)
+        if founder is None:
+            return {}
+        relations = KinshipCalculator(self.__gramps_tree).relations_to(
+            founder.gramps_id
+        )
+        return {person_id: kinship.label for person_id, kinship in relations.items()}
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from src.app.revision import REVISION_YEARS, RevisionMatcher, parse_revision_item
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from src.app.entities import GrampsTree
+
+_REVISION_FILE = re.compile(r"^(\d+)_revision\.md$")
+_REVISION_ITEM = re.compile(r"^>\s*-\s")
+_PERSON_LINK = re.compile(r"\[([^\]]+)\]\(\{filename\}(?:\.\./)?persons/I\d+\.md\)")
+
+
+class RevisionAnnotator:
+    """Проставляет в расшифровках ревизий ссылки на страницы персон.
+
+    Расшифровки пишутся вручную в каталоге revisions вне content, а
+    страницы со ссылками генерируются в content/revisions: исходники не
+    переписываются. Ссылки проставляются в элементах списков внутри цитат
+    (строки "> - "). Написанные вручную ссылки на персоны перед
+    сопоставлением снимаются, поэтому все ссылки соответствуют дереву.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__matcher = RevisionMatcher(gramps_tree)
+
+    def annotate_pages(self, source_dir: Path, output_dir: Path):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(source_dir.glob("*_revision.md")):
+            found = _REVISION_FILE.match(path.name)
+            if found is None or int(found.group(1)) not in REVISION_YEARS:
+                continue
+            self.__annotate_page(
+                path, output_dir / path.name, REVISION_YEARS[int(found.group(1))]
+            )
+
+    def __annotate_page(self, path: Path, output_path: Path, revision_year: int):
+        lines = path.read_text(encoding="utf-8").split("\n")
+        entries_count = linked_count = 0
+        for i, line in enumerate(lines):
+            if not _REVISION_ITEM.match(line):
+                continue
+            annotated = _PERSON_LINK.sub(r"\1", line)
+            entries = parse_revision_item(annotated)
+            entries_count += len(entries)
+            for entry in reversed(entries):
+                person = self.__matcher.match(entry, revision_year)
+                if person is None:
+                    continue
+                linked_count += 1
+                annotated = (
+                    f"{annotated[: entry.start]}[{entry.name}]"
+                    f"({{filename}}../persons/{person.gramps_id}.md)"
+                    f"{annotated[entry.end :]}"
+                )
+            lines[i] = annotated
+
+        output_path.write_text("\n".join(lines), encoding="utf-8")
+        if entries_count:
+            logger.info(
+                f"{path.name}: {linked_count} of {entries_count} entries linked"
+            )
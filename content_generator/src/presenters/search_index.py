@@ -0,0 +1,73 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from loguru import logger
+from src.app.entities import GrampsTree, Person, build_today
+from src.app.names import edge_ngrams, name_tokens
+
+_SHARD_KEY_LENGTH = 2
+
+
+class SearchIndex:
+    """Поисковый индекс по персонам для страницы поиска.
+
+    Индекс разбит на шарды по первым двум буквам слова имени, чтобы браузер
+    загружал только нужный файл. Шард - это список персон
+    [id, имя, год рождения, год смерти] и словарь префиксов слов в номера
+    персон этого списка.
+    """
+
+    _SEARCH_DIR = Path("content/search")
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__gramps_tree = gramps_tree
+
+    def generate_index(self):
+        shards: dict[str, _Shard] = defaultdict(_Shard)
+        for person in self.__gramps_tree.persons.values():
+            for token in set(name_tokens(person.full_name)):
+                if len(token) < _SHARD_KEY_LENGTH:
+                    continue
+                shards[token[:_SHARD_KEY_LENGTH]].add(person, token)
+
+        self._SEARCH_DIR.mkdir(parents=True, exist_ok=True)
+        for old_shard in self._SEARCH_DIR.glob("*.json"):
+            old_shard.unlink()
+        for key, shard in shards.items():
+            with (self._SEARCH_DIR / f"{key}.json").open("w", encoding="utf-8") as f:
+                json.dump(shard.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+        logger.info(f"Search index of {len(shards)} shards saved to {self._SEARCH_DIR}")
+
+
+class _Shard:
+    def __init__(self):
+        self.__persons: list[list] = []
+        self.__person_indexes: dict[str, int] = {}
+        self.__ngrams: dict[str, list[int]] = defaultdict(list)
+
+    def add(self, person: Person, token: str):
+        index = self.__person_indexes.get(person.gramps_id)
+        if index is None:
+            index = len(self.__persons)
+            self.__person_indexes[person.gramps_id] = index
+            self.__persons.append(self.__person_record(person))
+        for ngram in edge_ngrams(token):
+            indexes = self.__ngrams[ngram]
+            if not indexes or indexes[-1] != index:
+                indexes.append(index)
+
+    def to_json(self) -> dict:
+        return {"persons": self.__persons, "ngrams": self.__ngrams}
+
+    @staticmethod
+    def __person_record(person: Person) -> list:
+        death_year = None
+        if person.death_day.date < build_today():
+            death_year = person.death_day.date.year
+        return [
+            person.gramps_id,
+            person.full_name.strip(),
+            person.birth_day.date.year,
+            death_year,
+        ]
@@ -1,4 +1,5 @@
 import os
+from enum import Enum
 from operator import attrgetter
 from pathlib import Path
 from typing import NamedTuple
@@ -8,6 +9,8 @@ import drawsvg
 from loguru import logger
 
 from src.app.entities import Gender, GrampsId, Person, GrampsTree
+from src.app.family_graph import NO_PERSON
+from src.presenters.svg_writer import SvgWriter
 
 
 class UnknownDirectionError(Exception):
@@ -39,6 +42,31 @@ class _PartnerRelation(NamedTuple):
     children: list[Person]
 
 
+class _Line(NamedTuple):
+    points: tuple[float, ...]
+    stroke: str
+
+
+class _Rect(NamedTuple):
+    x: float
+    y: float
+    fill: str
+
+
+class _Label(NamedTuple):
+    """Подпись персоны, которая ссылается на ее страницу."""
+
+    x: float
+    y: float
+    text: str
+    gramps_id: GrampsId
+
+
+class SvgBackend(Enum):
+    DRAWSVG = "drawsvg"
+    TEMPLATE = "template"
+
+
 class SmallTreeRender:
     _UP_GENERATION = 2
     _DOWN_GENERATION = 2
@@ -49,9 +77,43 @@ class SmallTreeRender:
     _FONT_SIZE = 14
     _LINE_WIDTH = 0.8
 
+    def __init__(self, backend: SvgBackend = SvgBackend.DRAWSVG):
+        self.__backend = backend
+
     def create_svg(
         self, base_person_id: GrampsId, gramps_tree: GrampsTree, output_path: Path
     ):
+        draw_objects, size = self.__layout(base_person_id, gramps_tree)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.__backend is SvgBackend.TEMPLATE:
+            svg = SvgWriter(*size)
+            self.__write_with_template(draw_objects, svg)
+            svg.save(output_path)
+            return
+
+        draw_svg = drawsvg.Drawing(*size)
+        [
+            draw_svg.append(obj)
+            for obj in sorted(self.__to_drawsvg(draw_objects), key=self.__do_comparator)
+        ]
+        draw_svg.save_svg(output_path)
+        self.__rewrite_svg_with_hyperlink(output_path, gramps_tree)
+
+    def render_inline(self, base_person_id: GrampsId, gramps_tree: GrampsTree) -> str:
+        """Минифицированная svg разметка для вставки прямо в страницу персоны.
+
+        Файл не создается, поэтому pelican_embed_svg не нужно его встраивать.
+        Разметка всегда пишется шаблоном, независимо от backend.
+        """
+        draw_objects, size = self.__layout(base_person_id, gramps_tree)
+        svg = SvgWriter(*size, inline=True)
+        self.__write_with_template(draw_objects, svg)
+        return svg.getvalue()
+
+    def __layout(
+        self, base_person_id: GrampsId, gramps_tree: GrampsTree
+    ) -> tuple[list, tuple[float, float]]:
         base_person = gramps_tree.persons[base_person_id]
 
         partner_relations, parents = self.__create_relationships(
@@ -68,34 +130,93 @@ class SmallTreeRender:
         logger.debug(f"Generations {generations}")
 
         draw_objects = self.__draw_objects(base_person, partner_relations, parents)
-
-        draw_svg = drawsvg.Drawing(
-            *self.__get_size(partner_relations, generations, parents)
-        )
-        [draw_svg.append(obj) for obj in sorted(draw_objects, key=self.__do_comparator)]
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        draw_svg.save_svg(output_path)
-        self.__rewrite_svg_with_hyperlink(output_path, gramps_tree)
+        return draw_objects, self.__get_size(partner_relations, generations, parents)
 
     def __do_comparator(self, obj):
         return str(type(obj))
 
+    def __to_drawsvg(self, draw_objects: list) -> list[drawsvg.DrawingElement]:
+        elements = []
+        for obj in draw_objects:
+            if isinstance(obj, _Line):
+                elements.append(
+                    drawsvg.Lines(
+                        *obj.points,
+                        close=False,
+                        stroke=obj.stroke,
+                        stroke_width=self._LINE_WIDTH,
+                        fill="none",
+                    )
+                )
+            elif isinstance(obj, _Rect):
+                elements.append(
+                    drawsvg.Rectangle(
+                        x=obj.x,
+                        y=obj.y,
+                        width=self._PERSON_WIDTH,
+                        height=self._PERSON_HEIGHT,
+                        fill=obj.fill,
+                    )
+                )
+            else:
+                elements.append(
+                    drawsvg.Text(
+                        text=obj.text, font_size=self._FONT_SIZE, x=obj.x, y=obj.y
+                    )
+                )
+                elements.append(
+                    drawsvg.Text(
+                        text=obj.gramps_id,
+                        font_size=self._FONT_SIZE,
+                        x=obj.x,
+                        y=obj.y,
+                        style="fill-opacity:0",
+                    )
+                )
+        return elements
+
+    def __write_with_template(self, draw_objects: list, svg: SvgWriter):
+        """Пишет svg без drawsvg, сохраняя порядок элементов: линии, блоки, подписи."""
+        for obj in draw_objects:
+            if isinstance(obj, _Line):
+                svg.line(*obj.points, stroke=obj.stroke, stroke_width=self._LINE_WIDTH)
+        for obj in draw_objects:
+            if isinstance(obj, _Rect):
+                svg.rect(
+                    x=obj.x,
+                    y=obj.y,
+                    width=self._PERSON_WIDTH,
+                    height=self._PERSON_HEIGHT,
+                    fill=obj.fill,
+                )
+        for obj in draw_objects:
+            if isinstance(obj, _Label):
+                svg.linked_text(
+                    x=obj.x,
+                    y=obj.y,
+                    text=obj.text,
+                    font_size=self._FONT_SIZE,
+                    href=f"{os.getenv('SITEURL')}/{obj.gramps_id}.html",
+                )
+
     def __create_relationships(
         self, base_person: Person, gramps_tree: GrampsTree
     ) -> tuple[list[_PartnerRelation], list[Person]]:
-        partner_relations = []
-        parents = []
-        for family in gramps_tree.families.values():
-            if base_person in family.parents:
-                partner = family.mother if base_person.is_male() else family.father
-                partner_relations.append(
-                    _PartnerRelation(partner=partner, children=family.children)
-                )
-            if base_person in family.children:
-                if family.father is not None:
-                    parents.append(family.father)
-                if family.mother is not None:
-                    parents.append(family.mother)
+        graph = gramps_tree.graph
+        base = graph.index(base_person.gramps_id)
+        partner_relations = [
+            _PartnerRelation(
+                partner=family.mother if base_person.is_male() else family.father,
+                children=family.children,
+            )
+            for family in map(graph.family, graph.families_as_parent(base))
+        ]
+        parents = [
+            graph.person(parent)
+            for family_i in graph.families_as_child(base)
+            for parent in (graph.father(family_i), graph.mother(family_i))
+            if parent != NO_PERSON
+        ]
         return partner_relations, parents
 
     def __draw_objects(
@@ -218,19 +339,18 @@ class SmallTreeRender:
                 + self._PERSON_WIDTH / 2
             )
         return [
-            drawsvg.Lines(
-                x_up,
-                (
-                    up_generation * (self._PERSON_HEIGHT + self._Y_SPACING)
-                    + self._PERSON_HEIGHT * generation_jitter
+            _Line(
+                points=(
+                    x_up,
+                    (
+                        up_generation * (self._PERSON_HEIGHT + self._Y_SPACING)
+                        + self._PERSON_HEIGHT * generation_jitter
+                    ),
+                    child_column * (self._PERSON_WIDTH + self._X_SPACING)
+                    + self._PERSON_WIDTH * generation_jitter,
+                    (down_generation * (self._PERSON_HEIGHT + self._Y_SPACING)),
                 ),
-                child_column * (self._PERSON_WIDTH + self._X_SPACING)
-                + self._PERSON_WIDTH * generation_jitter,
-                (down_generation * (self._PERSON_HEIGHT + self._Y_SPACING)),
-                close=False,
                 stroke="gray",
-                stroke_width=self._LINE_WIDTH,
-                fill="none",
             )
         ]
 
@@ -246,15 +366,14 @@ class SmallTreeRender:
             + self._PERSON_HEIGHT * generation_jitter
         )
         return [
-            drawsvg.Lines(
-                left_column * (self._PERSON_WIDTH) + self._PERSON_WIDTH,
-                y,
-                right_column * (self._PERSON_WIDTH + self._X_SPACING),
-                y,
-                close=False,
+            _Line(
+                points=(
+                    left_column * (self._PERSON_WIDTH) + self._PERSON_WIDTH,
+                    y,
+                    right_column * (self._PERSON_WIDTH + self._X_SPACING),
+                    y,
+                ),
                 stroke="black",
-                stroke_width=self._LINE_WIDTH,
-                fill="none",
             )
         ]
 
@@ -262,17 +381,15 @@ class SmallTreeRender:
     def __arrange_in_generation(
         base_person: Person, gramps_tree: GrampsTree
     ) -> dict[int, list[Person]]:
+        graph = gramps_tree.graph
+        base = graph.index(base_person.gramps_id)
         generations = {0: set([base_person])}
-        for family in gramps_tree.families.values():
-            if base_person in family.parents:
-                if 1 not in generations:
-                    generations[1] = set()
-                [generations[0].add(person) for person in family.parents]
-                [generations[1].add(person) for person in family.children]
-            if base_person in family.children:
-                if -1 not in generations:
-                    generations[-1] = set()
-                [generations[-1].add(person) for person in family.children]
+        for family_i in graph.families_as_parent(base):
+            family = graph.family(family_i)
+            generations.setdefault(1, set()).update(family.children)
+            generations[0].update(family.parents)
+        for family_i in graph.families_as_child(base):
+            generations.setdefault(-1, set()).update(graph.family(family_i).children)
         for gen_i in generations:
             generations[gen_i] = sorted(
                 generations[gen_i], key=attrgetter("birth_day.date")
@@ -308,32 +425,15 @@ class SmallTreeRender:
         color = _COLORS[person.gender]
 
         draw_objects = []
-        draw_objects.append(
-            drawsvg.Rectangle(
-                x=x,
-                y=y,
-                width=self._PERSON_WIDTH,
-                height=self._PERSON_HEIGHT,
-                fill=color,
-            ),
-        )
+        draw_objects.append(_Rect(x=x, y=y, fill=color))
         person_label = person.full_name
         label_weight = self._FONT_SIZE * 0.55 * len(person_label)
         draw_objects.append(
-            drawsvg.Text(
-                text=person_label,
-                font_size=self._FONT_SIZE,
-                x=x + self._PERSON_WIDTH / 2 - label_weight / 2,
-                y=y + self._PERSON_HEIGHT / 2,
-            ),
-        )
-        draw_objects.append(
-            drawsvg.Text(
-                text=person.gramps_id,
-                font_size=self._FONT_SIZE,
+            _Label(
                 x=x + self._PERSON_WIDTH / 2 - label_weight / 2,
                 y=y + self._PERSON_HEIGHT / 2,
-                style="fill-opacity:0",
+                text=person_label,
+                gramps_id=person.gramps_id,
             ),
         )
         logger.info(f"Added {person}")
@@ -0,0 +1,96 @@
+import io
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+class SvgWriter:
+    """Легковесная запись svg без построения объектов drawsvg.
+
+    Элементы форматируются сразу в строковый буфер в том же виде,
+    в каком их выводит drawsvg. Гиперссылки на страницы персон пишутся
+    сразу, без последующего переписывания файла.
+
+    >>> svg = SvgWriter(10, 20)
+    >>> svg.rect(x=0, y=0, width=10, height=5, fill="pink")
+    >>> svg.line(0, 2.5, 10, 2.5, stroke="gray", stroke_width=0.8)
+    >>> print(svg.getvalue())
+    <?xml version="1.0" encoding="UTF-8"?>
+    <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+         width="10" height="20" viewBox="0 0 10 20">
+    <defs>
+    </defs>
+    <rect x="0" y="0" width="10" height="5" fill="pink" />
+    <path d="M0,2.5 L10,2.5" stroke="gray" stroke-width="0.8" fill="none" />
+    </svg>
+
+    При inline=True пишется минифицированная разметка для вставки прямо в
+    html страницы: без xml заголовка, defs и переводов строк.
+
+    >>> svg = SvgWriter(10, 20, inline=True)
+    >>> svg.text(x=1, y=2, text="Иван & Мария", font_size=14)
+    >>> value = svg.getvalue()
+    >>> value.startswith("<svg "), len(value.splitlines())
+    (True, 1)
+    >>> print(value[value.index("<text") :])
+    <text x="1" y="2" font-size="14">Иван &amp; Мария</text></svg>
+    """
+
+    def __init__(self, width: float, height: float, *, inline: bool = False):
+        self.__buffer = io.StringIO()
+        self.__end = "" if inline else "\n"
+        if inline:
+            self.__buffer.write(
+                '<svg xmlns="http://www.w3.org/2000/svg" '
+                'xmlns:xlink="http://www.w3.org/1999/xlink" '
+                f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            )
+            return
+        self.__buffer.write(_XML_HEADER)
+        self.__buffer.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:xlink="http://www.w3.org/1999/xlink"\n'
+            f'     width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">\n'
+            "<defs>\n</defs>\n"
+        )
+
+    def rect(self, x: float, y: float, width: float, height: float, fill: str):  # noqa: PLR0913
+        self.__buffer.write(
+            f'<rect x="{x}" y="{y}" width="{width}" height="{height}" '
+            f'fill="{fill}" />{self.__end}'
+        )
+
+    def line(self, *points: float, stroke: str, stroke_width: float):
+        path = " L".join(
+            f"{points[i]},{points[i + 1]}" for i in range(0, len(points), 2)
+        )
+        self.__buffer.write(
+            f'<path d="M{path}" stroke="{stroke}" stroke-width="{stroke_width}" '
+            f'fill="none" />{self.__end}'
+        )
+
+    def text(self, x: float, y: float, text: str, font_size: float):
+        self.__buffer.write(self.__text(x, y, text, font_size))
+
+    def linked_text(  # noqa: PLR0913
+        self, x: float, y: float, text: str, font_size: float, href: str
+    ):
+        self.__buffer.write(
+            f'<a xlink:href="{href}" target="_parent">[...]>'
+            f"{self.__text(x, y, text, font_size)}</a>"
+        )
+
+    def getvalue(self) -> str:
+        return self.__buffer.getvalue() + "</svg>"
+
+    def save(self, path: Path):
+        with path.open("w", encoding="utf-8") as file:
+            file.write(self.getvalue())
+
+    def __text(self, x: float, y: float, text: str, font_size: float) -> str:
+        return (
+            f'<text x="{x}" y="{y}" font-size="{font_size}">{escape(text)}</text>'
+            f"{self.__end}"
+        )
@@ -0,0 +1,74 @@
+"""Уменьшенные копии изображений галереи нескольких ширин."""
+
+from pathlib import Path
+
+from PIL import Image
+from src.app.entities import Thumbnail
+
+# 400 - ширина изображений на страницах (image_markup), 800 и 1600 - для
+# экранов с высокой плотностью пикселей и для просмотра изображения по ссылке.
+THUMBNAIL_WIDTHS = (200, 400, 800, 1600)
+_WEBP_QUALITY = 80
+# Сжатие webp методом 2 втрое быстрее метода 4 по умолчанию, а файл больше
+# примерно на 3%.
+_WEBP_METHOD = 2
+
+
+def write_thumbnails(
+    source: Path, output_dir: Path, widths: tuple[int, ...] = THUMBNAIL_WIDTHS
+) -> list[Thumbnail]:
+    """Копии source ширинами widths в webp и в формате исходника.
+
+    Копии шире исходника не пишутся, вместо них пишется копия в его ширину.
+    В имя копии входит расширение исходника, чтобы копии photo.jpg и
+    photo.png не перезаписывали друг друга.
+    JPEG сразу декодируется в уменьшенном в 2, 4 или 8 раз масштабе, если его
+    хватает для самой широкой копии: большой скан не распаковывается целиком.
+    Копии возвращаются по возрастанию ширины.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     Image.new("RGB", (1000, 500)).save(f"{tmp}/photo.jpg")
+    ...     thumbnails = write_thumbnails(Path(f"{tmp}/photo.jpg"), Path(tmp))
+    ...     [(t.path.name, t.width, t.height) for t in thumbnails][-2:]
+    [('photo-jpg-1000.webp', 1000, 500), ('photo-jpg-1000.jpg', 1000, 500)]
+    """
+    with Image.open(source) as image:
+        original_width, original_height = image.size
+        largest = min(original_width, max(widths))
+        widths = [width for width in widths if width < largest] + [largest]
+        sizes = [
+            (width, max(1, round(original_height * width / original_width)))
+            for width in widths
+        ]
+        image.draft(None, sizes[-1])
+        image_format = image.format
+        resized = image.convert(_resizable_mode(image))
+
+    name = f"{source.stem}-{source.suffix.lstrip('.')}"
+    thumbnails = []
+    # Каждая копия уменьшается из предыдущей, более широкой: так быстрее, чем
+    # каждый раз из исходника.
+    for width, height in reversed(sizes):
+        if resized.size != (width, height):
+            resized = resized.resize((width, height), Image.Resampling.LANCZOS)
+        webp_path = output_dir / f"{name}-{width}.webp"
+        resized.save(webp_path, "WEBP", quality=_WEBP_QUALITY, method=_WEBP_METHOD)
+        original_path = output_dir / f"{name}-{width}{source.suffix}"
+        resized.save(original_path, image_format, optimize=True)
+        thumbnails += [
+            Thumbnail(original_path, width, height),
+            Thumbnail(webp_path, width, height),
+        ]
+    thumbnails.reverse()
+    return thumbnails
+
+
+def _resizable_mode(image: Image.Image) -> str:
+    """Режим, в котором изображение уменьшается сглаживанием и пишется в webp.
+
+    Палитру и CMYK Pillow уменьшает без сглаживания, а webp их не пишет.
+    """
+    if image.mode in ("RGB", "RGBA", "L"):
+        return image.mode
+    return "RGBA" if image.has_transparency_data else "RGB"
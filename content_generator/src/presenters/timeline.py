@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from src.app.entities import GrampsTree, Person
+from src.app.time_slices import TIME_SLICES, TimeSlice
+
+
+class Timeline:
+    """Страница со списками современников событий, отмеченных на большом дереве."""
+
+    _TIMELINE_PAGE_PATH = Path("content/timeline/timeline.md")
+
+    def __init__(self, gramps_tree: GrampsTree):
+        self.__gramps_tree = gramps_tree
+        self.__content = _TimelinePage(self._TIMELINE_PAGE_PATH)
+
+    def generate_timeline(self):
+        for time_slice in TIME_SLICES:
+            alive = self.__gramps_tree.alive_at(time_slice.date)
+            alive_ids = {person.gramps_id for person in alive}
+            maybe_alive = [
+                person
+                for person in self.__gramps_tree.alive_at(
+                    time_slice.date, with_estimated=True
+                )
+                if person.gramps_id not in alive_ids
+            ]
+            self.__content.add_time_slice(time_slice, alive, maybe_alive)
+        self.__content.save()
+
+
+class _TimelinePage:
+    def __init__(self, path: Path):
+        self.__content = (
+            "Title: Современники событий\n"
+            "Date: 2023-01-4 21:00\n"
+            "Category: Статьи\n"
+            "Tags: Подборки\n"
+            "Slug: timeline\n\n"
+            "Кто из жителей деревни застал события, отмеченные на "
+            "[дереве деревни]({filename}../pages/tree_of_the_village.rst).\n\n"
+        )
+        self.__path = path
+
+    def add_time_slice(
+        self, time_slice: TimeSlice, alive: list[Person], maybe_alive: list[Person]
+    ):
+        self.__content += f"## {time_slice.title}\n\n"
+        if not alive and not maybe_alive:
+            self.__content += "Никого из известных жителей.\n\n"
+        self.__content += self.__repr_persons(alive)
+        if maybe_alive:
+            self.__content += "С учетом неточных дат могли застать также:\n\n"
+            self.__content += self.__repr_persons(maybe_alive)
+
+    @staticmethod
+    def __repr_persons(persons: list[Person]) -> str:
+        if not persons:
+            return ""
+        return (
+            "".join(
+                f"- [{person}]({{filename}}../persons/{person.gramps_id}.md)\n"
+                for person in persons
+            )
+            + "\n"
+        )
+
+    def save(self):
+        self.__path.parent.mkdir(exist_ok=True, parents=True)
+        with self.__path.open("w", encoding="utf-8") as f:
+            f.write(self.__content)
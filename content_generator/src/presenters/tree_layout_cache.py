@@ -0,0 +1,144 @@
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+from loguru import logger
+from src.app.entities import GrampsId, GrampsTree, RelationType
+
+
+class CachedNode(NamedTuple):
+    """Размещение персоны: строка внутри рода и горизонтальные границы."""
+
+    gramps_id: GrampsId
+    row: int
+    x: float
+    width: float
+
+
+class CachedClan(NamedTuple):
+    signature: str
+    nodes: list[CachedNode]
+
+
+class TreeLayoutCache:
+    """Сохраняемое между сборками размещение родов большого дерева.
+
+    Род - это патриарх и все, кого TreeRender разместил справа от него.
+    Каждый род хранится под хешем своего подграфа: дат и пола членов рода,
+    а также всех связей и семей, которых они касаются. Если подграф не
+    изменился, размещение рода можно взять из кеша без повторного обхода.
+    """
+
+    _VERSION = 1
+
+    def __init__(self, path: Path | None, gramps_tree: GrampsTree, origin: date):
+        self.__path = path
+        self.__gramps_tree = gramps_tree
+        self.__origin = origin.isoformat()
+        self.__cached: dict[GrampsId, CachedClan] = self.__load()
+        self.__placed: dict[GrampsId, CachedClan] = {}
+
+        self.__families_by_person = defaultdict(list)
+        if self.__path is not None:
+            for family in gramps_tree.families.values():
+                for person in family.parents | family.children:
+                    self.__families_by_person[person.gramps_id].append(family)
+
+    @property
+    def enabled(self) -> bool:
+        return self.__path is not None
+
+    def get(self, patriarch_id: GrampsId) -> CachedClan | None:
+        return self.__cached.get(patriarch_id)
+
+    def put(self, patriarch_id: GrampsId, nodes: list[CachedNode]):
+        members = [node.gramps_id for node in nodes]
+        self.__placed[patriarch_id] = CachedClan(self.signature(members), nodes)
+
+    def signature(self, members: list[GrampsId]) -> str:
+        persons = self.__gramps_tree.persons
+        subgraph = []
+        for gramps_id in sorted(members):
+            person = persons[gramps_id]
+            relations = sorted(
+                (r.first_person_id, r.type_of_relation.value, r.other_person_id)
+                for r in self.__gramps_tree.relations.of_person(gramps_id)
+            )
+            families = sorted(
+                (
+                    f.gramps_id,
+                    f.father.gramps_id if f.father is not None else "",
+                    f.mother.gramps_id if f.mother is not None else "",
+                    sorted(child.gramps_id for child in f.children),
+                )
+                for f in self.__families_by_person[gramps_id]
+            )
+            subgraph.append(
+                (
+                    gramps_id,
+                    person.birth_day.date.isoformat(),
+                    person.death_day.date.isoformat(),
+                    person.gender.value,
+                    relations,
+                    families,
+                )
+            )
+        return hashlib.sha1(  # noqa: S324
+            json.dumps(subgraph, ensure_ascii=False).encode()
+        ).hexdigest()
+
+    def neighbours(self, members: list[GrampsId]) -> set[GrampsId]:
+        """Дети и партнеры членов рода, до которых может дойти обход."""
+        neighbours = set()
+        for gramps_id in members:
+            for relation in self.__gramps_tree.relations.of_person(gramps_id):
+                if relation.type_of_relation == RelationType.MARRIAGE:
+                    neighbours.add(relation.first_person_id)
+                    neighbours.add(relation.other_person_id)
+                elif relation.other_person_id == gramps_id:
+                    neighbours.add(relation.first_person_id)
+            for family in self.__families_by_person[gramps_id]:
+                if any(parent.gramps_id == gramps_id for parent in family.parents):
+                    neighbours.update(child.gramps_id for child in family.children)
+        return neighbours - set(members)
+
+    def save(self):
+        if self.__path is None:
+            return
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        raw = {
+            "version": self._VERSION,
+            "origin": self.__origin,
+            "clans": {
+                patriarch_id: {
+                    "signature": clan.signature,
+                    "nodes": [list(node) for node in clan.nodes],
+                }
+                for patriarch_id, clan in self.__placed.items()
+            },
+        }
+        with self.__path.open("w", encoding="utf-8") as file:
+            json.dump(raw, file, ensure_ascii=False)
+        logger.info(f"Layout of {len(self.__placed)} clans saved to {self.__path}")
+
+    def __load(self) -> dict[GrampsId, CachedClan]:
+        if self.__path is None or not self.__path.exists():
+            return {}
+        with self.__path.open(encoding="utf-8") as file:
+            raw = json.load(file)
+        if raw.get("version") != self._VERSION or raw.get("origin") != self.__origin:
+            logger.info("Layout cache is outdated and will be rebuilt")
+            return {}
+        return {
+            GrampsId(patriarch_id): CachedClan(
+                signature=clan["signature"],
+                nodes=[
+                    CachedNode(GrampsId(gramps_id), row, x, width)
+                    for gramps_id, row, x, width in clan["nodes"]
+                ],
+            )
+            for patriarch_id, clan in raw["clans"].items()
+        }
@@ -1,12 +1,13 @@
 import copy
 import os
-from datetime import UTC, date, datetime
+from datetime import date
 from operator import attrgetter
 from pathlib import Path
 from typing import NamedTuple
 from xml.etree import ElementTree
 
 import drawsvg
+import numpy as np
 from loguru import logger
 
 from src.app.entities import (
@@ -15,9 +16,13 @@ from src.app.entities import (
     Gender,
     GrampsId,
     Person,
-    RelationType,
     GrampsTree,
+    build_today,
 )
+from src.app.family_graph import FamilyGraph
+from src.app.lifespan_index import BIRTHDAY_ERROR_DAYS, DEATHDAY_ERROR_DAYS
+from src.app.time_slices import TIME_SLICES
+from src.presenters.tree_layout_cache import CachedNode, TreeLayoutCache
 
 
 class UnknownDirectionError(Exception):
@@ -34,9 +39,8 @@ _TRIANGLE_HEIGHT = 4
 _TRIANGLE_WEIGHT = 4
 _DASH_WEIGHT = 20
 _X_OFFSET = _HEIGHT
-_DAY_IN_YEAR = 365
-_BIRTHDAY_ERROR_DAYS = 5 * _DAY_IN_YEAR
-_DEATHDAY_ERROR_DAYS = 10 * _DAY_IN_YEAR
+_BIRTHDAY_ERROR_DAYS = BIRTHDAY_ERROR_DAYS
+_DEATHDAY_ERROR_DAYS = DEATHDAY_ERROR_DAYS
 
 _COLORS = {
     Gender.MALE: "lightblue",
@@ -46,9 +50,11 @@ _COLORS = {
 
 
 class Node:
-    def __init__(self, person: Person, y_pos: float):
+    def __init__(self, person: Person, y_pos: float, x_pos: float, width: float):
         self.__person = person
         self.__y_pos = y_pos
+        self.__x_pos = x_pos
+        self.__width = width
 
     @property
     def person(self):
@@ -58,18 +64,133 @@ class Node:
     def y_pos(self):
         return self.__y_pos
 
+    @property
+    def x_pos(self):
+        return self.__x_pos
+
+    @property
+    def width(self):
+        return self.__width
+
+
+class _PersonColumns(NamedTuple):
+    x: float
+    width: float
+    birthday_gradient_x: float | None
+    deathday_gradient_x: float | None
+
+
+class _TimeColumns:
+    """Колоночный расчет горизонтальных координат дерева.
+
+    Даты рождения, смерти и свадеб один раз загружаются в массивы datetime64,
+    после чего координаты, ширины и границы градиентов неточных дат всех персон
+    и семей считаются пакетными операциями numpy, а не по одной персоне.
+    """
+
+    def __init__(self, gramps_tree: GrampsTree):
+        persons = list(gramps_tree.persons.values())
+        families = list(gramps_tree.families.values())
+        self.__person_index = {p.gramps_id: i for i, p in enumerate(persons)}
+        self.__family_index = {f.gramps_id: i for i, f in enumerate(families)}
+
+        birth = np.array([p.birth_day.date for p in persons], dtype="datetime64[D]")
+        death = np.array([p.death_day.date for p in persons], dtype="datetime64[D]")
+        self.__origin = birth.min()
+        birth_days = (birth - self.__origin).astype(np.int64)
+
+        x = birth_days * _X_SCALE + _X_OFFSET
+        width = (death - birth).astype(np.int64) * _X_SCALE
+        birth_estimated = np.array(
+            [p.birth_day.quality is DateQuality.ESTIMATED for p in persons]
+        )
+        death_estimated = np.array(
+            [p.death_day.quality is DateQuality.ESTIMATED for p in persons]
+        )
+        self.__x = x.tolist()
+        self.__width = width.tolist()
+        self.__birthday_gradient_x = np.where(
+            birth_estimated, x - _BIRTHDAY_ERROR_DAYS * _X_SCALE, np.nan
+        ).tolist()
+        self.__deathday_gradient_x = np.where(
+            death_estimated, x + width + _DEATHDAY_ERROR_DAYS * _X_SCALE, np.nan
+        ).tolist()
+
+        # Дата свадьбы со случайным сдвигом берется у Family.wedding_day, чтобы у
+        # одной свадьбы не было двух разных случайных дат.
+        wedding = np.array(
+            [family.wedding_day for family in families], dtype="datetime64[D]"
+        )
+        wedding_days = (wedding - self.__origin).astype(np.int64)
+        self.__wedding_x = (wedding_days * _X_SCALE + _X_OFFSET).tolist()
+        self.__parental_family = self.__compute_parental_families(families).tolist()
+
+    def __compute_parental_families(self, families: list[Family]) -> np.ndarray:
+        """Родительская семья каждой персоны или -1."""
+        child_families, children = [], []
+        for family_row, family in enumerate(families):
+            for child in family.children:
+                child_families.append(family_row)
+                children.append(self.__person_index[child.gramps_id])
+        child_families = np.array(child_families, dtype=np.int64)
+        children = np.array(children, dtype=np.int64)
+
+        # Как и прежде, родительской считается первая семья, где персона ребенок.
+        parental_family = np.full(len(self.__person_index), -1, dtype=np.int64)
+        parental_family[children[::-1]] = child_families[::-1]
+        return parental_family
+
+    @property
+    def origin(self) -> date:
+        return self.__origin.item()
+
+    def person(self, gramps_id: GrampsId) -> _PersonColumns:
+        i = self.__person_index[gramps_id]
+        birthday_gradient_x = self.__birthday_gradient_x[i]
+        deathday_gradient_x = self.__deathday_gradient_x[i]
+        return _PersonColumns(
+            x=self.__x[i],
+            width=self.__width[i],
+            birthday_gradient_x=(
+                None if np.isnan(birthday_gradient_x) else birthday_gradient_x
+            ),
+            deathday_gradient_x=(
+                None if np.isnan(deathday_gradient_x) else deathday_gradient_x
+            ),
+        )
+
+    def wedding_x(self, family_id: GrampsId) -> float:
+        return self.__wedding_x[self.__family_index[family_id]]
+
+    def parental_wedding_x(self, gramps_id: GrampsId) -> float | None:
+        family_row = self.__parental_family[self.__person_index[gramps_id]]
+        if family_row == -1:
+            return None
+        return self.__wedding_x[family_row]
+
 
 class TreeRender:
-    def __init__(self, gramps_tree: GrampsTree, output_path: Path):
+    def __init__(
+        self,
+        gramps_tree: GrampsTree,
+        output_path: Path,
+        layout_cache_path: Path | None = None,
+    ):
         self.__gramps_tree = gramps_tree
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.__unpined_person = copy.deepcopy(self.__gramps_tree.persons)  # type: dict[GrampsId, Person]
-        self.__older_date = self.__get_older_person(
-            self.__unpined_person,
-        ).birth_day.date
+        # Свой граф, а не gramps_tree.graph: дерево рисуется за один проход,
+        # а граф всегда соответствует текущему состоянию дерева.
+        self.__graph = FamilyGraph(self.__gramps_tree)
+        self.__columns = _TimeColumns(self.__gramps_tree)
+        self.__older_date = self.__columns.origin
+        self.__layout_cache = TreeLayoutCache(
+            layout_cache_path, self.__gramps_tree, self.__older_date
+        )
 
         self.__nodes = {}  # type: dict[GrampsId, Node]
+        self.__placement_order = []  # type: list[Node]
         self.__draw_objects = []  # type: list[drawsvg.DrawingElement]
         self.__person_id_by_label: dict[str, GrampsId] = {}
         self.__vertical_index = -1
@@ -78,9 +199,11 @@ class TreeRender:
             patriarch = self.__get_patriarch(self.__unpined_person)
             if patriarch is None:
                 break
-            self.__add_person(patriarch)
+            self.__place_clan(patriarch)
+        self.__layout_cache.save()
 
-            self.__recursively_adding_person_to_the_right(patriarch)
+        for node in self.__nodes.values():
+            self.__draw_person(node)
 
         family_lines = self.__create_family_lines()
 
@@ -180,18 +303,12 @@ class TreeRender:
 
     def __create_background(self) -> list[drawsvg.DrawingElement]:
         background = []
-        background += self.__create_time_slice("", date(1700, 1, 1), date_view=True)
-        background += self.__create_time_slice("", date(1800, 1, 1), date_view=True)
-        background += self.__create_time_slice("", date(1900, 1, 1), date_view=True)
-
-        background += self.__create_time_slice(
-            "ВОВ",
-            date(1941, 6, 22),
-            date_view=False,
-        )
-        background += self.__create_time_slice("", date(1945, 5, 9), date_view=False)
-
-        background += self.__create_time_slice("", date(2000, 1, 1), date_view=True)
+        for time_slice in TIME_SLICES:
+            background += self.__create_time_slice(
+                time_slice.label,
+                time_slice.date,
+                date_view=time_slice.date_view,
+            )
         return background
 
     def __create_family_lines(self):
@@ -205,7 +322,7 @@ class TreeRender:
                 lower_node = min(nodes, key=attrgetter("y_pos"))
                 top_y = None
                 lower_y = None
-                x_pos = self._compute_x_pos(family.wedding_day)
+                x_pos = self.__columns.wedding_x(family.gramps_id)
                 for node in nodes:
                     if node.person in family.parents:
                         if node.person == top_node.person:
@@ -250,11 +367,52 @@ class TreeRender:
 
     def __get_size(self) -> tuple[float, float]:
         return (
-            (datetime.now(tz=UTC).date() - self.__older_date).days * _X_SCALE
-            + _X_OFFSET * 10,
+            (build_today() - self.__older_date).days * _X_SCALE + _X_OFFSET * 10,
             (_HEIGHT + _Y_SPACING) * (self.__vertical_index + 2),
         )
 
+    def __place_clan(self, patriarch: Person):
+        """Размещает род патриарха, по возможности беря размещение из кеша."""
+        clan_start = len(self.__placement_order)
+        cached_clan = self.__layout_cache.get(patriarch.gramps_id)
+        if cached_clan is not None and self.__is_clan_untouched(cached_clan):
+            for node in cached_clan.nodes:
+                self.__add_person(
+                    self.__unpined_person[node.gramps_id],
+                    x_pos=node.x,
+                    width=node.width,
+                )
+            logger.info(f"Clan of {patriarch} is restored from the layout cache")
+        else:
+            self.__add_person(patriarch)
+            self.__recursively_adding_person_to_the_right(patriarch)
+
+        if self.__layout_cache.enabled:
+            clan_nodes = self.__placement_order[clan_start:]
+            self.__layout_cache.put(
+                patriarch.gramps_id,
+                [
+                    CachedNode(
+                        node.person.gramps_id,
+                        row,
+                        node.x_pos,
+                        node.width,
+                    )
+                    for row, node in enumerate(clan_nodes)
+                ],
+            )
+
+    def __is_clan_untouched(self, cached_clan) -> bool:
+        members = [node.gramps_id for node in cached_clan.nodes]
+        if any(gramps_id not in self.__unpined_person for gramps_id in members):
+            return False
+        if any(
+            gramps_id in self.__unpined_person
+            for gramps_id in self.__layout_cache.neighbours(members)
+        ):
+            return False
+        return self.__layout_cache.signature(members) == cached_clan.signature
+
     def __get_patriarch(self, where: dict[GrampsId, Person]):
         patriarch = self.__older_grandpa(where)
         if patriarch is None:
@@ -297,14 +455,11 @@ class TreeRender:
             if un_children:
                 return max(un_children, key=attrgetter("birth_day.date"))
 
+        graph = self.__graph
         children = []
-        for relation in self.__gramps_tree.relations:
-            if relation.type_of_relation != RelationType.BIRTH_FROM:
-                continue
-            if person.gramps_id == relation.other_person_id:
-                child = self.__unpined_person.get(relation.first_person_id)
-                if child is None:
-                    continue
+        for child_i in graph.born_children(graph.index(person.gramps_id)):
+            child = self.__unpined_person.get(graph.person(child_i).gramps_id)
+            if child is not None:
                 children.append(child)
         if children:
             return max(children, key=attrgetter("birth_day.date"))
@@ -324,26 +479,17 @@ class TreeRender:
         if partner is None:
             return None
 
-        for family in self.__gramps_tree.families.values():
-            if (
-                person.is_male()
-                and family.father == person
-                and family.mother == partner
-            ):
-                return family
-            if (
-                person.is_female()
-                and family.father == partner
-                and family.mother == person
-            ):
-                return family
+        graph = self.__graph
+        person_i = graph.index(person.gramps_id)
+        partner_i = graph.index(partner.gramps_id)
+        for family_i in graph.families_as_parent(person_i):
+            father, mother = graph.father(family_i), graph.mother(family_i)
+            if person.is_male() and (father, mother) == (person_i, partner_i):
+                return graph.family(family_i)
+            if person.is_female() and (father, mother) == (partner_i, person_i):
+                return graph.family(family_i)
         return None
 
-    @staticmethod
-    def __get_older_person(where: dict[GrampsId, Person]) -> Person:
-        persons = list(where.values())
-        return min(persons, key=attrgetter("birth_day.date"))
-
     @staticmethod
     def __older_grandpa(where: dict[GrampsId, Person]) -> Person | None:
         mens = [p for p in where.values() if p.gender == Gender.MALE]
@@ -363,27 +509,38 @@ class TreeRender:
         person: Person,
         where: dict[GrampsId, Person],
     ) -> list[Person]:
+        graph = self.__graph
         partners = []
-        for relation in self.__gramps_tree.relations:
-            if relation.type_of_relation != RelationType.MARRIAGE:
-                continue
-
-            partner = None
-            if person.gramps_id == relation.first_person_id:
-                partner = where.get(relation.other_person_id)
-            elif person.gramps_id == relation.other_person_id:
-                partner = where.get(relation.first_person_id)
-
+        for partner_i in graph.partners(graph.index(person.gramps_id)):
+            partner = where.get(graph.person(partner_i).gramps_id)
             if partner is not None:
                 partners.append(partner)
-
         return partners
 
-    def __add_person(self, person: Person):
+    def __add_person(
+        self,
+        person: Person,
+        x_pos: float | None = None,
+        width: float | None = None,
+    ):
         self.__vertical_index += 1
         y = (_HEIGHT + _Y_SPACING) * self.__vertical_index
-        x = self._compute_x_pos(person.birth_day.date)
-        width = person.days_of_life * _X_SCALE
+        if x_pos is None or width is None:
+            columns = self.__columns.person(person.gramps_id)
+            x_pos, width = columns.x, columns.width
+        self.__person_id_by_label[str(person)] = person.gramps_id
+        del self.__unpined_person[person.gramps_id]
+        logger.info(f"Added {person}")
+        node = Node(person, y, x_pos, width)
+        self.__nodes[person.gramps_id] = node
+        self.__placement_order.append(node)
+
+    def __draw_person(self, node: Node):
+        person = node.person
+        y = node.y_pos
+        x = node.x_pos
+        width = node.width
+        columns = self.__columns.person(person.gramps_id)
         color = _COLORS[person.gender]
         self.__draw_objects.append(
             drawsvg.Rectangle(
@@ -395,26 +552,27 @@ class TreeRender:
             ),
         )
 
-        if person.birth_day.quality is DateQuality.ESTIMATED:
-            birthday_offset = _BIRTHDAY_ERROR_DAYS * _X_SCALE
-            gradient = drawsvg.LinearGradient(x - birthday_offset, y, x, y + _HEIGHT)
+        if columns.birthday_gradient_x is not None:
+            gradient = drawsvg.LinearGradient(
+                columns.birthday_gradient_x, y, x, y + _HEIGHT
+            )
             gradient.add_stop(0, "white", 0)
             gradient.add_stop(1, color, 1)
             self.__draw_objects.append(
                 drawsvg.Rectangle(
-                    x=x - birthday_offset,
+                    x=columns.birthday_gradient_x,
                     y=y,
-                    width=birthday_offset,
+                    width=_BIRTHDAY_ERROR_DAYS * _X_SCALE,
                     height=_HEIGHT,
                     fill=gradient,
                 ),
             )
 
-        if person.death_day.quality is DateQuality.ESTIMATED:
+        if columns.deathday_gradient_x is not None:
             gradient = drawsvg.LinearGradient(
                 x + width,
                 y,
-                x + width + _DEATHDAY_ERROR_DAYS * _X_SCALE,
+                columns.deathday_gradient_x,
                 y + _HEIGHT,
             )
             gradient.add_stop(0, color, 1)
@@ -446,17 +604,14 @@ class TreeRender:
                 style="fill-opacity:0",
             ),
         )
-        self.__person_id_by_label[str(person)] = person.gramps_id
-        del self.__unpined_person[person.gramps_id]
-        logger.info(f"Added {person}")
 
-        parental_family = self.__get_parental_family(person)
-        if parental_family is not None:
+        parental_wedding_x = self.__columns.parental_wedding_x(person.gramps_id)
+        if parental_wedding_x is not None:
             self.__draw_objects.append(
                 drawsvg.Lines(
                     x,
                     y + _HEIGHT / 2,
-                    self._compute_x_pos(parental_family.wedding_day),
+                    parental_wedding_x,
                     y + _HEIGHT / 2,
                     close=False,
                     stroke="black",
@@ -464,17 +619,10 @@ class TreeRender:
                     fill="none",
                 ),
             )
-        self.__nodes[person.gramps_id] = Node(person, y)
 
     def _compute_x_pos(self, date_: date) -> float:
         return (date_ - self.__older_date).days * _X_SCALE + _X_OFFSET
 
-    def __get_parental_family(self, person: Person) -> Family | None:
-        for family in self.__gramps_tree.families.values():
-            if person in family.children:
-                return family
-        return None
-
     def __rewrite_svg_with_hyperlink(self, path: Path):
         """DrawSvg не умеет в гиперссылки, поэтому уже готовый файл изменяется.
 
@@ -0,0 +1,105 @@
+import sys
+
+sys.path.append(".")
+
+from datetime import date
+
+import pytest
+from src.app.entities import (
+    Date,
+    DateQuality,
+    Family,
+    Gender,
+    GrampsId,
+    GrampsTree,
+    Person,
+    Relation,
+    RelationType,
+)
+
+# Содержимое тестового gramps проекта tests/test_tree.
+_PERSONS = [
+    ("I0000", "Алексей Навальный", date(1976, 6, 4), Gender.MALE),
+    ("I0001", "Людмила Иванова", date(1954, 4, 4), Gender.FEMALE),
+    ("I0002", "Олег Навальный", date(1983, 4, 9), Gender.MALE),
+    ("I0003", "Юлия Абросимова", date(1976, 7, 24), Gender.FEMALE),
+    ("I0004", "Анатолий Навальный", date(1947, 1, 28), Gender.MALE),
+    ("I0005", "Дарья Навальная", date(2001, 1, 1), Gender.FEMALE),
+    ("I0006", "Захар Навальный", date(2008, 1, 1), Gender.MALE),
+    ("I0007", "Владимир Путин", date(1952, 10, 7), Gender.MALE),
+    ("I0008", "Людмила Шкребнева", date(1958, 1, 6), Gender.FEMALE),
+    ("I0009", "Мария Путина", date(1985, 4, 28), Gender.FEMALE),
+    ("I0010", "Катерина Путина", date(1986, 8, 31), Gender.FEMALE),
+    ("I0011", "Светлана Кривоногих", date(1975, 1, 1), Gender.FEMALE),
+    ("I0012", "Елизавета ", date(2003, 1, 1), Gender.FEMALE),
+    ("I0013", "Подкидыш ", date(2001, 1, 1), Gender.MALE),
+    ("I0014", "Иван Навальный", date(1917, 1, 1), Gender.MALE),
+    ("I0015", "Алина Кабаева", date(1983, 5, 12), Gender.FEMALE),
+    ("I0016", "Иван Путин", date(2015, 1, 1), Gender.MALE),
+    ("I0017", "Владимир Путин", date(2019, 1, 1), Gender.MALE),
+    ("I0018", "Степан Навальный", date(2012, 1, 1), Gender.MALE),
+    ("I0019", "Остап Навальный", date(2014, 1, 1), Gender.MALE),
+]
+_ESTIMATED_BIRTHDAYS = {"I0014"}
+_FAMILIES = [
+    ("F0000", "I0004", "I0001", ["I0000", "I0002"]),
+    ("F0001", "I0000", "I0003", ["I0006", "I0005"]),
+    ("F0002", "I0007", "I0008", ["I0009", "I0010"]),
+    ("F0003", "I0007", "I0011", ["I0012"]),
+    ("F0004", "I0014", None, ["I0004"]),
+    ("F0005", "I0007", "I0015", ["I0016", "I0017"]),
+    ("F0006", "I0002", None, ["I0018", "I0019"]),
+]
+
+
+def build_test_tree() -> GrampsTree:
+    persons = {}
+    for _id, full_name, birth_day, gender in _PERSONS:
+        quality = (
+            DateQuality.ESTIMATED
+            if _id in _ESTIMATED_BIRTHDAYS
+            else DateQuality.EXACTLY
+        )
+        persons[GrampsId(_id)] = Person(
+            _id=_id,
+            full_name=full_name,
+            birth_day=Date(birth_day, quality),
+            death_day=None,
+            gender=gender,
+        )
+
+    relations = set()
+    families = {}
+    for family_id, father_id, mother_id, children in _FAMILIES:
+        family = Family(GrampsId(family_id))
+        if father_id is not None:
+            family.father = persons[father_id]
+        if mother_id is not None:
+            family.mother = persons[mother_id]
+        if family.is_full():
+            relations.add(
+                Relation(father_id, RelationType.MARRIAGE, mother_id, family_id)
+            )
+        for child_id in children:
+            family.add_child(persons[child_id])
+            relations.add(
+                Relation(
+                    child_id,
+                    RelationType.BIRTH_FROM,
+                    father_id if father_id is not None else mother_id,
+                    family_id,
+                )
+            )
+        families[family.gramps_id] = family
+
+    return GrampsTree(persons=persons, media={}, relations=relations, families=families)
+
+
+@pytest.fixture()
+def gramps_tree() -> GrampsTree:
+    return build_test_tree()
+
+
+@pytest.fixture(autouse=True)
+def _without_siteurl(monkeypatch):
+    monkeypatch.delenv("SITEURL", raising=False)
@@ -0,0 +1,154 @@
+import sys
+
+sys.path.append(".")
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from src.infra.deploy import (
+    Deployer,
+    DirectoryTarget,
+    GitTarget,
+    ManifestDiff,
+    RsyncTarget,
+)
+
+
+@pytest.fixture()
+def output_dir(tmp_path: Path) -> Path:
+    output_dir = tmp_path / "docs"
+    (output_dir / "images").mkdir(parents=True)
+    (output_dir / "index.html").write_text("<html>Янашбеляк</html>")
+    (output_dir / "I0000.html").write_text("<html>Алексей</html>")
+    (output_dir / "images" / "tree.svg").write_text("<svg></svg>")
+    return output_dir
+
+
+def _rebuild(output_dir: Path) -> None:
+    """Следующая сборка: одна страница изменилась, одна удалена, одна новая."""
+    (output_dir / "I0000.html").write_text("<html>Алексей Навальный</html>")
+    (output_dir / "images" / "tree.svg").unlink()
+    (output_dir / "I0001.html").write_text("<html>Людмила</html>")
+
+
+def _files(directory: Path) -> dict[str, str]:
+    return {
+        path.relative_to(directory).as_posix(): path.read_text()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_deploy_to_directory(output_dir: Path, tmp_path: Path) -> None:
+    target_dir = tmp_path / "server"
+    (target_dir / "old").mkdir(parents=True)
+    (target_dir / "old" / "page.html").write_text("")
+    deployer = Deployer(output_dir, tmp_path / "manifest.json")
+
+    deployer.deploy(DirectoryTarget(target_dir))
+    assert _files(target_dir) == _files(output_dir)
+
+    _rebuild(output_dir)
+    (target_dir / "index.html").write_text("не должен перезаписываться")
+    diff = deployer.deploy(DirectoryTarget(target_dir))
+
+    assert diff == ManifestDiff(["I0001.html"], ["I0000.html"], ["images/tree.svg"])
+    assert not (target_dir / "images").exists()
+    assert (target_dir / "I0000.html").read_text() == "<html>Алексей Навальный</html>"
+    assert (target_dir / "index.html").read_text() == "не должен перезаписываться"
+
+    assert deployer.deploy(DirectoryTarget(target_dir)) == ManifestDiff([], [], [])
+
+
+def _git(git_dir: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "--git-dir", str(git_dir), *args],  # noqa: S603, S607
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_deploy_to_bare_git_repo(output_dir: Path, tmp_path: Path, monkeypatch) -> None:
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "test")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "test@example.com")
+    git_dir = tmp_path / "site.git"
+    _git(git_dir, "init", "--bare", "-q")
+    deployer = Deployer(output_dir, tmp_path / "manifest.json")
+    target = GitTarget(git_dir, "gh-pages")
+
+    deployer.deploy(target)
+    first = target.revision()
+    assert _git(git_dir, "ls-tree", "-r", "--name-only", "gh-pages").split() == [
+        "I0000.html",
+        "images/tree.svg",
+        "index.html",
+    ]
+
+    _rebuild(output_dir)
+    diff = deployer.deploy(target)
+
+    assert diff == ManifestDiff(["I0001.html"], ["I0000.html"], ["images/tree.svg"])
+    assert _git(git_dir, "rev-parse", "gh-pages^") == f"{first}\n"
+    assert _git(git_dir, "show", "gh-pages:I0000.html") == (
+        "<html>Алексей Навальный</html>"
+    )
+    changed = _git(git_dir, "diff", "--name-status", first, "gh-pages").split()
+    assert changed == [
+        "M",
+        "I0000.html",
+        "A",
+        "I0001.html",
+        "D",
+        "images/tree.svg",
+    ]
+
+    deployer.deploy(target)
+    assert _git(git_dir, "rev-parse", "gh-pages^") == f"{first}\n"
+
+
+def test_deploy_with_rsync(
+    output_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda command, **kwargs: calls.append((command, kwargs.get("input"))),
+    )
+    deployer = Deployer(output_dir, tmp_path / "manifest.json")
+    target = RsyncTarget("user@example.com:/var/www", 2222)
+
+    deployer.deploy(target)
+    _rebuild(output_dir)
+    deployer.deploy(target)
+
+    (full_command, full_input), (command, files) = calls
+    assert full_command == [
+        "rsync",
+        "-pthvz",
+        "-e",
+        "ssh -p 2222",
+        "--delete",
+        "--exclude",
+        ".DS_Store",
+        "-r",
+        "-c",
+        f"{output_dir}/",
+        "user@example.com:/var/www",
+    ]
+    assert full_input is None
+    assert command == [
+        "rsync",
+        "-pthvz",
+        "-e",
+        "ssh -p 2222",
+        "--from0",
+        "--files-from=-",
+        "--delete-missing-args",
+        f"{output_dir}/",
+        "user@example.com:/var/www",
+    ]
+    assert files.split("\0") == ["I0001.html", "I0000.html", "images/tree.svg", ""]
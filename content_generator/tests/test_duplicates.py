@@ -0,0 +1,58 @@
+import sys
+
+sys.path.append(".")
+
+from datetime import date
+from pathlib import Path
+
+from src.app.duplicates import DuplicateFinder
+from src.app.entities import Date, DateQuality, Gender, GrampsTree, Person
+from src.presenters.duplicates_report import DuplicatesReport
+
+
+def _add_person(
+    gramps_tree: GrampsTree, _id: str, full_name: str, birth_day: date, gender: Gender
+) -> None:
+    gramps_tree.persons[_id] = Person(
+        _id=_id,
+        full_name=full_name,
+        birth_day=Date(birth_day, DateQuality.ESTIMATED),
+        death_day=None,
+        gender=gender,
+    )
+
+
+def test_duplicates_found_within_blocks(gramps_tree: GrampsTree) -> None:
+    _add_person(gramps_tree, "I0020", "Олег Новальный", date(1984, 1, 1), Gender.MALE)
+    _add_person(gramps_tree, "I0021", "Олег Навальный", date(1950, 1, 1), Gender.MALE)
+    _add_person(
+        gramps_tree, "I0022", "Олеся Навальная", date(1983, 1, 1), Gender.FEMALE
+    )
+
+    candidates = DuplicateFinder(gramps_tree).find()
+
+    pairs = {(c.first.gramps_id, c.second.gramps_id) for c in candidates}
+    assert pairs == {("I0002", "I0020")}
+    assert 0 < candidates[0].date_similarity <= 1
+
+
+def test_family_members_are_not_duplicates(gramps_tree: GrampsTree) -> None:
+    # Два сына с одним именем в одной семье - разные люди.
+    _add_person(
+        gramps_tree, "I0002", "Алексей Навальный", date(1977, 1, 1), Gender.MALE
+    )
+    assert DuplicateFinder(gramps_tree).find() == []
+
+
+def test_duplicates_report(gramps_tree: GrampsTree, tmp_path: Path) -> None:
+    _add_person(gramps_tree, "I0020", "Олег Навальный", date(1983, 4, 9), Gender.MALE)
+
+    DuplicatesReport(DuplicateFinder(gramps_tree).find()).save(tmp_path)
+
+    header, *rows = (tmp_path / "duplicates.csv").read_text().splitlines()
+    assert len(rows) == 1
+    assert rows[0].startswith("1.000,1.000,1.000,I0002,")
+    assert (
+        "| I0002 Олег Навальный (1983-н. в.) |"
+        in (tmp_path / "duplicates.md").read_text()
+    )
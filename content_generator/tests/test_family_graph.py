@@ -0,0 +1,40 @@
+import sys
+
+sys.path.append(".")
+
+from src.app.entities import GrampsId, GrampsTree
+from src.app.family_graph import NO_PERSON
+
+
+def _ids(graph, persons) -> set[str]:
+    return {graph.person(person).gramps_id for person in persons}
+
+
+def test_family_graph(gramps_tree: GrampsTree) -> None:
+    graph = gramps_tree.graph
+    putin = graph.index(GrampsId("I0007"))
+
+    assert [
+        graph.family(family).gramps_id for family in graph.families_as_parent(putin)
+    ] == ["F0002", "F0003", "F0005"]
+    assert _ids(graph, graph.partners(putin)) == {"I0008", "I0011", "I0015"}
+    assert _ids(graph, graph.born_children(putin)) == {
+        "I0009",
+        "I0010",
+        "I0012",
+        "I0016",
+        "I0017",
+    }
+
+    foundling_family = graph.families_as_child(graph.index(GrampsId("I0004")))
+    assert [graph.family(family).gramps_id for family in foundling_family] == ["F0004"]
+    assert graph.mother(foundling_family[0]) == NO_PERSON
+
+
+def test_graph_is_rebuilt_after_invalidate(gramps_tree: GrampsTree) -> None:
+    graph = gramps_tree.graph
+    assert gramps_tree.graph is graph
+
+    gramps_tree.invalidate_indexes()
+
+    assert gramps_tree.graph is not graph
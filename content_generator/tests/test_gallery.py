@@ -0,0 +1,72 @@
+import sys
+
+sys.path.append(".")
+
+from pathlib import Path
+
+import pytest
+from benchmarks.synthetic_gramps_db import write_synthetic_gramps_db
+from PIL import Image
+from src.app.entities import GrampsTree
+from src.infra.tree_loader import SQliteGrampsTreeLoader
+from src.presenters.gallery import Gallery
+from src.presenters.thumbnails import write_thumbnails
+
+
+@pytest.fixture()
+def gramps_tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> GrampsTree:
+    write_synthetic_gramps_db(tmp_path / "grampsdb", 60, photo_share=0.5)
+    monkeypatch.chdir(tmp_path)
+    return SQliteGrampsTreeLoader().load(tmp_path / "grampsdb")
+
+
+def test_gallery_writes_thumbnails_and_srcset(gramps_tree: GrampsTree) -> None:
+    Gallery(gramps_tree).generate_gallery()
+
+    assert gramps_tree.media
+    for media in gramps_tree.media.values():
+        # Синтетические фотографии шириной 800.
+        assert [(t.path.suffix, t.width) for t in media.thumbnails] == [
+            (suffix, width) for width in (200, 400, 800) for suffix in (".webp", ".jpg")
+        ]
+        assert media.path == media.thumbnails[-1].path
+        assert all(
+            Image.open(t.path).size == (t.width, t.height) for t in media.thumbnails
+        )
+    written = {path.name for path in Path("content/images/gallery").iterdir()}
+    assert written == {
+        t.path.name for media in gramps_tree.media.values() for t in media.thumbnails
+    }
+    page = Path("content/gallery/gallery.md").read_text(encoding="utf-8")
+    assert page.count("<picture>") == len(written) // 6
+    assert 'type="image/webp"' in page
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale(tmp_path: Path) -> None:
+    Image.linear_gradient("L").resize((6000, 4000)).convert("RGB").save(
+        tmp_path / "scan.jpg"
+    )
+
+    thumbnails = write_thumbnails(tmp_path / "scan.jpg", tmp_path, widths=(1600,))
+
+    assert [(t.path.name, t.width, t.height) for t in thumbnails] == [
+        ("scan-jpg-1600.webp", 1600, 1067),
+        ("scan-jpg-1600.jpg", 1600, 1067),
+    ]
+    with Image.open(tmp_path / "scan.jpg") as image:
+        image.draft(None, (1600, 1067))
+        # Декодирование в половинном масштабе: 3000 x 2000 >= 1600 x 1067.
+        assert image.size == (3000, 2000)
+
+
+def test_same_stem_sources_do_not_collide(tmp_path: Path) -> None:
+    Image.new("RGB", (300, 200), "red").save(tmp_path / "photo.jpg")
+    Image.new("RGB", (300, 200), "blue").save(tmp_path / "photo.png")
+    output_dir = tmp_path / "gallery"
+    output_dir.mkdir()
+
+    jpg = write_thumbnails(tmp_path / "photo.jpg", output_dir)
+    png = write_thumbnails(tmp_path / "photo.png", output_dir)
+
+    assert not {t.path for t in jpg} & {t.path for t in png}
+    assert len(list(output_dir.iterdir())) == len(jpg) + len(png)
@@ -0,0 +1,42 @@
+import sys
+
+sys.path.append(".")
+
+import pickle
+from pathlib import Path
+
+import pytest
+from benchmarks.synthetic_gramps_db import write_synthetic_gramps_db
+from src.app.entities import GrampsTree
+from src.infra.tree_loader import SQliteGrampsTreeLoader
+
+
+def _texts(gramps_tree: GrampsTree) -> dict[str, list]:
+    return {
+        person_id: sorted(
+            [note.content for note in person.notes]
+            + [event.description for event in person.events]
+        )
+        for person_id, person in gramps_tree.persons.items()
+    }
+
+
+@pytest.fixture()
+def database_dir(tmp_path: Path) -> Path:
+    write_synthetic_gramps_db(tmp_path / "grampsdb", persons_count=300)
+    return tmp_path / "grampsdb"
+
+
+def test_lazy_texts_match_eager(database_dir: Path) -> None:
+    eager = SQliteGrampsTreeLoader().load(database_dir)
+    lazy = SQliteGrampsTreeLoader(lazy_text=True).load(database_dir)
+
+    assert _texts(lazy) == _texts(eager)
+    assert any(note for texts in _texts(lazy).values() for note in texts)
+
+
+def test_lazy_texts_survive_pickle(database_dir: Path) -> None:
+    lazy = SQliteGrampsTreeLoader(lazy_text=True).load(database_dir)
+    expected = _texts(lazy)
+
+    assert _texts(pickle.loads(pickle.dumps(lazy))) == expected  # noqa: S301
@@ -0,0 +1,62 @@
+import sys
+
+sys.path.append(".")
+
+import time
+
+from benchmarks.synthetic_tree import build_synthetic_tree
+from src.app.entities import GrampsTree
+from src.app.kinship import KinshipCalculator, KinshipStep
+
+_MAX_SECONDS_PER_QUERY = 0.5
+
+
+def test_kinship_labels(gramps_tree: GrampsTree) -> None:
+    calculator = KinshipCalculator(gramps_tree)
+
+    def label(from_id: str, to_id: str) -> str:
+        return calculator.kinship(from_id, to_id).label
+
+    assert label("I0000", "I0004") == "отец"
+    assert label("I0000", "I0002") == "брат"
+    assert label("I0005", "I0014") == "прадед"
+    assert label("I0014", "I0019") == "правнук"
+    assert label("I0005", "I0002") == "дядя"
+    assert label("I0002", "I0006") == "племянник"
+    assert label("I0006", "I0018") == "двоюродный брат"
+    assert label("I0003", "I0004") == "свёкор"
+    assert label("I0004", "I0003") == "невестка"
+    assert label("I0003", "I0002") == "деверь"
+    assert label("I0009", "I0011") == "мачеха"
+    assert label("I0009", "I0012") == "сестра"
+    assert calculator.kinship("I0000", "I0007") is None
+
+
+def test_kinship_path(gramps_tree: GrampsTree) -> None:
+    kinship = KinshipCalculator(gramps_tree).kinship("I0003", "I0001")
+    assert kinship.persons == ["I0003", "I0000", "I0001"]
+    assert kinship.steps == [KinshipStep.SPOUSE, KinshipStep.PARENT]
+    assert kinship.label == "свекровь"
+
+
+def test_relations_to_matches_pairwise_queries() -> None:
+    gramps_tree = build_synthetic_tree(2000)
+    calculator = KinshipCalculator(gramps_tree)
+    root_id = next(iter(gramps_tree.persons))
+    relations = calculator.relations_to(root_id)
+    assert relations
+    for gramps_id, kinship in list(relations.items())[::50]:
+        pairwise = calculator.kinship(root_id, gramps_id)
+        assert len(pairwise.steps) == len(kinship.steps)
+        assert pairwise.persons[0] == kinship.persons[0] == root_id
+        assert pairwise.persons[-1] == kinship.persons[-1] == gramps_id
+
+
+def test_kinship_is_fast_on_large_tree() -> None:
+    gramps_tree = build_synthetic_tree(100_000)
+    calculator = KinshipCalculator(gramps_tree)
+    ids = list(gramps_tree.persons)
+    start = time.perf_counter()
+    for i in range(20):
+        calculator.kinship(ids[i * 997], ids[-1 - i * 991])
+    assert (time.perf_counter() - start) / 20 < _MAX_SECONDS_PER_QUERY
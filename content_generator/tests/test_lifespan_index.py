@@ -0,0 +1,38 @@
+import sys
+
+sys.path.append(".")
+
+import random
+from datetime import date, timedelta
+
+from benchmarks.synthetic_tree import build_synthetic_tree
+from src.app.entities import GrampsTree
+from src.app.lifespan_index import BIRTHDAY_ERROR_DAYS
+
+
+def test_alive_at_matches_linear_scan() -> None:
+    gramps_tree = build_synthetic_tree(500)
+    rnd = random.Random(0)
+    for _ in range(100):
+        start = date(1700, 1, 1) + timedelta(days=rnd.randint(0, 365 * 300))
+        end = start + timedelta(days=rnd.randint(0, 365 * 20))
+        expected = {
+            person.gramps_id
+            for person in gramps_tree.persons.values()
+            if person.birth_day.date <= end and person.death_day.date >= start
+        }
+        found = {p.gramps_id for p in gramps_tree.alive_between(start, end)}
+        assert found == expected
+
+
+def test_alive_at_with_estimated_dates(gramps_tree: GrampsTree) -> None:
+    # Дата рождения Ивана Навального (1917) неточная.
+    day = date(1917, 1, 1) - timedelta(days=BIRTHDAY_ERROR_DAYS - 1)
+    assert gramps_tree.alive_at(day) == []
+    assert [p.gramps_id for p in gramps_tree.alive_at(day, with_estimated=True)] == [
+        "I0014"
+    ]
+    assert [p.gramps_id for p in gramps_tree.alive_at(date(1950, 1, 1))] == [
+        "I0014",
+        "I0004",
+    ]
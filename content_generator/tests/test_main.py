@@ -0,0 +1,82 @@
+import sys
+
+sys.path.append(".")
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from benchmarks.synthetic_gramps_db import write_synthetic_gramps_db
+from main import _all_stages, _Context, _parse_args
+
+# Печатает тяжелые модули, загруженные командой.
+_RUN_COMMAND = (
+    "import sys, main; main.main(sys.argv[1:]); "
+    "print(sorted({'drawsvg', 'PIL', 'src.presenters.biographer'} & set(sys.modules)))"
+)
+
+_PERSONS_COUNT = 30
+
+
+def _run(command: str, site_dir: Path, *options: str) -> str:
+    result = subprocess.run(
+        [  # noqa: S603
+            sys.executable,
+            "-c",
+            _RUN_COMMAND,
+            command,
+            str(site_dir / "grampsdb"),
+            *options,
+        ],
+        cwd=site_dir,
+        env={**os.environ, "PYTHONPATH": str(Path.cwd())},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture()
+def site_dir(tmp_path: Path) -> Path:
+    (tmp_path / "content").mkdir()
+    write_synthetic_gramps_db(tmp_path / "grampsdb", persons_count=_PERSONS_COUNT)
+    return tmp_path
+
+
+def test_load_imports_no_presenters(site_dir: Path) -> None:
+    assert _run("load", site_dir) == "[]"
+    assert (site_dir / ".cache/gramps_tree.pickle").exists()
+
+
+def test_small_trees(site_dir: Path) -> None:
+    assert _run("small-trees", site_dir) == "['drawsvg']"
+    assert list((site_dir / "content/images/small_trees").glob("*.svg"))
+    assert not (site_dir / ".cache").exists()
+
+
+def test_branch_writes_only_its_person_pages(site_dir: Path) -> None:
+    _run("all", site_dir, "--root", "I00005", "--depth", "1")
+
+    pages = {path.stem for path in (site_dir / "content/persons").glob("*.md")}
+    assert "I00005" in pages
+    assert len(pages) < _PERSONS_COUNT
+    # Контент всей деревни по ветке не пишется.
+    assert sorted(path.name for path in (site_dir / "content").iterdir()) == [
+        "images",
+        "persons",
+    ]
+    assert not (site_dir / "content/images/tree.svg").exists()
+    assert not (site_dir / ".cache").exists()
+    assert not (site_dir / "reports").exists()
+
+
+def test_root_is_rejected_by_village_commands(tmp_path: Path) -> None:
+    for command in ("load", "tree", "gallery"):
+        with pytest.raises(SystemExit):
+            _parse_args([command, str(tmp_path), "--root", "I0001"])
+    args = _parse_args(["all", str(tmp_path), "--root", "I0001"])
+    assert args.person_markdown
+    context = _Context(None, "content", tmp_path / ".cache", args)
+    assert [stage.name for stage in _all_stages(context)] == ["gallery", "persons"]
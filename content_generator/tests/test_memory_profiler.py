@@ -0,0 +1,46 @@
+import sys
+
+sys.path.append(".")
+
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from src.infra.memory_profiler import MemoryProfiler
+from src.infra.stage_scheduler import Stage, StageScheduler
+
+_MIB = 1024 * 1024
+
+
+@pytest.fixture()
+def profiler():
+    yield MemoryProfiler(Path(__file__).parent, interval=0.01)
+    tracemalloc.stop()
+
+
+def _render_tree():
+    # Временные данные этапа: к его концу они уже освобождены.
+    copies = [bytearray(_MIB) for _ in range(20)]
+    time.sleep(0.1)
+    del copies
+
+
+def test_stage_peak_and_sites(profiler: MemoryProfiler) -> None:
+    kept = []
+    StageScheduler(
+        [
+            Stage("tree", _render_tree),
+            Stage("persons", lambda: kept.append(bytearray(5 * _MIB)), after=("tree",)),
+        ]
+    ).run(memory_profiler=profiler)
+
+    tree, persons = profiler.stages
+    assert tree.name == "tree"
+    assert tree.traced_peak >= 20 * _MIB
+    assert tree.retained < _MIB
+    assert tree.top_sites[0].location.startswith("test_memory_profiler.py:")
+    assert tree.top_sites[0].size >= 20 * _MIB
+    assert persons.retained >= 5 * _MIB
+    assert tree.rss_peak is not None
+    assert "tree: peak RSS" in profiler.report()
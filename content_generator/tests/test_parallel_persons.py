@@ -0,0 +1,63 @@
+import sys
+
+sys.path.append(".")
+sys.path.append("../plugins")
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from parallel_persons import parallel_persons
+from pelican import signals
+from pelican_embed_svg import _embed_svg
+
+_SVG = '<svg xmlns="http://www.w3.org/2000/svg"><path d="M0 0h1v1z"/></svg>'
+
+
+@pytest.fixture()
+def site(tmp_path: Path):
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "icon.svg").write_text(_SVG)
+    (tmp_path / "index.html").write_text(
+        '<html><body><img src="/images/icon.svg"></body></html>'
+    )
+    (tmp_path / "I0000.html").write_text("<html><body><p>Алексей</p></body></html>")
+    signals.finalized.connect(_embed_svg._finalized)  # noqa: SLF001
+    yield SimpleNamespace(
+        output_path=str(tmp_path),
+        settings={
+            "PLUGINS": ["pelican_embed_svg", "parallel_persons"],
+            "PARALLEL_PERSON_PAGES": 0,
+            "SITEURL": "",
+        },
+    )
+    signals.finalized.connect(_embed_svg._finalized)  # noqa: SLF001
+
+
+def test_embed_svg_without_workers_skips_pages_without_svg(
+    site, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    parsed = []
+    handle_icons = _embed_svg._handle_icons  # noqa: SLF001
+    monkeypatch.setattr(
+        _embed_svg,
+        "_handle_icons",
+        lambda soup, *args: parsed.append(soup) or handle_icons(soup, *args),
+    )
+    monkeypatch.setattr(
+        parallel_persons.multiprocessing,
+        "get_context",
+        lambda _: pytest.fail("the pool is not needed without workers"),
+    )
+
+    parallel_persons.take_over_embed_svg(site)
+    receivers = [receiver() for receiver in signals.finalized.receivers.values()]
+    assert _embed_svg._finalized not in receivers  # noqa: SLF001
+    parallel_persons.render_deferred(site)
+
+    output_path = Path(site.output_path)
+    assert "<svg" in (output_path / "index.html").read_text()
+    assert len(parsed) == 1
+    assert (output_path / "I0000.html").read_text() == (
+        "<html><body><p>Алексей</p></body></html>"
+    )
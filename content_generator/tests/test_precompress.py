@@ -0,0 +1,65 @@
+import sys
+
+sys.path.append(".")
+
+import gzip
+import shutil
+from pathlib import Path
+
+import brotli
+import pytest
+from src.infra.precompress import Precompressor
+
+_HTML = "<html><body>" + "<p>Янашбеляк</p>" * 200 + "</body></html>"
+
+
+def _build_site(output_dir: Path) -> None:
+    (output_dir / "images").mkdir(parents=True)
+    (output_dir / "index.html").write_text(_HTML, encoding="utf-8")
+    (output_dir / "images" / "tree.svg").write_text(
+        "<svg>" + '<rect x="0" y="0" />' * 500 + "</svg>", encoding="utf-8"
+    )
+    (output_dir / "images" / "photo.jpg").write_bytes(b"\xff\xd8" * 500)
+    (output_dir / "tiny.txt").write_text("a", encoding="utf-8")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_precompress(tmp_path: Path, workers: int) -> None:
+    output_dir, cache_dir = tmp_path / "docs", tmp_path / "cache"
+    _build_site(output_dir)
+
+    report = Precompressor(output_dir, cache_dir, workers).run()
+
+    assert (report.files, report.compressed, report.reused) == (3, 3, 0)
+    index_gz = output_dir / "index.html.gz"
+    assert gzip.decompress(index_gz.read_bytes()).decode() == _HTML
+    assert (output_dir / "images" / "tree.svg.gz").exists()
+    assert not (output_dir / "images" / "photo.jpg.gz").exists()
+    assert not (output_dir / "tiny.txt.gz").exists()
+    assert 0 < report.saved_bytes[".gz"] < report.original_bytes
+    index_br = output_dir / "index.html.br"
+    assert brotli.decompress(index_br.read_bytes()).decode() == _HTML
+    assert 0 < report.saved_bytes[".br"] < report.original_bytes
+
+    # Сборка для публикации очищает каталог сайта.
+    shutil.rmtree(output_dir)
+    _build_site(output_dir)
+    (output_dir / "index.html").write_text(_HTML + "<!-- -->", encoding="utf-8")
+    report = Precompressor(output_dir, cache_dir, workers).run()
+
+    assert (report.compressed, report.reused) == (1, 2)
+    assert index_gz.exists()
+    cached = {path.name.split(".")[0] for path in cache_dir.iterdir()}
+    assert len(cached) == report.files
+
+
+def test_precompress_removes_orphans(tmp_path: Path) -> None:
+    output_dir, cache_dir = tmp_path / "docs", tmp_path / "cache"
+    _build_site(output_dir)
+    Precompressor(output_dir, cache_dir, 1).run()
+
+    (output_dir / "index.html").unlink()
+    Precompressor(output_dir, cache_dir, 1).run()
+
+    assert not (output_dir / "index.html.gz").exists()
+    assert (output_dir / "images" / "tree.svg.gz").exists()
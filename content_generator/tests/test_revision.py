@@ -0,0 +1,95 @@
+import sys
+
+sys.path.append(".")
+
+from datetime import date
+from pathlib import Path
+
+from src.app.entities import Date, DateQuality, Gender, GrampsTree, Person
+from src.app.revision import RevisionMatcher, parse_revision_item
+from src.presenters.revision_annotator import RevisionAnnotator
+
+_PAGE = """Title: Появились копии первой ревизии
+Slug: 1_revision
+
+> - во дворе староста Мурзанай Яндереков штидесят трех лет,\
+ у него сын Лапкас тринатцети лет.
+> - Во дворе Янец Ямолин тритцети трех лет.
+
+- Лапкас тринатцети лет вне цитаты не трогается.
+"""
+
+
+def _tree(*persons: tuple[str, str, int]) -> GrampsTree:
+    return GrampsTree(
+        persons={
+            _id: Person(
+                _id=_id,
+                full_name=full_name,
+                birth_day=Date(date(year, 1, 1), DateQuality.ESTIMATED),
+                death_day=None,
+                gender=Gender.MALE,
+            )
+            for _id, full_name, year in persons
+        },
+        media={},
+        relations=set(),
+        families={},
+    )
+
+
+def test_matcher_uses_name_and_age() -> None:
+    matcher = RevisionMatcher(
+        _tree(
+            ("I0001", "Лапкас Мурзанаев", 1709),
+            ("I0002", "Лапкас", 1650),
+            ("I0003", "Мурзанай Яндереков", 1659),
+            ("I0004", "Мурзанай Токсубаев", 1660),
+        )
+    )
+    entries = parse_revision_item(
+        "староста Мурзанай Яндереков штидесят трех лет, у него сын Лапкас тринатцети"
+    )
+
+    matched = [matcher.match(entry, 1722) for entry in entries]
+
+    assert [person.gramps_id for person in matched] == ["I0003", "I0001"]
+
+
+def test_ambiguous_entries_are_not_linked() -> None:
+    matcher = RevisionMatcher(
+        _tree(("I0001", "Лапкас", 1708), ("I0002", "Лапкас Мурзанаев", 1710))
+    )
+    (entry,) = parse_revision_item("Лапкас тринатцети лет")
+    assert matcher.match(entry, 1722) is None
+
+
+def test_other_surname_is_not_linked() -> None:
+    matcher = RevisionMatcher(_tree(("I0001", "Мурзанай Токсубаев", 1659)))
+    (entry,) = parse_revision_item("Мурзанай Яндереков штидесят трех лет")
+    assert matcher.match(entry, 1722) is None
+
+
+def test_annotator_links_revision_items(tmp_path: Path) -> None:
+    source = tmp_path / "revisions" / "1_revision.md"
+    source.parent.mkdir()
+    source.write_text(_PAGE, encoding="utf-8")
+    (tmp_path / "revisions" / "persons_from_1_revision.md").write_text(_PAGE)
+    annotator = RevisionAnnotator(
+        _tree(("I0001", "Лапкас", 1709), ("I0002", "Янец Ямолин", 1689))
+    )
+    output_dir = tmp_path / "content" / "revisions"
+
+    annotator.annotate_pages(source.parent, output_dir)
+    page = output_dir / "1_revision.md"
+    annotated = page.read_text(encoding="utf-8")
+    annotator.annotate_pages(source.parent, output_dir)
+
+    assert source.read_text(encoding="utf-8") == _PAGE
+    assert [path.name for path in output_dir.iterdir()] == ["1_revision.md"]
+    assert page.read_text(encoding="utf-8") == annotated
+    assert "сын [Лапкас]({filename}../persons/I0001.md) тринатцети" in annotated
+    assert "> - Во дворе [Янец Ямолин]({filename}../persons/I0002.md) тритцети" in (
+        annotated
+    )
+    assert "- Лапкас тринатцети лет вне цитаты" in annotated
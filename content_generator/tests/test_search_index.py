@@ -0,0 +1,35 @@
+import sys
+
+sys.path.append(".")
+
+import json
+from pathlib import Path
+
+import pytest
+from src.app.entities import GrampsTree
+from src.presenters.search_index import SearchIndex
+
+
+def _find(search_dir: Path, token: str) -> set[str]:
+    shard = json.loads((search_dir / f"{token[:2]}.json").read_text())
+    return {shard["persons"][index][0] for index in shard["ngrams"].get(token, [])}
+
+
+def test_search_index_shards(
+    gramps_tree: GrampsTree, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    search_dir = tmp_path / "content/search"
+    search_dir.mkdir(parents=True)
+    (search_dir / "zz.json").write_text("{}")
+
+    SearchIndex(gramps_tree).generate_index()
+
+    assert not (search_dir / "zz.json").exists()
+    assert _find(search_dir, "puti") == {"I0009", "I0010", "I0016", "I0017", "I0007"}
+    assert _find(search_dir, "vladimir") == {"I0007", "I0017"}
+    assert _find(search_dir, "kab") == {"I0015"}
+
+    shard = json.loads((search_dir / "al.json").read_text())
+    assert ["I0000", "Алексей Навальный", 1976, None] in shard["persons"]
+    assert "na" not in shard["ngrams"]
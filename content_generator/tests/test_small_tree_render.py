@@ -6,8 +6,13 @@ sys.path.append(".")
 from pathlib import Path
 
 import pytest
-from src.gramps_tree import GrampsTree
-from src.small_tree_render import SmallTreeRender, WithoutRelationsError
+from src.app.entities import GrampsTree
+from src.presenters.biographer import Biographer
+from src.presenters.small_tree_render import (
+    SmallTreeRender,
+    SvgBackend,
+    WithoutRelationsError,
+)
 
 
 @pytest.fixture(scope="session")
@@ -17,12 +22,17 @@ def _tmp_dir():
     shutil.rmtree("tmp")
 
 
+@pytest.fixture(params=list(SvgBackend))
+def render(request) -> SmallTreeRender:
+    return SmallTreeRender(backend=request.param)
+
+
 @pytest.mark.usefixtures("_tmp_dir")
-def test_normal_family() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_normal_family(gramps_tree: GrampsTree, render: SmallTreeRender) -> None:
     render.create_svg(
-        base_person_id="I0000", gramps_tree=tree, output_path=Path("tmp/test1.svg")
+        base_person_id="I0000",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/test1.svg"),
     )
     with Path("tmp/test1.svg").open() as f:
         assert (
@@ -32,21 +42,21 @@ def test_normal_family() -> None:
 
 
 @pytest.mark.usefixtures("_tmp_dir")
-def test_without_relations() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_without_relations(gramps_tree: GrampsTree, render: SmallTreeRender) -> None:
     with pytest.raises(WithoutRelationsError):
         render.create_svg(
-            base_person_id="I0013", gramps_tree=tree, output_path=Path("tmp/I0013.svg")
+            base_person_id="I0013",
+            gramps_tree=gramps_tree,
+            output_path=Path("tmp/I0013.svg"),
         )
 
 
 @pytest.mark.usefixtures("_tmp_dir")
-def test_without_children() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_without_children(gramps_tree: GrampsTree, render: SmallTreeRender) -> None:
     render.create_svg(
-        base_person_id="I0006", gramps_tree=tree, output_path=Path("tmp/I0006.svg")
+        base_person_id="I0006",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/I0006.svg"),
     )
     with Path("tmp/I0006.svg").open() as f:
         assert (
@@ -56,20 +66,20 @@ def test_without_children() -> None:
 
 
 @pytest.mark.usefixtures("_tmp_dir")
-def test_only_parents() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_only_parents(gramps_tree: GrampsTree, render: SmallTreeRender) -> None:
     render.create_svg(
-        base_person_id="I0000", gramps_tree=tree, output_path=Path("tmp/I0000.svg")
+        base_person_id="I0000",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/I0000.svg"),
     )
 
 
 @pytest.mark.usefixtures("_tmp_dir")
-def test_many_womans() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_many_womans(gramps_tree: GrampsTree, render: SmallTreeRender) -> None:
     render.create_svg(
-        base_person_id="I0007", gramps_tree=tree, output_path=Path("tmp/test2.svg")
+        base_person_id="I0007",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/test2.svg"),
     )
     with Path("tmp/test2.svg").open() as f:
         assert (
@@ -79,14 +89,50 @@ def test_many_womans() -> None:
 
 
 @pytest.mark.usefixtures("_tmp_dir")
-def test_children_without_mother() -> None:
-    tree = GrampsTree("tests/test_tree")
-    render = SmallTreeRender()
+def test_children_without_mother(
+    gramps_tree: GrampsTree, render: SmallTreeRender
+) -> None:
     render.create_svg(
-        base_person_id="I0002", gramps_tree=tree, output_path=Path("tmp/I0002.svg")
+        base_person_id="I0002",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/I0002.svg"),
     )
     with Path("tmp/I0002.svg").open() as f:
         assert (
             f.read()
             == '<?xml version="1.0" encoding="UTF-8"?>\n<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"\n     width="340" height="300" viewBox="0 0 340 300">\n<defs>\n</defs>\n<path d="M150,25.0 L170,25.0" stroke="black" stroke-width="0.8" fill="none" />\n<path d="M160.0,25.0 L75.0,100" stroke="gray" stroke-width="0.8" fill="none" />\n<path d="M75.0,125.0 L75.0,200" stroke="gray" stroke-width="0.8" fill="none" />\n<path d="M75.0,125.0 L245.0,200" stroke="gray" stroke-width="0.8" fill="none" />\n<rect x="0" y="0" width="150" height="50" fill="pink" />\n<rect x="170" y="0" width="150" height="50" fill="lightblue" />\n<rect x="0" y="100" width="150" height="50" fill="lightblue" />\n<rect x="0" y="200" width="150" height="50" fill="lightblue" />\n<rect x="170" y="200" width="150" height="50" fill="lightblue" />\n<a xlink:href="None/I0001.html" target="_parent">[...]><text x="17.249999999999993" y="25.0" font-size="14">Людмила Иванова</text>\n</a><a xlink:href="None/I0004.html" target="_parent">[...]><text x="175.7" y="25.0" font-size="14">Анатолий Навальный</text>\n</a><a xlink:href="None/I0002.html" target="_parent">[...]><text x="21.099999999999994" y="125.0" font-size="14">Олег Навальный</text>\n</a><a xlink:href="None/I0018.html" target="_parent">[...]><text x="13.399999999999991" y="225.0" font-size="14">Степан Навальный</text>\n</a><a xlink:href="None/I0019.html" target="_parent">[...]><text x="187.25" y="225.0" font-size="14">Остап Навальный</text>\n</a></svg>'
         )
+
+
+@pytest.mark.usefixtures("_tmp_dir")
+def test_inline_matches_file(gramps_tree: GrampsTree) -> None:
+    render = SmallTreeRender(backend=SvgBackend.TEMPLATE)
+    render.create_svg(
+        base_person_id="I0007",
+        gramps_tree=gramps_tree,
+        output_path=Path("tmp/I0007.svg"),
+    )
+    inline = render.render_inline("I0007", gramps_tree)
+
+    assert "\n" not in inline
+    assert inline.startswith('<svg xmlns="http://www.w3.org/2000/svg"')
+    with Path("tmp/I0007.svg").open() as f:
+        from_file = f.read().replace("\n     ", " ").replace("<defs>\n</defs>\n", "")
+    assert inline == from_file.removeprefix(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+    ).replace("\n", "")
+
+
+def test_biographer_inline_small_trees(
+    gramps_tree: GrampsTree, tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    biographer = Biographer(
+        gramps_tree, "content", export_markdown=False, inline_small_trees=True
+    )
+
+    articles = {article.slug: str(article) for article in biographer.articles}
+    assert '<div class="small-tree"><svg ' in articles["I0000"]
+    assert "small_trees" not in articles["I0000"]
+    assert "small-tree" not in articles["I0013"]
+    assert not (tmp_path / "content").exists()
@@ -0,0 +1,102 @@
+import sys
+
+sys.path.append(".")
+
+import functools
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from src.infra.stage_scheduler import (
+    Stage,
+    StageExecutor,
+    StageGraphError,
+    StageScheduler,
+)
+
+
+def _write_pid(path: Path) -> None:
+    path.write_text(str(os.getpid()))
+
+
+@pytest.mark.parametrize("sequential", [False, True])
+def test_stages_respect_dependencies(tmp_path: Path, *, sequential: bool) -> None:
+    finished = []
+    lock = threading.Lock()
+
+    def stage(name: str, seconds: float = 0.0):
+        def run():
+            time.sleep(seconds)
+            with lock:
+                finished.append(name)
+
+        return run
+
+    report = StageScheduler(
+        [
+            Stage("persons", stage("persons", 0.05), after=("gallery",)),
+            Stage("gallery", stage("gallery", 0.1)),
+            Stage("timeline", stage("timeline")),
+            Stage(
+                "tree",
+                functools.partial(_write_pid, tmp_path / "tree.pid"),
+                executor=StageExecutor.PROCESS,
+            ),
+        ]
+    ).run(sequential=sequential)
+
+    assert finished.index("gallery") < finished.index("persons")
+    assert report.critical_path == ["gallery", "persons"]
+    assert report.critical_time == pytest.approx(
+        report.timings["gallery"].duration + report.timings["persons"].duration
+    )
+    assert report.timings.keys() == {"persons", "gallery", "timeline", "tree"}
+    assert (tmp_path / "tree.pid").exists()
+    if not sequential:
+        assert finished.index("timeline") < finished.index("gallery")
+
+
+def test_process_stage_runs_in_other_process(tmp_path: Path) -> None:
+    StageScheduler(
+        [
+            Stage(
+                "tree",
+                functools.partial(_write_pid, tmp_path / "tree.pid"),
+                executor=StageExecutor.PROCESS,
+            )
+        ]
+    ).run()
+
+    assert (tmp_path / "tree.pid").read_text() != str(os.getpid())
+
+
+@pytest.mark.parametrize(
+    "stages",
+    [
+        [Stage("a", print), Stage("a", print)],
+        [Stage("a", print, after=("b",))],
+        [Stage("a", print, after=("b",)), Stage("b", print, after=("a",))],
+    ],
+)
+def test_invalid_graph(stages: list[Stage]) -> None:
+    with pytest.raises(StageGraphError):
+        StageScheduler(stages)
+
+
+def test_failed_stage_stops_dependants() -> None:
+    finished = []
+
+    def fail():
+        raise RuntimeError
+
+    scheduler = StageScheduler(
+        [
+            Stage("gallery", fail),
+            Stage("persons", lambda: finished.append("persons"), after=("gallery",)),
+        ]
+    )
+    with pytest.raises(RuntimeError):
+        scheduler.run()
+    assert not finished
@@ -0,0 +1,41 @@
+import sys
+
+sys.path.append(".")
+
+import pytest
+from src.app.entities import GrampsId, GrampsTree
+from src.app.subset import UnknownRootError, branch_subset
+
+
+def test_branch_keeps_ancestors_descendants_and_spouses(
+    gramps_tree: GrampsTree,
+) -> None:
+    branch = branch_subset(gramps_tree, [GrampsId("I0000")], depth=1)
+
+    # Брат I0002 и дед I0014 в ветку глубины 1 не входят.
+    assert set(branch.persons) == {"I0000", "I0001", "I0003", "I0004", "I0005", "I0006"}
+    assert set(branch.families) == {"F0000", "F0001"}
+    assert {child.gramps_id for child in branch.families["F0000"].children} == {"I0000"}
+    assert all(
+        relation.first_person_id in branch.persons
+        and relation.other_person_id in branch.persons
+        for relation in branch.relations
+    )
+    # Исходное дерево не меняется.
+    assert {child.gramps_id for child in gramps_tree.families["F0000"].children} == {
+        "I0000",
+        "I0002",
+    }
+
+
+def test_branch_depth_and_several_roots(gramps_tree: GrampsTree) -> None:
+    branch = branch_subset(gramps_tree, [GrampsId("I0000"), GrampsId("I0009")], depth=2)
+
+    assert {"I0014", "I0007", "I0008", "I0011", "I0015"} <= set(branch.persons)
+    assert "F0004" in branch.families
+    assert "I0012" not in branch.persons
+
+
+def test_unknown_root(gramps_tree: GrampsTree) -> None:
+    with pytest.raises(UnknownRootError):
+        branch_subset(gramps_tree, [GrampsId("I9999")], depth=1)
@@ -0,0 +1,56 @@
+import sys
+
+sys.path.append(".")
+
+from pathlib import Path
+
+from benchmarks.synthetic_gramps_db import write_synthetic_gramps_db
+from src.infra.tree_loader import SQliteGrampsTreeLoader
+
+
+def _family_members(gramps_tree) -> dict[str, tuple]:
+    return {
+        family_id: (
+            family.father.gramps_id,
+            family.mother.gramps_id,
+            sorted(child.gramps_id for child in family.children),
+        )
+        for family_id, family in gramps_tree.families.items()
+    }
+
+
+def test_loader_reads_synthetic_database(tmp_path: Path) -> None:
+    source = write_synthetic_gramps_db(tmp_path, 300, photo_share=0.5)
+
+    gramps_tree = SQliteGrampsTreeLoader().load(tmp_path)
+
+    assert gramps_tree.persons.keys() == source.persons.keys()
+    assert _family_members(gramps_tree) == _family_members(source)
+    assert any(person.notes for person in gramps_tree.persons.values())
+    assert all(media.path.exists() for media in gramps_tree.media.values())
+    assert any(len(media.persons) > 1 for media in gramps_tree.media.values())
+    for person_id, person in source.persons.items():
+        assert gramps_tree.persons[person_id].birth_day.date == person.birth_day.date
+
+
+def test_parallel_load_matches_sequential(tmp_path: Path) -> None:
+    write_synthetic_gramps_db(tmp_path, 300, photo_share=0.5)
+
+    sequential = SQliteGrampsTreeLoader().load(tmp_path)
+    parallel = SQliteGrampsTreeLoader(parallel=True).load(tmp_path)
+
+    assert list(parallel.persons) == list(sequential.persons)
+    assert _family_members(parallel) == _family_members(sequential)
+    assert set(parallel.relations) == set(sequential.relations)
+    for person_id, person in sequential.persons.items():
+        loaded = parallel.persons[person_id]
+        assert str(loaded.birth_day) == str(person.birth_day)
+        assert {note.content for note in loaded.notes} == {
+            note.content for note in person.notes
+        }
+        assert {event.gramps_id for event in loaded.events} == {
+            event.gramps_id for event in person.events
+        }
+        assert {media.path for media in loaded.media} == {
+            media.path for media in person.media
+        }
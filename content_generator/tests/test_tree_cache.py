@@ -0,0 +1,39 @@
+import sys
+
+sys.path.append(".")
+
+import pickle
+from pathlib import Path
+
+from src.app.entities import GrampsTree
+from src.infra.tree_cache import load_gramps_tree, save_gramps_tree
+from src.presenters.biographer import Biographer
+
+
+def test_tree_cache_roundtrip(gramps_tree: GrampsTree, tmp_path: Path) -> None:
+    path = tmp_path / "cache" / "gramps_tree.pickle"
+    assert load_gramps_tree(path) is None
+
+    save_gramps_tree(gramps_tree, path)
+    cached = load_gramps_tree(path)
+
+    assert set(cached.persons) == set(gramps_tree.persons)
+    assert str(cached.persons["I0014"]) == str(gramps_tree.persons["I0014"])
+    father = cached.families["F0000"].father
+    assert father is cached.persons["I0004"]
+
+    with path.open("wb") as file:
+        pickle.dump((0, gramps_tree), file)
+    assert load_gramps_tree(path) is None
+
+
+def test_biographer_without_markdown_export(
+    gramps_tree: GrampsTree, tmp_path: Path, monkeypatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    biographer = Biographer(gramps_tree, "content", export_markdown=False)
+
+    assert not (tmp_path / "content" / "persons").exists()
+    assert sorted(article.slug for article in biographer.articles) == sorted(
+        gramps_tree.persons
+    )
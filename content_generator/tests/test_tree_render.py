@@ -0,0 +1,105 @@
+import sys
+
+sys.path.append(".")
+
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+from loguru import logger
+from src.app.entities import (
+    Date,
+    DateQuality,
+    Gender,
+    GrampsTree,
+    Person,
+    Relation,
+    RelationType,
+)
+from src.presenters.tree_render import (
+    _BIRTHDAY_ERROR_DAYS,
+    _DEATHDAY_ERROR_DAYS,
+    _X_OFFSET,
+    _X_SCALE,
+    TreeRender,
+    _TimeColumns,
+)
+
+
+def test_time_columns_match_date_arithmetic(gramps_tree: GrampsTree) -> None:
+    columns = _TimeColumns(gramps_tree)
+    origin = min(p.birth_day.date for p in gramps_tree.persons.values())
+    assert columns.origin == origin
+
+    for person in gramps_tree.persons.values():
+        person_columns = columns.person(person.gramps_id)
+        x = (person.birth_day.date - origin).days * _X_SCALE + _X_OFFSET
+        assert person_columns.x == x
+        assert person_columns.width == person.days_of_life * _X_SCALE
+        # Дата смерти в тестовом дереве не указана, поэтому всегда неточная.
+        assert person_columns.deathday_gradient_x == (
+            x + person.days_of_life * _X_SCALE + _DEATHDAY_ERROR_DAYS * _X_SCALE
+        )
+
+    assert columns.person("I0000").birthday_gradient_x is None
+    estimated = columns.person("I0014")
+    assert estimated.birthday_gradient_x == (
+        estimated.x - _BIRTHDAY_ERROR_DAYS * _X_SCALE
+    )
+
+
+def test_time_columns_weddings(gramps_tree: GrampsTree) -> None:
+    columns = _TimeColumns(gramps_tree)
+    origin = columns.origin
+
+    oldest_child = gramps_tree.persons["I0000"].birth_day.date
+    wedding_x = columns.wedding_x("F0000")
+    latest = (oldest_child - timedelta(weeks=40) - origin).days * _X_SCALE + _X_OFFSET
+    earliest = latest - 500 * 7 * _X_SCALE
+    assert earliest <= wedding_x <= latest
+    family = gramps_tree.families["F0000"]
+    assert wedding_x == (family.wedding_day - origin).days * _X_SCALE + _X_OFFSET
+
+    assert columns.parental_wedding_x("I0002") == wedding_x
+    assert columns.parental_wedding_x("I0014") is None
+
+
+def _render_and_count_restored_clans(gramps_tree, tmp_path: Path) -> int:
+    restored = []
+    handler_id = logger.add(
+        restored.append, filter=lambda record: "restored" in record["message"]
+    )
+    try:
+        TreeRender(gramps_tree, tmp_path / "tree.svg", tmp_path / "layout.json")
+    finally:
+        logger.remove(handler_id)
+    return len(restored)
+
+
+def test_layout_cache_relayouts_only_changed_clans(
+    gramps_tree: GrampsTree, tmp_path: Path
+) -> None:
+    assert _render_and_count_restored_clans(gramps_tree, tmp_path) == 0
+    layout = (tmp_path / "layout.json").read_text()
+    clans = json.loads(layout)["clans"]
+    assert set(clans) == {"I0014", "I0007", "I0013"}
+
+    assert _render_and_count_restored_clans(gramps_tree, tmp_path) == len(clans)
+    assert (tmp_path / "layout.json").read_text() == layout
+
+    grandson = Person(
+        _id="I0020",
+        full_name="Петр Навальный",
+        birth_day=Date(date(2016, 1, 1), DateQuality.EXACTLY),
+        death_day=None,
+        gender=Gender.MALE,
+    )
+    gramps_tree.persons[grandson.gramps_id] = grandson
+    gramps_tree.families["F0006"].add_child(grandson)
+    gramps_tree.relations.add(
+        Relation("I0020", RelationType.BIRTH_FROM, "I0002", "F0006")
+    )
+
+    assert _render_and_count_restored_clans(gramps_tree, tmp_path) == len(clans) - 1
+    clans = json.loads((tmp_path / "layout.json").read_text())["clans"]
+    assert "I0020" in [node[0] for node in clans["I0014"]["nodes"]]
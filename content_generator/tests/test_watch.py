@@ -0,0 +1,227 @@
+import sys
+
+sys.path.append(".")
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from src.app.entities import EventType, GrampsTree
+from src.infra.tree_loader import SQliteGrampsTreeLoader
+from src.infra.watcher import GrampsWatcher
+from src.presenters.live_content import LiveContent
+
+_SCHEMA = """
+CREATE TABLE person (handle TEXT PRIMARY KEY, given_name TEXT, surname TEXT,
+    gramps_id TEXT, gender INTEGER, change INTEGER);
+CREATE TABLE family (handle TEXT PRIMARY KEY, gramps_id TEXT, father_handle TEXT,
+    mother_handle TEXT, change INTEGER);
+CREATE TABLE event (handle TEXT PRIMARY KEY, gramps_id TEXT, json_data TEXT,
+    change INTEGER);
+CREATE TABLE note (handle TEXT PRIMARY KEY, gramps_id TEXT, json_data TEXT,
+    change INTEGER);
+CREATE TABLE media (handle TEXT PRIMARY KEY, gramps_id TEXT, path TEXT, mime TEXT,
+    desc TEXT, change INTEGER);
+CREATE TABLE reference (obj_handle TEXT, obj_class TEXT, ref_handle TEXT,
+    ref_class TEXT);
+"""
+
+
+class _GrampsDb:
+    """Минимальная база Gramps с json_data: только то, что читает загрузчик."""
+
+    def __init__(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        self.__conn = sqlite3.connect(path / "sqlite.db")
+        self.__conn.executescript(_SCHEMA)
+        self.__change = 0
+
+    def person(self, gramps_id: str, name: str, gender: int, year: int):
+        given_name, surname = name.split()
+        self.__execute(
+            "INSERT OR REPLACE INTO person VALUES (?, ?, ?, ?, ?, ?)",
+            (gramps_id, given_name, surname, gramps_id, gender, self.__next()),
+        )
+        event_id = f"E{gramps_id}"
+        self.__execute(
+            "INSERT OR REPLACE INTO event VALUES (?, ?, ?, ?)",
+            (event_id, event_id, self.__event_json(event_id, year), self.__next()),
+        )
+        self.__reference(gramps_id, "Person", event_id, "Event")
+
+    def note(self, person_id: str, note_id: str, text: str):
+        data = json.dumps({"gramps_id": note_id, "text": {"string": text}})
+        self.__execute(
+            "INSERT OR REPLACE INTO note VALUES (?, ?, ?, ?)",
+            (note_id, note_id, data, self.__next()),
+        )
+        self.__reference(person_id, "Person", note_id, "Note")
+
+    def family(self, family_id: str, father_id: str, mother_id: str, children):
+        self.__execute(
+            "INSERT OR REPLACE INTO family VALUES (?, ?, ?, ?, ?)",
+            (family_id, family_id, father_id, mother_id, self.__next()),
+        )
+        for person_id in (father_id, mother_id, *children):
+            self.__reference(family_id, "Family", person_id, "Person")
+
+    def touch(self, table: str, handle: str):
+        self.__execute(
+            f"UPDATE {table} SET change = ? WHERE handle = ?",  # noqa: S608
+            (self.__next(), handle),
+        )
+
+    @staticmethod
+    def __event_json(event_id: str, year: int) -> str:
+        return json.dumps(
+            {
+                "gramps_id": event_id,
+                "type": {"value": EventType.BIRTH.value},
+                "date": {"dateval": [1, 1, year, False], "quality": 0},
+                "description": "",
+            }
+        )
+
+    def __reference(self, obj: str, obj_class: str, ref: str, ref_class: str):
+        self.__execute(
+            "INSERT INTO reference VALUES (?, ?, ?, ?)",
+            (obj, obj_class, ref, ref_class),
+        )
+
+    def __execute(self, sql: str, params: tuple):
+        self.__conn.execute(sql, params)
+        self.__conn.commit()
+
+    def __next(self) -> int:
+        self.__change += 1
+        return self.__change
+
+
+@pytest.fixture()
+def gramps_db(tmp_path: Path) -> tuple[_GrampsDb, Path]:
+    path = tmp_path / "grampsdb"
+    db = _GrampsDb(path)
+    db.person("I0", "Ефим Алмадаев", 1, 1800)
+    db.person("I1", "Анна Яндушева", 0, 1805)
+    db.person("I2", "Иван Алмадаев", 1, 1830)
+    db.person("I3", "Петр Яндушев", 1, 1790)
+    db.note("I2", "N0", "Был старостой")
+    db.family("F0", "I0", "I1", ["I2"])
+    return db, path
+
+
+def test_reload_only_changed_rows(gramps_db) -> None:
+    db, path = gramps_db
+    loader = SQliteGrampsTreeLoader()
+    snapshot = loader.snapshot(path)
+    gramps_tree = loader.load(path)
+    father = gramps_tree.persons["I0"]
+    lifespans = gramps_tree.lifespans
+
+    db.note("I2", "N0", "Был старостой и мельником")
+    db.touch("note", "N0")
+    new_snapshot = loader.snapshot(path)
+    changes = SQliteGrampsTreeLoader().reload(path, gramps_tree, snapshot, new_snapshot)
+
+    assert changes.persons == {"I2"}
+    assert not changes.removed_persons
+    assert not changes.families
+    child = gramps_tree.persons["I2"]
+    assert [note.content for note in child.notes] == ["Был старостой и мельником"]
+    assert [event.gramps_id for event in child.events] == ["EI2"]
+    assert gramps_tree.persons["I0"] is father
+    assert gramps_tree.families["F0"].children == {child}
+    assert next(iter(gramps_tree.families["F0"].children)) is child
+    assert gramps_tree.lifespans is not lifespans
+
+    snapshot = new_snapshot
+    db.person("I4", "Мария Алмадаева", 0, 1832)
+    db.family("F0", "I0", "I1", ["I2", "I4"])
+    new_snapshot = loader.snapshot(path)
+    changes = SQliteGrampsTreeLoader().reload(path, gramps_tree, snapshot, new_snapshot)
+
+    assert changes.persons == {"I4"}
+    assert changes.families
+    assert {p.gramps_id for p in gramps_tree.families["F0"].children} == {"I2", "I4"}
+
+    assert (
+        SQliteGrampsTreeLoader()
+        .reload(path, gramps_tree, new_snapshot, loader.snapshot(path))
+        .is_empty
+    )
+
+
+def _write_page_times(persons_dir: Path) -> dict[str, int]:
+    return {path.stem: path.stat().st_mtime_ns for path in persons_dir.glob("*.md")}
+
+
+def test_live_content_updates_affected_pages(
+    gramps_db, tmp_path: Path, monkeypatch
+) -> None:
+    db, path = gramps_db
+    monkeypatch.chdir(tmp_path)
+    loader = SQliteGrampsTreeLoader()
+    snapshot = loader.snapshot(path)
+    gramps_tree: GrampsTree = loader.load(path)
+    live_content = LiveContent(gramps_tree, "content", person_markdown=True)
+
+    db.person("I1", "Анна Яндушева-Алмадаева", 0, 1805)
+    changes = loader.reload(path, gramps_tree, snapshot, loader.snapshot(path))
+    live_content.update(changes, frozenset())
+
+    # Мать видна на малых деревьях мужа и сына, Петр с ней не связан.
+    assert sorted(_write_page_times(tmp_path / "content" / "persons")) == [
+        "I0",
+        "I1",
+        "I2",
+    ]
+    assert "Яндушева-Алмадаева" in (tmp_path / "content/persons/I1.md").read_text()
+    small_tree = tmp_path / "content" / "images" / "small_trees" / "I2.svg"
+    assert "Яндушева-Алмадаева" in small_tree.read_text()
+    assert (tmp_path / "content" / "timeline" / "timeline.md").exists()
+
+
+def test_live_content_leaves_person_pages_to_plugin(
+    gramps_db, tmp_path: Path, monkeypatch
+) -> None:
+    db, path = gramps_db
+    monkeypatch.chdir(tmp_path)
+    loader = SQliteGrampsTreeLoader()
+    snapshot = loader.snapshot(path)
+    gramps_tree: GrampsTree = loader.load(path)
+    content_dir = tmp_path / "site" / "content"
+    live_content = LiveContent(gramps_tree, str(content_dir))
+
+    db.person("I1", "Анна Яндушева-Алмадаева", 0, 1805)
+    live_content.update(
+        loader.reload(path, gramps_tree, snapshot, loader.snapshot(path)),
+        frozenset(),
+    )
+
+    # Статьи строит плагин по кешу дерева, markdown файлы он бы пропустил.
+    assert not (content_dir / "persons").exists()
+    small_tree = content_dir / "images" / "small_trees" / "I2.svg"
+    assert "Яндушева-Алмадаева" in small_tree.read_text()
+    assert (content_dir / "images" / "tree.svg").exists()
+    assert not (tmp_path / "content" / "images").exists()
+
+
+def test_watcher_waits_for_quiet_period(tmp_path: Path) -> None:
+    database = tmp_path / "sqlite.db"
+    database.write_bytes(b"0")
+    (tmp_path / "media").mkdir()
+    watcher = GrampsWatcher(tmp_path, interval=0.01, debounce=0.1)
+
+    def edit():
+        database.write_bytes(b"01")
+        (tmp_path / "media" / "photo.jpg").write_bytes(b"jpg")
+
+    timer = threading.Timer(0.05, edit)
+    timer.start()
+    event = watcher.wait()
+    timer.join()
+
+    assert event.database
+    assert event.media_files == {tmp_path / "media" / "photo.jpg"}
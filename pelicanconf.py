@@ -5,6 +5,7 @@ SITENAME = "д. Янашбеляк"
 SITEURL = os.getenv("SITEURL")
 OUTPUT_PATH = "docs"
 PATH = "content"
+STATIC_PATHS = ["images", "search"]
 
 TIMEZONE = "Europe/Moscow"
 
@@ -19,9 +20,19 @@ AUTHOR_FEED_RSS = None
 
 DEFAULT_PAGINATION = False
 
+PLUGIN_PATHS = ["plugins"]
 PLUGINS = [
     "pelican_embed_svg",
+    "gramps_persons",
+    "parallel_persons",
+    "responsive_images",
 ]
+# Кеш дерева, из которого gramps_persons строит статьи о персонах.
+GRAMPS_TREE_CACHE = ".cache/gramps_tree.pickle"
+# Встраивать малые деревья в статьи о персонах svg разметкой, без файлов.
+INLINE_SMALL_TREES = True
+# Число процессов для записи страниц персон, 0 - писать последовательно.
+PARALLEL_PERSON_PAGES = 0
 
 # Uncomment following line if you want document-relative URLs when developing
 # RELATIVE_URLS = True  # noqa: ERA001
@@ -0,0 +1,3 @@
+from .gramps_persons import register
+
+__all__ = ["register"]
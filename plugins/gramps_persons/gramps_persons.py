@@ -0,0 +1,112 @@
+"""Статьи о персонах для Pelican прямо из кеша дерева.
+
+content_generator/main.py сохраняет прочитанное дерево в GRAMPS_TREE_CACHE.
+Плагин строит по нему статьи Biographer в памяти и добавляет их в
+ArticlesGenerator так, как если бы они были прочитаны из content/persons.
+Статьи, для которых в content/persons уже есть файл, не дублируются.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from markdown import Markdown
+from pelican import signals
+from pelican.contents import Article
+from pelican.generators import ArticlesGenerator
+from pelican.readers import (
+    MarkdownReader,
+    _filter_discardable_metadata,
+    default_metadata,
+    path_metadata,
+)
+from pelican.utils import order_content
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "content_generator"))
+
+from loguru import logger  # noqa: E402
+from src.app.kinship import village_founder  # noqa: E402
+from src.infra.russian_locale import use_russian_month_names  # noqa: E402
+from src.infra.tree_cache import load_gramps_tree  # noqa: E402
+from src.presenters.biographer import Biographer  # noqa: E402
+
+_DEFAULT_CACHE = ".cache/gramps_tree.pickle"
+_PERSONS_DIR = "persons"
+
+
+class _MarkdownTextReader(MarkdownReader):
+    """MarkdownReader, читающий текст статьи из памяти, а не из файла."""
+
+    def read_text(self, text: str) -> tuple[str, dict]:
+        self._md = Markdown(**self.settings["MARKDOWN"])
+        content = self._md.convert(text)
+        metadata = self._parse_metadata(self._md.Meta)
+        return content, metadata
+
+
+def add_person_articles(generator: ArticlesGenerator):
+    gramps_tree = load_gramps_tree(
+        Path(generator.settings.get("GRAMPS_TREE_CACHE", _DEFAULT_CACHE))
+    )
+    if gramps_tree is None:
+        logger.warning("Gramps tree cache not found, person articles skipped")
+        return
+    use_russian_month_names()
+
+    founder = village_founder(gramps_tree)
+    biographer = Biographer(
+        gramps_tree,
+        generator.path,
+        founder_id=founder.gramps_id if founder is not None else None,
+        export_markdown=False,
+        inline_small_trees=generator.settings.get("INLINE_SMALL_TREES", False),
+    )
+
+    reader = _MarkdownTextReader(generator.settings)
+    added = []
+    for biography in biographer.articles:
+        relative_path = f"{_PERSONS_DIR}/{biography.slug}.md"
+        if relative_path in generator.context["generated_content"]:
+            continue
+        article = _read_article(generator, reader, relative_path, str(biography))
+        generator.add_source_path(article)
+        generator.add_static_links(article)
+        added.append(article)
+
+    generator.articles = order_content(
+        generator.articles + added, generator.settings["ARTICLE_ORDER_BY"]
+    )
+    logger.info(f"{len(added)} person articles added from {generator.path}")
+
+
+def _read_article(
+    generator: ArticlesGenerator,
+    reader: _MarkdownTextReader,
+    relative_path: str,
+    text: str,
+) -> Article:
+    """Повторяет Readers.read_file для markdown текста из памяти."""
+    path = os.path.join(generator.path, relative_path)  # noqa: PTH118
+    metadata = _filter_discardable_metadata(
+        default_metadata(settings=generator.settings, process=reader.process_metadata)
+    )
+    metadata.update(
+        path_metadata(
+            full_path=path, source_path=relative_path, settings=generator.settings
+        )
+    )
+    metadata["reader"] = "markdown"
+    content, reader_metadata = reader.read_text(text)
+    metadata.update(_filter_discardable_metadata(reader_metadata))
+    signals.article_generator_context.send(generator, metadata=metadata)
+    return Article(
+        content=content,
+        metadata=metadata,
+        settings=generator.settings,
+        source_path=path,
+        context=generator.context,
+    )
+
+
+def register():
+    signals.article_generator_pretaxonomy.connect(add_person_articles)
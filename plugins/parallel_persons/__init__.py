@@ -0,0 +1,3 @@
+from .parallel_persons import register
+
+__all__ = ["register"]
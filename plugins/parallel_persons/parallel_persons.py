@@ -0,0 +1,189 @@
+"""Параллельная запись страниц персон.
+
+Включается настройкой PARALLEL_PERSON_PAGES - числом процессов (true - по
+числу ядер). Страницы статей из persons/ не рендерятся при генерации, а
+откладываются писателем _DeferringWriter. В finalized они рендерятся пулом
+процессов, созданных через fork: дочерние процессы наследуют шаблоны и
+контекст Pelican, поэтому получают ту же страницу, что и обычная сборка.
+
+Если подключен pelican_embed_svg, его проход по html файлам выполняется
+теми же функциями плагина, а его собственный обработчик отключается, чтобы не
+разбирать каждую страницу дважды. Страницы без svg картинок и иконок
+(например, страницы персон со встроенным малым деревом) не разбираются
+BeautifulSoup. Без PARALLEL_PERSON_PAGES страницы пишутся как обычно, а
+проход pelican_embed_svg выполняется по очереди без пула.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+from pathlib import Path
+
+from pelican import signals
+from pelican.utils import sanitised_join
+from pelican.writers import Writer
+
+logger = logging.getLogger(__name__)
+
+_PERSONS_PREFIX = "persons/"
+_CHUNK_SIZE = 16
+# Теги, которые может заменить pelican_embed_svg: иконки с классами и svg
+# картинки. Остальные страницы он только разбирает, ничего не меняя.
+_EMBED_CANDIDATE = re.compile(r"<i\s[^>]*class|<img\s[^>]*\.svg", re.IGNORECASE)
+
+# Отложенные вызовы write_file. Хранятся в модуле, чтобы процессы пула
+# получили их при fork без сериализации.
+_deferred: list[tuple[Writer, tuple, dict]] = []
+_embed_options: dict | None = None
+
+
+class _DeferringWriter(Writer):
+    def write_file(self, name, template, context, *args, **kwargs):
+        article = kwargs.get("article")
+        if article is not None and article.get_relative_source_path().startswith(
+            _PERSONS_PREFIX
+        ):
+            _deferred.append((self, (name, template, context, *args), kwargs))
+            return
+        super().write_file(name, template, context, *args, **kwargs)
+
+
+def _workers(settings: dict) -> int:
+    workers = settings.get("PARALLEL_PERSON_PAGES", 0)
+    if workers is True:
+        return os.cpu_count() or 1
+    return int(workers or 0)
+
+
+def get_writer(pelican):
+    if _workers(pelican.settings):
+        return _DeferringWriter
+    return None
+
+
+def take_over_embed_svg(pelican):
+    """Забирает проход pelican_embed_svg, чтобы пропускать страницы без svg."""
+    global _embed_options  # noqa: PLW0603
+    _deferred.clear()
+    _embed_options = None
+    try:
+        from pelican_embed_svg import _embed_svg
+    except ImportError:
+        return
+    if "pelican_embed_svg" not in pelican.settings["PLUGINS"]:
+        return
+    signals.finalized.disconnect(_embed_svg._finalized)  # noqa: SLF001
+    _embed_options = {}
+
+
+def _prepare_embed_svg(pelican):
+    """Настройки как в pelican_embed_svg._finalized."""
+    output_path = Path(pelican.output_path)
+    settings = pelican.settings
+    svg_path = Path(settings.get("PES_SVG_ICON_PATH", pelican.output_path))
+    _embed_options.update(
+        output_path=output_path,
+        root_url=settings.get("SITEURL", ""),
+        process_img=settings.get("PES_EMBED_IMG_TAGS", True),
+        set_img_fill=settings.get("PES_SET_IMG_FILL", False),
+        set_icon_fill=settings.get("PES_SET_ICON_FILL", True),
+        fa_path=Path(settings.get("PES_FONT_AWESOME_PATH", Path("font-awesome"))),
+        svg_available=sorted(svg_path.glob("**/*.svg")),
+    )
+
+
+def _embed_svg_into(path: Path):
+    """Тело цикла pelican_embed_svg._finalized для одного файла."""
+    import bs4
+    from pelican_embed_svg._embed_svg import _handle_icons, _handle_imgs
+
+    options = _embed_options
+    with open(path) as input_:  # noqa: PTH123
+        html = input_.read()
+    if not _EMBED_CANDIDATE.search(html):
+        return
+    soup = bs4.BeautifulSoup(html, features="lxml")
+
+    icons = soup.find_all("i")
+    modified = _handle_icons(
+        soup,
+        icons,
+        options["svg_available"],
+        options["fa_path"],
+        options["set_icon_fill"],
+    )
+    if options["process_img"]:
+        imgs = soup.find_all("img")
+        modified = (
+            _handle_imgs(
+                soup,
+                imgs,
+                options["output_path"],
+                options["root_url"],
+                options["set_img_fill"],
+            )
+            or modified
+        )
+
+    if modified:
+        with open(path, "w") as output:  # noqa: PTH123
+            output.write(str(soup))
+
+
+def _run_task(task: tuple[str, int | str]):
+    kind, target = task
+    if kind == "render":
+        writer, args, kwargs = _deferred[target]
+        Writer.write_file(writer, *args, **kwargs)
+        path = Path(sanitised_join(writer.output_path, args[0]))
+    else:
+        path = Path(target)
+    if _embed_options is not None:
+        _embed_svg_into(path)
+
+
+def render_deferred(pelican):
+    workers = _workers(pelican.settings)
+    if not workers and _embed_options is None:
+        return
+
+    tasks: list[tuple[str, int | str]] = [("render", i) for i in range(len(_deferred))]
+    if _embed_options is not None:
+        _prepare_embed_svg(pelican)
+        # Остальные страницы уже записаны, а отложенные обрабатываются сразу
+        # после записи в своей задаче.
+        deferred_paths = {
+            Path(sanitised_join(writer.output_path, args[0]))
+            for writer, args, _ in _deferred
+        }
+        tasks.extend(
+            ("embed", str(path))
+            for path in sorted(Path(pelican.output_path).glob("**/*.htm*"))
+            if path not in deferred_paths
+        )
+
+    if workers and "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            for _ in pool.imap_unordered(_run_task, tasks, chunksize=_CHUNK_SIZE):
+                pass
+    else:
+        if workers:
+            logger.warning(
+                "fork is unavailable, person pages are rendered sequentially"
+            )
+        for task in tasks:
+            _run_task(task)
+    logger.info(
+        "%d person pages rendered and %d tasks done by %d processes",
+        len(_deferred),
+        len(tasks),
+        max(workers, 1),
+    )
+    _deferred.clear()
+
+
+def register():
+    signals.get_writer.connect(get_writer)
+    signals.initialized.connect(take_over_embed_svg)
+    signals.finalized.connect(render_deferred)
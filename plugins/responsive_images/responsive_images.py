@@ -0,0 +1,27 @@
+"""Ссылки {static} в атрибутах srcset.
+
+Pelican заменяет {static} только в атрибутах с одним адресом (src, href), а
+в srcset статей галереи и персон перечислено несколько копий изображения.
+Плагин подставляет в них SITEURL, как Pelican делает без RELATIVE_URLS.
+"""
+
+import re
+
+from pelican import signals
+
+_SRCSET = re.compile(r'(\ssrcset=")([^"]*)(")')
+
+
+def replace_srcset_links(content):
+    html = content._content  # noqa: SLF001
+    if not html or "srcset=" not in html:
+        return
+    siteurl = content.settings.get("SITEURL") or ""
+    content._content = _SRCSET.sub(  # noqa: SLF001
+        lambda match: match[1] + match[2].replace("{static}", siteurl) + match[3],
+        html,
+    )
+
+
+def register():
+    signals.content_object_init.connect(replace_srcset_links)
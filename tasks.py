@@ -3,6 +3,7 @@ import os
 import shlex
 import shutil
 import sys
+from pathlib import Path
 
 from invoke import task
 from invoke.main import program
@@ -10,6 +11,9 @@ from pelican import main as pelican_main
 from pelican.server import ComplexHTTPRequestHandler, RootedHTTPServer
 from pelican.settings import DEFAULT_CONFIG, get_settings_from_file
 
+# Generator modules (src.*) are imported inside the tasks that need them.
+sys.path.append("content_generator")
+
 OPEN_BROWSER_ON_SERVE = True
 SETTINGS_FILE_BASE = "pelicanconf.py"
 SETTINGS = {}
@@ -22,6 +26,10 @@ CONFIG = {
     "settings_publish": "publishconf.py",
     # Output path. Can be absolute or relative to tasks.py. Default: 'output'
     "deploy_path": SETTINGS["OUTPUT_PATH"],
+    # Cache of compressed copies for `precompress`, keyed by content hash
+    "precompress_cache": ".cache/precompressed",
+    # Hashes of the last deployed output, see `publish` and `gh_pages`
+    "deploy_manifest": ".cache/deploy_manifest.json",
     # Github Pages configuration
     "github_pages_branch": "gh-pages",
     "commit_message": f"'Publish site on {
@@ -90,9 +98,15 @@ def reserve(c):
 
 
 @task
-def preview(c):  # noqa: ARG001
-    """Build production version of site."""
-    pelican_run("-s {settings_publish}".format(**CONFIG))
+def preview(c, workers=0):  # noqa: ARG001
+    """Build production version of site.
+
+    workers > 0 writes person pages in that many processes.
+    """
+    cmd = "-s {settings_publish}".format(**CONFIG)
+    if int(workers):
+        cmd += f" -e PARALLEL_PERSON_PAGES={int(workers)}"
+    pelican_run(cmd)
 
 
 @task
@@ -134,28 +148,61 @@ def livereload(c):  # noqa: ARG001
     server.serve(host=CONFIG["host"], port=CONFIG["port"], root=CONFIG["deploy_path"])
 
 
+@task
+def precompress(c, workers=0):  # noqa: ARG001
+    """Write .gz and .br copies of text files in the output.
+
+    Files with unchanged content are taken from the cache, not recompressed.
+    """
+    from src.infra.precompress import Precompressor
+
+    Precompressor(
+        Path(CONFIG["deploy_path"]), Path(CONFIG["precompress_cache"]), int(workers)
+    ).run()
+
+
 @task
 def publish(c):
-    """Publish to production via rsync."""
+    """Publish to production via rsync.
+
+    Only files changed since the last publish are transferred.
+    """
+    from src.infra.deploy import RsyncTarget
+
     pelican_run("-s {settings_publish}".format(**CONFIG))
-    c.run(
-        'rsync --delete --exclude ".DS_Store" -pthrvz -c '
-        '-e "ssh -p {ssh_port}" '
-        "{} {ssh_user}@{ssh_host}:{ssh_path}".format(
-            CONFIG["deploy_path"].rstrip("/") + "/",
-            **CONFIG,
-        ),
+    precompress(c)
+    deploy(
+        RsyncTarget(
+            "{ssh_user}@{ssh_host}:{ssh_path}".format(**CONFIG), CONFIG["ssh_port"]
+        )
     )
 
 
 @task
 def gh_pages(c):
-    """Publish to GitHub Pages."""
+    """Publish to GitHub Pages.
+
+    Only files changed since the last publish are committed to the branch.
+    """
+    from src.infra.deploy import GitTarget
+
     preview(c)
-    c.run(
-        "ghp-import -b {github_pages_branch} "
-        "-m {commit_message} "
-        "{deploy_path} -p".format(**CONFIG),
+    deploy(
+        GitTarget(
+            Path(".git"),
+            CONFIG["github_pages_branch"],
+            CONFIG["commit_message"].strip("'"),
+        )
+    )
+    c.run("git push origin {github_pages_branch}".format(**CONFIG))
+
+
+def deploy(target):
+    """Upload files changed since the last deploy to target."""
+    from src.infra.deploy import Deployer
+
+    Deployer(Path(CONFIG["deploy_path"]), Path(CONFIG["deploy_manifest"])).deploy(
+        target
     )
 
 
@@ -0,0 +1,89 @@
+// Поиск персон по индексу, который строит content_generator (SearchIndex).
+// Нормализация повторяет src/app/names.py.
+(function () {
+  "use strict";
+
+  var TRANSLITERATION = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "ӓ": "a", "ӧ": "o", "ӱ": "u", "ӹ": "y", "ҥ": "ng"
+  };
+  var SHARD_KEY_LENGTH = 2;
+  var MAX_NGRAM = 12;
+  var MAX_RESULTS = 50;
+
+  var input = document.getElementById("search-query");
+  var results = document.getElementById("search-results");
+  var siteUrl = input.dataset.siteurl;
+  var shards = {};
+
+  function nameTokens(text) {
+    var latin = "";
+    for (var char of text.toLowerCase()) {
+      latin += char in TRANSLITERATION ? TRANSLITERATION[char] : char;
+    }
+    return latin.split(/[^a-z]+/).filter(function (token) {
+      return token.length >= SHARD_KEY_LENGTH;
+    });
+  }
+
+  function loadShard(key) {
+    if (!(key in shards)) {
+      shards[key] = fetch(siteUrl + "/search/" + key + ".json").then(
+        function (response) { return response.ok ? response.json() : null; },
+        function () { return null; }
+      );
+    }
+    return shards[key];
+  }
+
+  // Персоны, у которых есть слово, начинающееся с token: id -> запись.
+  function findToken(token) {
+    return loadShard(token.slice(0, SHARD_KEY_LENGTH)).then(function (shard) {
+      var found = new Map();
+      var indexes = shard ? shard.ngrams[token.slice(0, MAX_NGRAM)] || [] : [];
+      indexes.forEach(function (index) {
+        var person = shard.persons[index];
+        found.set(person[0], person);
+      });
+      return found;
+    });
+  }
+
+  function render(persons) {
+    results.textContent = "";
+    persons.slice(0, MAX_RESULTS).forEach(function (person) {
+      var link = document.createElement("a");
+      link.href = siteUrl + "/" + person[0] + ".html";
+      link.textContent =
+        person[1] + " (" + person[2] + "-" + (person[3] || "н. в.") + ")";
+      var item = document.createElement("li");
+      item.appendChild(link);
+      results.appendChild(item);
+    });
+  }
+
+  var lastQuery = null;
+  input.addEventListener("input", function () {
+    var query = input.value;
+    lastQuery = query;
+    var tokens = nameTokens(query);
+    if (!tokens.length) {
+      render([]);
+      return;
+    }
+    Promise.all(tokens.map(findToken)).then(function (found) {
+      if (query !== lastQuery) {
+        return;
+      }
+      var persons = Array.from(found[0].values()).filter(function (person) {
+        return found.every(function (map) { return map.has(person[0]); });
+      });
+      persons.sort(function (a, b) { return a[2] - b[2]; });
+      render(persons);
+    });
+  });
+})();